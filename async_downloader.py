@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Concurrent downloader for Project Gutenberg texts
+
+Downloads are scheduled with asyncio: a semaphore bounds how many run at
+once and a per-host token bucket spaces out request starts (instead of fixed
+sleeps). Each request runs on a worker thread over a pooled keep-alive
+http.client connection and streams the body to disk in chunks, so many
+transfers overlap without any third-party HTTP library.
+
+Bodies are streamed to a .part file and only renamed into place once their
+size (and optional SHA-256) checks out; an interrupted transfer is resumed
+with an HTTP Range request instead of starting over.
+"""
+
+import asyncio
+import codecs
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Project Gutenberg Text Pipeline (Educational Use)'
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(\d+)-\d+/(\d+|\*)')
+
+class DownloadError(Exception):
+    """A download failed (bad status, too many redirects or a broken transfer)"""
+
+class TransferError(DownloadError):
+    """A transfer broke off or arrived corrupted; retrying (and resuming) may succeed"""
+
+# Broken or timed-out connections are worth retrying; DNS failures and the like are not
+RETRYABLE_ERRORS = (TransferError, http.client.HTTPException, ConnectionError, TimeoutError)
+
+class TokenBucket:
+    """Asyncio token bucket: at most `rate` request starts per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ConnectionPool:
+    """Thread-safe pool of idle keep-alive connections per (scheme, host)"""
+
+    def __init__(self, timeout: float = 30.0, max_idle: int = 8):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle = {}
+
+    def acquire(self, scheme: str, netloc: str) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        A connection to the host, reusing an idle one when possible
+
+        Returns:
+            (connection, reused)
+        """
+        with self.lock:
+            connections = self.idle.get((scheme, netloc))
+            if connections:
+                return connections.pop(), True
+
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        if scheme == 'http':
+            return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+        raise DownloadError(f"Unsupported URL scheme: {scheme}")
+
+    def release(self, scheme: str, netloc: str, connection: http.client.HTTPConnection):
+        """Return a connection whose response has been fully read"""
+        with self.lock:
+            connections = self.idle.setdefault((scheme, netloc), [])
+            if len(connections) < self.max_idle:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+class AsyncDownloader:
+    """Download many URLs concurrently with bounded concurrency and per-host rate limits"""
+
+    def __init__(self, max_concurrency: int = 4, requests_per_second: Optional[float] = 1.0,
+                 burst: float = 1.0, timeout: float = 30.0, user_agent: str = USER_AGENT,
+                 retries: int = 3, retry_delay: float = 1.0):
+        """
+        Args:
+            max_concurrency: Downloads in flight at once
+            requests_per_second: Request starts allowed per host per second (None for no limit)
+            burst: Requests a host may receive back to back after being idle
+            timeout: Socket timeout in seconds
+            user_agent: User-Agent header sent with every request
+            retries: Extra attempts for interrupted transfers, each resuming the partial file
+            retry_delay: Seconds before the first retry, doubling after each one
+        """
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.user_agent = user_agent
+        self.pool = ConnectionPool(timeout=timeout, max_idle=max_concurrency)
+        self.buckets = {}
+        self.executor = None
+        self.semaphore = None
+
+    def _bucket(self, netloc: str) -> Optional[TokenBucket]:
+        if not self.requests_per_second:
+            return None
+        bucket = self.buckets.get(netloc)
+        if bucket is None:
+            bucket = self.buckets[netloc] = TokenBucket(self.requests_per_second, self.burst)
+        return bucket
+
+    async def _download(self, url: str, path: str, sha256: Optional[str] = None,
+                        validators: Optional[Dict] = None) -> Dict:
+        """Download one URL to a UTF-8 text file, retrying interrupted transfers from where they stopped"""
+        async with self.semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    return await self._download_once(url, path, sha256, validators)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.retries:
+                        raise
+                    delay = self.retry_delay * 2 ** attempt
+                    logger.warning(f"Download of {url} interrupted ({e or type(e).__name__}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+    async def _download_once(self, url: str, path: str, sha256: Optional[str], validators: Optional[Dict]) -> Dict:
+        loop = asyncio.get_running_loop()
+        for _ in range(MAX_REDIRECTS + 1):
+            bucket = self._bucket(urlsplit(url).netloc)
+            if bucket is not None:
+                await bucket.acquire()
+
+            result = await loop.run_in_executor(self.executor, self._fetch, url, path, sha256, validators)
+            if result.get('location') is None:
+                return result
+            url = urljoin(url, result['location'])
+
+        raise DownloadError(f"Too many redirects for {url}")
+
+    async def downloadAll(self, jobs: Iterable[Tuple]) -> List[Dict]:
+        """
+        Download (url, path[, sha256[, validators]]) jobs concurrently, each to a UTF-8 text file
+
+        A job with validators (a dict with etag and/or last_modified from an
+        earlier download) is a conditional GET: if the server answers 304
+        Not Modified, the existing file is kept and no body is transferred.
+
+        Returns:
+            One result per job, in job order: url (after redirects), path,
+            status (200, 206 when resumed, 304 when not modified), bytes (raw
+            size transferred in total), sha256 (of the raw bytes), resumed
+            (bytes reused from an earlier partial transfer), etag and
+            last_modified; or an 'error' message for failed jobs
+        """
+        jobs = list(jobs)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='download')
+        # Buckets hold asyncio locks, which belong to one event loop
+        self.buckets = {}
+
+        try:
+            outcomes = await asyncio.gather(*(self._download(*job) for job in jobs), return_exceptions=True)
+        finally:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self.semaphore = None
+
+        results = []
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, BaseException):
+                results.append({'url': job[0], 'path': job[1], 'error': str(outcome) or type(outcome).__name__})
+            else:
+                results.append(outcome)
+        return results
+
+    def downloadMany(self, jobs: Iterable[Tuple]) -> List[Dict]:
+        """Blocking wrapper around downloadAll for synchronous callers"""
+        return asyncio.run(self.downloadAll(jobs))
+
+    def _request(self, url: str, extra_headers: Optional[Dict[str, str]] = None
+                 ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse, Tuple[str, str]]:
+        """Send a GET on a pooled connection, retrying once if a reused connection went stale"""
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'identity'}
+        if extra_headers:
+            headers.update(extra_headers)
+
+        while True:
+            connection, reused = self.pool.acquire(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', target, headers=headers)
+                return connection, connection.getresponse(), (parts.scheme, parts.netloc)
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+
+    def _fetch(self, url: str, path: str, sha256: Optional[str] = None, validators: Optional[Dict] = None) -> Dict:
+        """
+        Blocking single request: returns a redirect location or streams the body to disk
+
+        The raw body goes to <path>.part (with its validators in
+        <path>.part.json) and is only moved to path once complete and
+        verified, so an interrupted transfer can resume with a Range request.
+        """
+        partial = PartialDownload(path)
+        offset, headers = partial.resumeHeaders(url)
+
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        connection, response, key = self._request(url, headers)
+
+        try:
+            if response.status in REDIRECT_STATUSES:
+                response.read()
+                location = response.getheader('Location')
+                if not location:
+                    raise DownloadError(f"HTTP {response.status} without Location from {url}")
+                result = {'url': url, 'location': location}
+
+            elif response.status == 304 and validators:
+                response.read()
+                partial.discard()
+                result = {'url': url, 'path': path, 'status': 304, 'bytes': 0, 'sha256': validators.get('sha256'),
+                          'resumed': 0, 'etag': response.getheader('ETag') or validators.get('etag'),
+                          'last_modified': response.getheader('Last-Modified') or validators.get('last_modified')}
+
+            elif response.status == 206 and offset:
+                start, total = _parse_content_range(response.getheader('Content-Range', ''))
+                if start != offset:
+                    response.read()
+                    partial.discard()
+                    raise TransferError(f"Server resumed {url} at byte {start}, expected {offset}")
+                logger.debug(f"Resuming {url} at byte {offset}")
+                result = self._receive(url, response, partial, offset, total, sha256)
+
+            elif response.status == 200:
+                # A fresh transfer, also when the server ignored or refused the Range (If-Range mismatch)
+                partial.start(url, response)
+                result = self._receive(url, response, partial, 0, _content_length(response), sha256)
+
+            elif response.status == 416 and offset:
+                response.read()
+                partial.discard()
+                raise TransferError(f"Partial download of {url} is no longer valid")
+
+            else:
+                response.read()
+                error = TransferError if response.status >= 500 else DownloadError
+                raise error(f"HTTP {response.status} {response.reason} from {url}")
+
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self.pool.release(*key, connection)
+
+        return result
+
+    def _receive(self, url: str, response: http.client.HTTPResponse, partial: 'PartialDownload',
+                 offset: int, total: Optional[int], sha256: Optional[str]) -> Dict:
+        """Append the body to the partial file, verify size and checksum, then publish it"""
+        digest = partial.hashExisting(offset)
+        size = offset
+
+        with open(partial.part_path, 'ab' if offset else 'wb') as f:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+
+        if total is not None and size != total:
+            if size > total:
+                partial.discard()
+            raise TransferError(f"Received {size} of {total} bytes from {url}")
+
+        checksum = digest.hexdigest()
+        if sha256 and checksum != sha256.lower():
+            partial.discard()
+            raise TransferError(f"Checksum mismatch for {url}: expected {sha256}, got {checksum}")
+
+        meta = partial.publish()
+        return {'url': url, 'path': partial.path, 'status': response.status, 'bytes': size,
+                'sha256': checksum, 'resumed': offset,
+                'etag': response.getheader('ETag') or meta.get('etag'),
+                'last_modified': response.getheader('Last-Modified') or meta.get('last_modified')}
+
+    def close(self):
+        """Close pooled connections"""
+        self.pool.close()
+
+class PartialDownload:
+    """
+    On-disk state of one download: <path>.part holds the raw bytes received
+    so far and <path>.part.json the URL, validators and charset they belong to
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.part_path = path + '.part'
+        self.meta_path = path + '.part.json'
+
+    def resumeHeaders(self, url: str) -> Tuple[int, Dict[str, str]]:
+        """
+        Range headers continuing an earlier transfer of the same URL
+
+        Returns:
+            (bytes already on disk, extra request headers)
+        """
+        meta = self._read_meta()
+        if not meta or meta.get('url') != url or not os.path.exists(self.part_path):
+            return 0, {}
+
+        offset = os.path.getsize(self.part_path)
+        if not offset:
+            return 0, {}
+
+        headers = {'Range': f'bytes={offset}-'}
+        # Only accept the remaining bytes if the resource is unchanged
+        validator = meta.get('etag') or meta.get('last_modified')
+        if validator:
+            headers['If-Range'] = validator
+        return offset, headers
+
+    def start(self, url: str, response: http.client.HTTPResponse):
+        """Record what a fresh transfer is receiving, before any body bytes are written"""
+        meta = {
+            'url': url,
+            'etag': response.getheader('ETag'),
+            'last_modified': response.getheader('Last-Modified'),
+            'charset': response.headers.get_content_charset() or 'utf-8'
+        }
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def hashExisting(self, offset: int):
+        """SHA-256 state primed with the first offset bytes already on disk"""
+        digest = hashlib.sha256()
+        if offset:
+            with open(self.part_path, 'rb') as f:
+                remaining = offset
+                while remaining:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    remaining -= len(chunk)
+        return digest
+
+    def publish(self) -> Dict:
+        """
+        Transcode the complete raw file to UTF-8 next to path, then atomically rename it into place
+
+        Returns:
+            The transfer's recorded metadata (url, etag, last_modified, charset)
+        """
+        meta = self._read_meta() or {}
+        charset = meta.get('charset') or 'utf-8'
+        try:
+            decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(self.part_path, 'rb') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(decoder.decode(chunk))
+                dst.write(decoder.decode(b'', final=True))
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.discard()
+        return meta
+
+    def discard(self):
+        """Forget the partial transfer"""
+        for path in (self.part_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+class DownloadManifest:
+    """
+    JSON record of completed downloads keyed by an ID: URL, validators
+    (ETag, Last-Modified), raw size and SHA-256, for conditional revalidation
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def validators(self, key: str, url: str) -> Optional[Dict]:
+        """Validators for a conditional GET, if key was last downloaded from url"""
+        entry = self.entries.get(key)
+        if not entry or entry.get('url') != url or not (entry.get('etag') or entry.get('last_modified')):
+            return None
+        return {'etag': entry.get('etag'), 'last_modified': entry.get('last_modified'), 'sha256': entry.get('sha256')}
+
+    def record(self, key: str, url: str, result: Dict):
+        """Store a successful download (or revalidation) result"""
+        now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        entry = self.entries.get(key) or {}
+        if result['status'] != 304 or entry.get('url') != url:
+            # A 304 for a file we have no record of confirms it without telling us its size
+            size = result['bytes'] if result['status'] != 304 else None
+            entry = {'url': url, 'size': size, 'sha256': result['sha256'], 'updated': now}
+
+        entry.update({
+            'final_url': result['url'],
+            'etag': result.get('etag'),
+            'last_modified': result.get('last_modified'),
+            'checked': now
+        })
+        self.entries[key] = entry
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def _content_length(response: http.client.HTTPResponse) -> Optional[int]:
+    length = response.getheader('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+def _parse_content_range(value: str) -> Tuple[Optional[int], Optional[int]]:
+    """(first byte, complete length) of a 'bytes first-last/length' Content-Range"""
+    match = CONTENT_RANGE_PATTERN.match(value.strip())
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return int(start), (int(total) if total != '*' else None)
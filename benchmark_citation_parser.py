@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the citation parser: single-pass engine vs. multi-pass path
+"""
+
+import argparse
+import time
+from citation_parser import CitationParser
+
+SAMPLE_CITATIONS = [
+    "Absalom and Achitophel 1-10",
+    "The Waste Land 430-433",
+    "Paradise Lost Book I, 1-26",
+    "Paradise Lost IX.1033-1045",
+    "Hamlet Act 3 Scene 1, 56-88",
+    "Genesis 1:1-3",
+    "Matt 5:3-12",
+    "Song of Solomon 2:1",
+    "Romans 8:28; 1 Cor 13:4-7",
+    "cf. Genesis 3:15; Paradise Lost IX.1033-1045",
+    "Not a citation at all"
+]
+
+def multi_pass_parse(parser: CitationParser, footnote_text: str):
+    """The original path: identifySourceType, then a separate parse pass"""
+
+    footnote_text = footnote_text.strip()
+    source_type = parser.identifySourceType(footnote_text)
+
+    if source_type == 'bible':
+        citations = parser._parseBiblicalCitation(footnote_text)
+    elif source_type == 'literature':
+        citations = parser._parseLiteraryCitation(footnote_text)
+    else:
+        citations = parser._parseMixedCitation(footnote_text)
+
+    return {
+        'citations': [citation.toDict() for citation in citations],
+        'source_type': source_type,
+        'original_text': footnote_text
+    }
+
+def time_per_citation(func, citations, repeat: int) -> float:
+    """Best-of-repeat time per citation in microseconds"""
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(citations)
+        best = min(best, time.perf_counter() - start)
+
+    return best / len(citations) * 1e6
+
+def run_benchmark(copies: int = 2000, repeat: int = 5):
+    """Compare per-citation latency of each parsing path"""
+
+    parser = CitationParser()
+    cached_parser = CitationParser(cache_size=len(SAMPLE_CITATIONS))
+    citations = SAMPLE_CITATIONS * copies
+
+    paths = {
+        'multi-pass (identifySourceType + parse)': lambda cits: [multi_pass_parse(parser, c) for c in cits],
+        'single-pass parseCitation': lambda cits: [parser.parseCitation(c) for c in cits],
+        'single-pass parseCitations (batch)': lambda cits: list(parser.parseCitations(cits)),
+        'iterCitationResults (no dicts)': lambda cits: list(parser.iterCitationResults(cits)),
+        'cached parseCitations (LRU)': lambda cits: list(cached_parser.parseCitations(cits))
+    }
+
+    print("=== Citation Parser Benchmark ===")
+    print(f"{len(citations):,} citations, best of {repeat} runs\n")
+
+    baseline = None
+    for name, func in paths.items():
+        latency = time_per_citation(func, citations, repeat)
+        if baseline is None:
+            baseline = latency
+        print(f"{name:<42} {latency:8.2f} µs/citation  ({baseline / latency:.2f}x)")
+
+    print("\nPer-format latency (µs/citation, multi-pass → single-pass):")
+    for citation in SAMPLE_CITATIONS:
+        sample = [citation] * copies
+        before = time_per_citation(lambda cits: [multi_pass_parse(parser, c) for c in cits], sample, repeat)
+        after = time_per_citation(lambda cits: [parser.parseCitation(c) for c in cits], sample, repeat)
+        print(f"  {citation:<46} {before:7.2f} → {after:7.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark citation parsing paths')
+    parser.add_argument('--copies', '-n', type=int, default=2000, help='Copies of the sample set to parse')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Timing repetitions per path')
+
+    args = parser.parse_args()
+    run_benchmark(args.copies, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Columnar storage for parsed citations
+
+A compact, Parquet-style file format for large citation tables: each column is
+stored as a typed array, string columns are dictionary-encoded, rows are
+appended in batches (row groups), and a JSON footer indexes every column chunk
+so readers can memory-map the file and slice columns without parsing rows.
+
+File layout:
+    MAGIC
+    row group 0: column chunk per column, each padded to 8 bytes
+    row group 1: ...
+    footer (JSON: schema, dictionaries, row group offsets)
+    footer length (uint64, little-endian)
+    MAGIC
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from citation_parser import CitationResult
+
+MAGIC = b'CITCOL1\x00'
+FOOTER_LENGTH = struct.Struct('<Q')
+
+# Null marker for integer columns (parsed values are never negative)
+NULL_INT = -1
+# Largest value an integer column can hold (line numbers are parsed from unbounded digit strings)
+MAX_INT = 2 ** 63 - 1
+
+# (name, kind): 'id' is the int64 footnote index, 'int' an int64 value,
+# 'dict' an int32 code into the column's string dictionary
+COLUMNS = [
+    ('footnote_id', 'id'),
+    ('type', 'dict'),
+    ('book', 'dict'),
+    ('chapter', 'int'),
+    ('start_verse', 'int'),
+    ('end_verse', 'int'),
+    ('work', 'dict'),
+    ('act', 'dict'),
+    ('scene', 'dict'),
+    ('book_number', 'dict'),
+    ('start_line', 'int'),
+    ('end_line', 'int')
+]
+
+TYPECODES = {'id': 'q', 'int': 'q', 'dict': 'i'}
+
+Citation = Union[CitationResult, Dict[str, Any]]
+
+def _to_little_endian(values: array) -> bytes:
+    """Serialise an array in little-endian byte order"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class CitationColumnWriter:
+    """Append parsed citations to a columnar file in row groups"""
+
+    def __init__(self, path: str, batch_size: int = 65536):
+        """
+        Args:
+            path: Output file path
+            batch_size: Rows buffered before a row group is written
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+
+        self.dictionaries = {name: [] for name, kind in COLUMNS if kind == 'dict'}
+        self.dictionary_codes = {name: {} for name in self.dictionaries}
+        self.row_groups = []
+        self.total_rows = 0
+        self._reset_buffers()
+
+    def _reset_buffers(self):
+        self.buffers = {name: array(TYPECODES[kind]) for name, kind in COLUMNS}
+
+    def _encode(self, name: str, value: Optional[str]) -> int:
+        """Dictionary code for a string value (-1 for missing values)"""
+        if not value:
+            return NULL_INT
+
+        codes = self.dictionary_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.dictionaries[name])
+            self.dictionaries[name].append(value)
+        return code
+
+    def append(self, citation: Citation, footnote_id: int = 0):
+        """
+        Buffer one citation row
+
+        Args:
+            citation: CitationResult or a citation dict from parseCitation
+            footnote_id: Index of the footnote the citation came from
+        """
+        if isinstance(citation, dict):
+            values = [citation.get(name) for name, _ in COLUMNS[1:]]
+        else:
+            values = [getattr(citation, name) for name, _ in COLUMNS[1:]]
+
+        # Check every value before buffering any, so a rejected row leaves the columns aligned
+        for (name, kind), value in zip(COLUMNS[1:], values):
+            if kind == 'int' and value and value > MAX_INT:
+                raise ValueError(f"{name} {value} is too large for a citation column (max {MAX_INT})")
+
+        buffers = self.buffers
+        buffers['footnote_id'].append(footnote_id)
+
+        for (name, kind), value in zip(COLUMNS[1:], values):
+            if kind == 'dict':
+                buffers[name].append(self._encode(name, value))
+            else:
+                buffers[name].append(value if value else NULL_INT)
+
+        if len(buffers['footnote_id']) >= self.batch_size:
+            self.writeBatch()
+
+    def appendResults(self, results: Iterable[Tuple[str, Tuple[CitationResult, ...]]], first_footnote_id: int = 0) -> int:
+        """
+        Append the output of CitationParser.iterCitationResults
+
+        Returns:
+            Number of footnotes consumed
+        """
+        footnote_id = first_footnote_id
+        for _, citations in results:
+            for citation in citations:
+                self.append(citation, footnote_id)
+            footnote_id += 1
+
+        return footnote_id - first_footnote_id
+
+    def writeBatch(self):
+        """Write the buffered rows as one row group"""
+        rows = len(self.buffers['footnote_id'])
+        if not rows:
+            return
+
+        chunks = {}
+        for name, _ in COLUMNS:
+            data = _to_little_endian(self.buffers[name])
+            offset = self.file.tell()
+            self.file.write(data)
+            self.file.write(b'\x00' * (-len(data) % 8))
+            chunks[name] = [offset, len(data)]
+
+        self.row_groups.append({'rows': rows, 'columns': chunks})
+        self.total_rows += rows
+        self._reset_buffers()
+
+    def close(self):
+        """Flush remaining rows and write the footer"""
+        if self.file.closed:
+            return
+
+        self.writeBatch()
+
+        footer = json.dumps({
+            'version': 1,
+            'rows': self.total_rows,
+            'columns': [{'name': name, 'kind': kind, 'typecode': TYPECODES[kind]} for name, kind in COLUMNS],
+            'dictionaries': self.dictionaries,
+            'row_groups': self.row_groups
+        }, ensure_ascii=False).encode('utf-8')
+
+        self.file.write(footer)
+        self.file.write(FOOTER_LENGTH.pack(len(footer)))
+        self.file.write(MAGIC)
+        self.file.close()
+
+    def abort(self):
+        """Discard the file without writing a footer"""
+        if not self.file.closed:
+            self.file.close()
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # A failed write must not leave a footer that makes a partial file look complete
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class CitationColumnReader:
+    """Memory-mapped reader for files written by CitationColumnWriter"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.map[:len(MAGIC)] != MAGIC or self.map[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a citation column file: {path}")
+
+        footer_end = len(self.map) - len(MAGIC) - FOOTER_LENGTH.size
+        (footer_length,) = FOOTER_LENGTH.unpack_from(self.map, footer_end)
+        footer = json.loads(self.map[footer_end - footer_length:footer_end].decode('utf-8'))
+
+        self.rows = footer['rows']
+        self.columns = {column['name']: column for column in footer['columns']}
+        self.dictionaries = footer['dictionaries']
+        self.row_groups = footer['row_groups']
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def columnChunks(self, name: str) -> List[memoryview]:
+        """
+        Zero-copy views of a column, one typed memoryview per row group
+
+        Values are little-endian; on big-endian hosts use readColumn instead.
+        Release the views before calling close().
+        """
+        typecode = self.columns[name]['typecode']
+        view = memoryview(self.map)
+        return [view[offset:offset + length].cast(typecode)
+                for offset, length in (group['columns'][name] for group in self.row_groups)]
+
+    def readColumn(self, name: str) -> array:
+        """Raw values of a column (dictionary codes for string columns, -1 for nulls)"""
+        values = array(self.columns[name]['typecode'])
+        for group in self.row_groups:
+            offset, length = group['columns'][name]
+            values.frombytes(self.map[offset:offset + length])
+
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def decodeColumn(self, name: str) -> List[Any]:
+        """Column values with dictionary codes resolved and nulls as None"""
+        values = self.readColumn(name)
+
+        if self.columns[name]['kind'] == 'dict':
+            dictionary = self.dictionaries[name]
+            return [dictionary[code] if code != NULL_INT else None for code in values]
+
+        return [value if value != NULL_INT else None for value in values]
+
+    def iterDicts(self) -> Iterator[Dict[str, Any]]:
+        """Rebuild citation dicts in parseCitation format, with their footnote_id"""
+        names = [name for name, _ in COLUMNS]
+        columns = [self.decodeColumn(name) for name in names]
+
+        for row in zip(*columns):
+            yield {name: value for name, value in zip(names, row) if value is not None}
+
+    def close(self):
+        if not self.map.closed:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def writeCitationColumns(parser, footnotes: Iterable[str], path: str, batch_size: int = 65536) -> int:
+    """
+    Parse footnotes and write every citation to a columnar file
+
+    Args:
+        parser: CitationParser instance
+        footnotes: Footnote strings
+        path: Output file path
+        batch_size: Rows per row group
+
+    Returns:
+        Number of citation rows written
+    """
+    with CitationColumnWriter(path, batch_size) as writer:
+        writer.appendResults(parser.iterCitationResults(footnotes))
+        writer.writeBatch()
+        return writer.total_rows
@@ -5,12 +5,13 @@ Comprehensive citation parser for literary and biblical references
 
 import re
 import json
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+from collections import OrderedDict
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CitationResult:
-    """Structured citation data"""
+    """Structured citation data (immutable and slotted, so millions stay compact)"""
     type: str  # 'bible' | 'literature' | 'mixed'
     work: Optional[str] = None
     book: Optional[str] = None
@@ -23,12 +24,240 @@ class CitationResult:
     scene: Optional[str] = None
     book_number: Optional[str] = None  # For Paradise Lost "Book I"
 
+    def toDict(self) -> Dict[str, Any]:
+        """Build the dictionary format on demand, omitting empty fields"""
+
+        result_dict = {'type': self.type}
+
+        if self.work:
+            result_dict['work'] = self.work
+        if self.book:
+            result_dict['book'] = self.book
+        if self.chapter:
+            result_dict['chapter'] = self.chapter
+        if self.start_verse:
+            result_dict['start_verse'] = self.start_verse
+        if self.end_verse:
+            result_dict['end_verse'] = self.end_verse
+        if self.start_line:
+            result_dict['start_line'] = self.start_line
+        if self.end_line:
+            result_dict['end_line'] = self.end_line
+        if self.act:
+            result_dict['act'] = self.act
+        if self.scene:
+            result_dict['scene'] = self.scene
+        if self.book_number:
+            result_dict['book_number'] = self.book_number
+
+        return result_dict
+
+class CitationCache:
+    """Bounded LRU cache of parsed citations keyed on the stripped footnote text"""
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Cache capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, Tuple[CitationResult, ...]]]:
+        """Return the cached (source_type, citations) entry and mark it as recently used"""
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Tuple[str, Tuple[CitationResult, ...]]):
+        """Store an entry, evicting the least recently used one when full"""
+
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Current size, capacity and hit/miss/eviction counters"""
+
+        return {
+            'size': len(self.entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+class BookNameTrie:
+    """
+    Character trie over biblical book names and their abbreviations
+
+    Matching is case-insensitive and treats any run of whitespace as a single
+    space, so names are recognised directly in the source string instead of
+    being normalised with regular expressions first.
+    """
+
+    TERMINAL = ''
+
+    def __init__(self, books: Dict[str, str]):
+        # Every name, plus alternate spacings of numbered names
+        self.spaced = {}
+        # Names without spaces, matched while ignoring all whitespace ('1 cor' -> '1cor')
+        self.compact = {}
+
+        for name, canonical in books.items():
+            self._insert(self.spaced, name, canonical)
+            if ' ' not in name:
+                self._insert(self.compact, name, canonical)
+
+        # Numbered names resolve with or without a space after the number
+        # ('1samuel', '1 cor'); real names keep precedence over these forms
+        for name, canonical in books.items():
+            digits = len(name) - len(name.lstrip('0123456789'))
+            rest = name[digits:].lstrip(' ')
+            if not digits or not rest[:1].isalpha():
+                continue
+
+            number = name[:digits]
+            if ' ' in name:
+                # Overrides a compact name, as the space was inserted before lookup
+                self._insert(self.spaced, number + rest, canonical)
+            elif f'{number} {rest}' not in books:
+                self._insert(self.spaced, f'{number} {rest}', canonical)
+
+    def _insert(self, root: Dict, name: str, canonical: str):
+        """Add a name to one of the tries"""
+
+        node = root
+        for char in name:
+            node = node.setdefault(char, {})
+        node[self.TERMINAL] = canonical
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Resolve a whole candidate string to its canonical book name"""
+
+        name = name.strip().lower()
+
+        node = self.spaced
+        in_space = False
+        for char in name:
+            if char.isspace():
+                if in_space:
+                    continue
+                in_space = True
+                char = ' '
+            else:
+                in_space = False
+
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            canonical = node.get(self.TERMINAL)
+            if canonical:
+                return canonical
+
+        node = self.compact
+        for char in name:
+            if char.isspace():
+                continue
+            node = node.get(char)
+            if node is None:
+                return None
+
+        return node.get(self.TERMINAL)
+
+    def longestMatch(self, text: str, pos: int = 0) -> Optional[Tuple[str, int]]:
+        """
+        Find the longest book name starting at pos that ends on a word boundary
+
+        Returns:
+            Tuple of (canonical_name, end_index) or None
+        """
+        node = self.spaced
+        best = None
+        length = len(text)
+        i = pos
+
+        while i < length:
+            char = text[i]
+            if char.isspace():
+                node = node.get(' ')
+                while i + 1 < length and text[i + 1].isspace():
+                    i += 1
+            else:
+                node = node.get(char.lower())
+            if node is None:
+                break
+
+            i += 1
+            canonical = node.get(self.TERMINAL)
+            if canonical and (i == length or not text[i].isalnum()):
+                best = (canonical, i)
+
+        return best
+
+    def findAll(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Scan free text for book names, preferring the longest name at each word
+
+        Returns:
+            List of (start_index, end_index, canonical_name) tuples
+        """
+        matches = []
+        roots = self.spaced
+        length = len(text)
+        pos = 0
+
+        while pos < length:
+            if text[pos].lower() in roots and (pos == 0 or not text[pos - 1].isalnum()):
+                found = self.longestMatch(text, pos)
+                if found:
+                    canonical, end = found
+                    matches.append((pos, end, canonical))
+                    pos = end
+                    continue
+            pos += 1
+
+        return matches
+
+
 class CitationParser:
     """Comprehensive parser for literary and biblical citations"""
 
-    def __init__(self):
+    # Named groups used when the citation patterns are merged into one engine
+    BIBLE_GROUPS = ['bible_book', 'bible_chapter', 'bible_start', 'bible_end']
+    LITERARY_GROUPS = [
+        ('drama', 'literature_drama', ['drama_work', 'drama_act', 'drama_scene', 'drama_start', 'drama_end']),
+        ('book', 'literature_book', ['book_work', 'book_number', 'book_start', 'book_end']),
+        ('simple', 'literature_simple', ['simple_work', 'simple_start', 'simple_end'])
+    ]
+
+    def __init__(self, cache_size: int = 0):
+        """
+        Args:
+            cache_size: Number of distinct footnotes to memoize (0 disables the cache)
+        """
         self.patterns = self._defineCitationPatterns()
         self.biblical_books = self._buildBiblicalBookDatabase()
+        self.book_trie = BookNameTrie(self.biblical_books)
+        self.cache = CitationCache(cache_size) if cache_size else None
 
     def _defineCitationPatterns(self) -> Dict[str, re.Pattern]:
         """Define regex patterns for each citation format"""
@@ -74,8 +303,55 @@ class CitationParser:
             re.IGNORECASE
         )
 
+        # Combined engines that classify and decompose a citation in one scan.
+        # Literary alternatives are anchored at the start, as they are only ever
+        # tried with match(), and are tried in the same order as _parseLiteraryCitation
+        literature_alternatives = '|'.join(
+            f'(?P<{kind}>{self._nameGroups(patterns[key].pattern, names)})'
+            for kind, key, names in self.LITERARY_GROUPS
+        )
+        bible_alternative = self._nameGroups(patterns['bible_standard'].pattern, self.BIBLE_GROUPS)
+
+        patterns['literature_combined'] = re.compile(
+            rf'(?:{literature_alternatives})',
+            re.IGNORECASE
+        )
+
+        patterns['citation_engine'] = re.compile(
+            rf'(?P<bible>{bible_alternative})|\A(?:{literature_alternatives})',
+            re.IGNORECASE
+        )
+
         return patterns
 
+    @staticmethod
+    def _nameGroups(pattern: str, names: List[str]) -> str:
+        """Rewrite the unnamed capturing groups of a pattern as named groups, in order"""
+
+        names = iter(names)
+        parts = []
+        in_class = False
+        i = 0
+
+        while i < len(pattern):
+            char = pattern[i]
+            if char == '\\':
+                parts.append(pattern[i:i + 2])
+                i += 2
+                continue
+
+            if in_class:
+                in_class = char != ']'
+            elif char == '[':
+                in_class = True
+            elif char == '(' and not pattern.startswith('?', i + 1):
+                char = f'(?P<{next(names)}>'
+
+            parts.append(char)
+            i += 1
+
+        return ''.join(parts)
+
     def _buildBiblicalBookDatabase(self) -> Dict[str, str]:
         """Build database of biblical book names and their abbreviations"""
 
@@ -156,24 +432,12 @@ class CitationParser:
     def normalizeBookNames(self, book_name: str) -> Optional[str]:
         """Normalize biblical book names and handle abbreviations"""
 
-        # Clean up the book name
-        clean_name = book_name.strip().lower()
-        clean_name = re.sub(r'\s+', ' ', clean_name)  # Normalize whitespace
-
-        # Handle numbered books (1 Cor, 2 Tim, etc.)
-        if re.match(r'^\d+\s*[a-z]+', clean_name):
-            clean_name = re.sub(r'^(\d+)\s*([a-z]+)', r'\1 \2', clean_name)
+        return self.book_trie.lookup(book_name)
 
-        # Look up in the database
-        if clean_name in self.biblical_books:
-            return self.biblical_books[clean_name]
+    def findBookNames(self, text: str) -> List[Tuple[int, int, str]]:
+        """Find biblical book names in free text as (start, end, canonical_name) tuples"""
 
-        # Try without spaces for abbreviated forms
-        no_space = clean_name.replace(' ', '')
-        if no_space in self.biblical_books:
-            return self.biblical_books[no_space]
-
-        return None
+        return self.book_trie.findAll(text)
 
     def extractWorkTitle(self, citation: str) -> Optional[str]:
         """Extract work title from literary citation"""
@@ -361,51 +625,164 @@ class CitationParser:
         """Main parsing function that handles all citation types"""
 
         footnote_text = footnote_text.strip()
-        source_type = self.identifySourceType(footnote_text)
-
-        citations = []
-
-        if source_type == 'bible':
-            citations = self._parseBiblicalCitation(footnote_text)
-        elif source_type == 'literature':
-            citations = self._parseLiteraryCitation(footnote_text)
-        elif source_type == 'mixed':
-            citations = self._parseMixedCitation(footnote_text)
-
-        # Convert to dictionary format
-        citation_dicts = []
-        for citation in citations:
-            result_dict = {'type': citation.type}
-
-            if citation.work:
-                result_dict['work'] = citation.work
-            if citation.book:
-                result_dict['book'] = citation.book
-            if citation.chapter:
-                result_dict['chapter'] = citation.chapter
-            if citation.start_verse:
-                result_dict['start_verse'] = citation.start_verse
-            if citation.end_verse:
-                result_dict['end_verse'] = citation.end_verse
-            if citation.start_line:
-                result_dict['start_line'] = citation.start_line
-            if citation.end_line:
-                result_dict['end_line'] = citation.end_line
-            if citation.act:
-                result_dict['act'] = citation.act
-            if citation.scene:
-                result_dict['scene'] = citation.scene
-            if citation.book_number:
-                result_dict['book_number'] = citation.book_number
-
-            citation_dicts.append(result_dict)
+        source_type, citations = self._parseStripped(footnote_text)
 
         return {
-            'citations': citation_dicts,
+            'citations': [citation.toDict() for citation in citations],
             'source_type': source_type,
             'original_text': footnote_text
         }
 
+    def parseCitations(self, footnotes: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Parse a stream of footnotes, yielding one result per input in order
+
+        Produces the same dictionaries as parseCitation, with all lookups bound
+        once for the whole batch.
+        """
+        parse = self._parseStripped
+
+        for footnote_text in footnotes:
+            footnote_text = footnote_text.strip()
+            source_type, citations = parse(footnote_text)
+            yield {
+                'citations': [citation.toDict() for citation in citations],
+                'source_type': source_type,
+                'original_text': footnote_text
+            }
+
+    def parseCitationResults(self, footnote_text: str) -> Tuple[str, Tuple[CitationResult, ...]]:
+        """
+        Parse a footnote into its source type and CitationResult objects
+
+        Skips the dictionary conversion entirely; call toDict() on a result
+        when the dictionary form is needed. Results are immutable, so cached
+        entries are shared rather than copied.
+        """
+        return self._parseStripped(footnote_text.strip())
+
+    def iterCitationResults(self, footnotes: Iterable[str]) -> Iterator[Tuple[str, Tuple[CitationResult, ...]]]:
+        """Batch form of parseCitationResults, yielding one (source_type, citations) per input"""
+
+        parse = self._parseStripped
+
+        for footnote_text in footnotes:
+            yield parse(footnote_text.strip())
+
+    def getCacheStats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters of the citation cache (empty when disabled)"""
+
+        return self.cache.stats() if self.cache is not None else {}
+
+    def _parseStripped(self, footnote_text: str) -> Tuple[str, Tuple[CitationResult, ...]]:
+        """Parse a stripped footnote into its source type and citations, using the cache"""
+
+        cache = self.cache
+        if cache is not None:
+            entry = cache.get(footnote_text)
+            if entry is not None:
+                return entry
+
+        source_type, citations = self._classifyAndParse(footnote_text)
+        entry = (source_type, tuple(citations))
+
+        if cache is not None:
+            cache.put(footnote_text, entry)
+
+        return entry
+
+    def _classifyAndParse(self, citation: str) -> Tuple[str, List[CitationResult]]:
+        """
+        Identify the source type and parse a stripped citation
+
+        Gives the same result as identifySourceType followed by the matching
+        _parse*Citation method, but single references are classified and
+        decomposed by one scan of the combined citation engine.
+        """
+
+        if ';' in citation:
+            if 'cf.' in citation.lower():
+                return 'mixed', self._parseMixedCitation(citation)
+            # With a semicolon, any chapter:verse makes identifySourceType say 'bible'
+            if ':' in citation:
+                return 'bible', self._parseBiblicalCitation(citation)
+
+        # bible_standard needs a chapter:verse separator, so only literary forms remain
+        if ':' not in citation:
+            return 'literature', self._literaryFromMatch(self.patterns['literature_combined'].match(citation))
+
+        match = self.patterns['citation_engine'].search(citation)
+        if match is None:
+            return 'literature', []
+
+        if match.lastgroup == 'bible':
+            normalized_book = self.normalizeBookNames(match.group('bible_book'))
+            if normalized_book:
+                # _parseBiblicalCitation anchors at the start, so a later match parses to nothing
+                if match.start() != 0:
+                    return 'bible', []
+
+                start_verse = int(match.group('bible_start'))
+                end_verse = match.group('bible_end')
+                return 'bible', [CitationResult(
+                    type='bible',
+                    book=normalized_book,
+                    chapter=int(match.group('bible_chapter')),
+                    start_verse=start_verse,
+                    end_verse=int(end_verse) if end_verse else start_verse
+                )]
+
+            # The biblical alternative shadowed the literary ones at the start
+            if match.start() == 0:
+                return 'literature', self._literaryFromMatch(self.patterns['literature_combined'].match(citation))
+            return 'literature', []
+
+        # A literary form matched at the start, but a biblical reference later on
+        # still takes precedence, as it does in identifySourceType
+        biblical_match = self.patterns['bible_standard'].search(citation, 1)
+        if biblical_match and self.normalizeBookNames(biblical_match.group(1)):
+            return 'bible', []
+
+        return 'literature', self._literaryFromMatch(match)
+
+    @staticmethod
+    def _literaryFromMatch(match: Optional[re.Match]) -> List[CitationResult]:
+        """Build literary citation results from a combined engine match"""
+
+        if match is None:
+            return []
+
+        kind = match.lastgroup
+        work = match.group(f'{kind}_work').strip()
+        start_line = int(match.group(f'{kind}_start'))
+        end_line = match.group(f'{kind}_end')
+        end_line = int(end_line) if end_line else start_line
+
+        if kind == 'drama':
+            return [CitationResult(
+                type='literature',
+                work=work,
+                act=match.group('drama_act'),
+                scene=match.group('drama_scene'),
+                start_line=start_line,
+                end_line=end_line
+            )]
+
+        if kind == 'book':
+            return [CitationResult(
+                type='literature',
+                work=work,
+                book_number=match.group('book_number'),
+                start_line=start_line,
+                end_line=end_line
+            )]
+
+        return [CitationResult(
+            type='literature',
+            work=work,
+            start_line=start_line,
+            end_line=end_line
+        )]
 
 if __name__ == "__main__":
     # Test the parser with example citations
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Binary, memory-mapped search index for the Gutenberg catalog
+
+A compact on-disk form of the search index built by
+GutenbergCatalogParser.buildSearchIndex, together with the catalog entries
+themselves, so a search can start without parsing any JSON. Every catalog
+entry gets a document number; each lookup table is a sorted term dictionary
+whose terms point into a flat array of document numbers, and the reader
+binary-searches the terms straight out of the memory map. The fuzzy-title
+character index used with both the JSON and the binary form lives here too.
+
+File layout:
+    MAGIC
+    sections, each a little-endian typed array padded to 8 bytes
+    footer (JSON: document count, BM25 totals, source files, section offsets)
+    footer length (uint64, little-endian)
+    MAGIC
+
+Sections:
+    <table>.offsets / <table>.data      string table (uint64 offsets + UTF-8)
+    <dict>.terms.*                      sorted terms (a string table)
+    <dict>.offsets                      per-term start in <dict>.postings (uint64)
+    <dict>.postings                     document numbers (uint32)
+    bm25.weights                        weighted term frequency per posting (float32)
+    doc_lengths                         weighted BM25 document length per document (float32)
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+MAGIC = b'GUTIDX1\x00'
+FOOTER_LENGTH = struct.Struct('<Q')
+# Version 2 replaced the title trigram postings with character postings
+VERSION = 2
+
+# Term dictionaries of the JSON index stored as document-number postings
+ID_DICTIONARIES = ['by_title', 'by_author', 'by_word']
+
+class TitleCharacterIndex:
+    """
+    Character inverted index over normalized titles
+
+    Titles are numbered in index order and every character occurrence (the
+    k-th 'e' of a title is the gram 'e' + str(k)) maps to the sorted list of
+    title numbers containing it. Counting a query's grams over the postings
+    gives, for every title at once, the size of the multiset intersection that
+    bounds SequenceMatcher.ratio (its quick_ratio), so a fuzzy query only
+    needs to score titles that can still reach the threshold.
+    """
+
+    def __init__(self, normalized_titles: Dict[str, str]):
+        self.source = normalized_titles
+        self.text_ids = list(normalized_titles)
+        self.titles = list(normalized_titles.values())
+        self.postings = {}
+
+        for number, title in enumerate(self.titles):
+            for gram in self.grams(title):
+                postings = self.postings.get(gram)
+                if postings is None:
+                    self.postings[gram] = [number]
+                else:
+                    postings.append(number)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def isCurrent(self, normalized_titles: Dict[str, str]) -> bool:
+        """Whether the index was built from this (unchanged) title mapping"""
+        return normalized_titles is self.source and len(normalized_titles) == len(self.titles)
+
+    @staticmethod
+    def grams(text: str) -> List[str]:
+        """Character occurrences of a normalized string, numbered per character"""
+        seen = Counter()
+        grams = []
+        for char in text:
+            seen[char] += 1
+            grams.append(f"{char}{seen[char]}")
+        return grams
+
+    def candidates(self, query: str, min_similarity: float = 0.6) -> List[int]:
+        """
+        Title numbers worth scoring against a normalized query, in index order
+
+        A SequenceMatcher ratio is 2 * matches / total length, and its
+        matching blocks run in order through both strings, so matches never
+        exceed the longest common subsequence, which never exceeds the
+        characters the two strings have in common. Titles are first counted
+        for shared characters over the postings, then the survivors checked
+        against their longest common subsequence; only titles that cannot
+        reach min_similarity by either bound are left out. Unlike a
+        shared-substring filter, this never drops a title whose matching
+        blocks are all short (e.g. 'in' for 'king').
+        """
+        shared = Counter()
+        for gram in self.grams(query):
+            postings = self.postings.get(gram)
+            if postings:
+                shared.update(postings)
+
+        query_length = len(query)
+        titles = self.titles
+        # Bit i of a character's mask is set where the query has that character
+        masks = {}
+        for position, char in enumerate(query):
+            masks[char] = masks.get(char, 0) | (1 << position)
+
+        candidates = []
+        for number, count in shared.items():
+            title = titles[number]
+            needed = min_similarity * (query_length + len(title))
+            if 2 * count >= needed and 2 * self._common_subsequence(masks, query_length, title) >= needed:
+                candidates.append(number)
+        return sorted(candidates)
+
+    @staticmethod
+    def _common_subsequence(masks: Dict[str, int], query_length: int, title: str) -> int:
+        """Length of the longest common subsequence of the query (as masks) and a title, bit-parallel"""
+        # Hyyrö's bit-vector algorithm: the zero bits of row are the query positions the subsequence has used
+        row = (1 << query_length) - 1
+        for char in title:
+            matched = row & masks.get(char, 0)
+            if matched:
+                # Carries past the query length never reach back down, so the row is only masked at the end
+                row = (row + matched) | (row - matched)
+        return query_length - bin(row & ((1 << query_length) - 1)).count('1')
+
+def _to_little_endian(values: array) -> bytes:
+    """Serialise an array in little-endian byte order"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class _SectionWriter:
+    """Write typed sections and record where each one lives"""
+
+    def __init__(self, file):
+        self.file = file
+        self.sections = {}
+
+    def write(self, name: str, typecode: str, data: bytes):
+        offset = self.file.tell()
+        self.file.write(data)
+        self.file.write(b'\x00' * (-len(data) % 8))
+        self.sections[name] = [offset, len(data), typecode]
+
+    def writeArray(self, name: str, values: array):
+        self.write(name, values.typecode, _to_little_endian(values))
+
+    def writeStrings(self, name: str, strings: Iterable[str]):
+        offsets = array('Q', [0])
+        data = bytearray()
+        for string in strings:
+            data += string.encode('utf-8')
+            offsets.append(len(data))
+
+        self.writeArray(f'{name}.offsets', offsets)
+        self.write(f'{name}.data', 'B', bytes(data))
+
+    def writeDictionary(self, name: str, postings: Dict[str, List[int]],
+                        weights: Optional[Dict[str, List[float]]] = None):
+        """Terms sorted by their UTF-8 bytes, so readers can bisect on raw bytes"""
+        terms = sorted(postings, key=lambda term: term.encode('utf-8'))
+        offsets = array('Q', [0])
+        numbers = array('I')
+        term_weights = array('f')
+
+        for term in terms:
+            numbers.extend(postings[term])
+            offsets.append(len(numbers))
+            if weights is not None:
+                term_weights.extend(weights[term])
+
+        self.writeStrings(f'{name}.terms', terms)
+        self.writeArray(f'{name}.offsets', offsets)
+        self.writeArray(f'{name}.postings', numbers)
+        if weights is not None:
+            self.writeArray(f'{name}.weights', term_weights)
+
+def fileSource(path: str) -> Dict:
+    """Identity of a file something was built from: its real path, size and modification time"""
+    stat = os.stat(path)
+    return {'path': os.path.realpath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def sourcesMatch(sources: Optional[Dict[str, Dict]], paths: Dict[str, str]) -> bool:
+    """
+    Whether recorded fileSource identities are those of the given files as they are now
+
+    Args:
+        sources: fileSource of each file by role, as recorded at build time
+        paths: Path expected for each role
+
+    Returns:
+        True if something was recorded and every recorded role is the
+        expected file, unchanged
+    """
+    if not sources:
+        return False
+    try:
+        return all(role in paths and source == fileSource(paths[role]) for role, source in sources.items())
+    except OSError:
+        return False
+
+def writeBinaryIndex(index: Dict, catalog: Dict, path: str, sources: Optional[Dict[str, str]] = None) -> int:
+    """
+    Write a search index and its catalog entries as a binary index file
+
+    Args:
+        index: Search index from GutenbergCatalogParser.buildSearchIndex
+        catalog: Catalog the index was built from
+        path: Output file path
+        sources: Paths of the files the index and catalog were read from or
+            saved to, by role ('catalog', 'index'), recorded so readers can
+            tell whether the file still describes them
+
+    Returns:
+        Number of documents written
+    """
+    text_ids = [text_id for text_id in index['normalized_titles'] if text_id in catalog]
+    numbers = {text_id: number for number, text_id in enumerate(text_ids)}
+
+    def number_postings(postings: Dict[str, List[str]]) -> Dict[str, List[int]]:
+        numbered = {}
+        for term, ids in postings.items():
+            term_numbers = [numbers[text_id] for text_id in ids if text_id in numbers]
+            if term_numbers:
+                numbered[term] = term_numbers
+        return numbered
+
+    titles = {text_id: index['normalized_titles'][text_id] for text_id in text_ids}
+    characters = TitleCharacterIndex(titles)
+
+    bm25 = index.get('bm25') or {'postings': {}, 'doc_lengths': {}, 'total_length': 0.0}
+    bm25_numbers = {}
+    bm25_weights = {}
+    for term, postings in bm25['postings'].items():
+        kept = [(numbers[text_id], weight) for text_id, weight in postings if text_id in numbers]
+        if kept:
+            bm25_numbers[term] = [number for number, _ in kept]
+            bm25_weights[term] = [weight for _, weight in kept]
+
+    doc_lengths = array('f', (bm25['doc_lengths'].get(text_id, 0.0) for text_id in text_ids))
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        writer = _SectionWriter(f)
+
+        writer.writeStrings('text_ids', text_ids)
+        writer.writeStrings('titles', characters.titles)
+        writer.writeStrings('entries', (json.dumps(catalog[text_id], ensure_ascii=False, separators=(',', ':'))
+                                        for text_id in text_ids))
+        writer.writeDictionary('catalog', {text_id: [number] for text_id, number in numbers.items()})
+        for name in ID_DICTIONARIES:
+            writer.writeDictionary(name, number_postings(index[name]))
+        writer.writeDictionary('characters', characters.postings)
+        writer.writeDictionary('bm25', bm25_numbers, bm25_weights)
+        writer.writeArray('doc_lengths', doc_lengths)
+
+        footer = json.dumps({
+            'version': VERSION,
+            'documents': len(text_ids),
+            'bm25_total_length': sum(doc_lengths),
+            'sources': {role: fileSource(source) for role, source in (sources or {}).items()},
+            'sections': writer.sections
+        }).encode('utf-8')
+
+        f.write(footer)
+        f.write(FOOTER_LENGTH.pack(len(footer)))
+        f.write(MAGIC)
+
+    return len(text_ids)
+
+class _StringTable(Sequence):
+    """Strings of a string table section, decoded on access"""
+
+    def __init__(self, offsets, data, decode: bool = True):
+        self.offsets = offsets
+        self.data = data
+        self.decode = decode
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, number):
+        if isinstance(number, slice):
+            return [self[i] for i in range(*number.indices(len(self)))]
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError(number)
+
+        raw = bytes(self.data[self.offsets[number]:self.offsets[number + 1]])
+        return raw.decode('utf-8') if self.decode else raw
+
+class _TermDictionary(Mapping):
+    """Sorted term dictionary looked up by bisecting the raw term bytes"""
+
+    def __init__(self, terms: _StringTable, offsets, decode_postings: Callable[[int, int], list]):
+        self.terms = terms
+        self.raw_terms = _StringTable(terms.offsets, terms.data, decode=False)
+        self.offsets = offsets
+        self.decode_postings = decode_postings
+
+    def _find(self, term) -> int:
+        if not isinstance(term, str):
+            return -1
+        key = term.encode('utf-8')
+        position = bisect_left(self.raw_terms, key)
+        if position < len(self.raw_terms) and self.raw_terms[position] == key:
+            return position
+        return -1
+
+    def __getitem__(self, term):
+        position = self._find(term)
+        if position < 0:
+            raise KeyError(term)
+        return self.decode_postings(self.offsets[position], self.offsets[position + 1])
+
+    def __contains__(self, term) -> bool:
+        return self._find(term) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+class _NumberedMapping(Mapping):
+    """Mapping from document number to a value of a per-document sequence"""
+
+    def __init__(self, sequence: Sequence, decode: Callable = None):
+        self.sequence = sequence
+        self.decode = decode
+
+    def __getitem__(self, number):
+        if not isinstance(number, int) or not 0 <= number < len(self.sequence):
+            raise KeyError(number)
+        value = self.sequence[number]
+        return self.decode(number, value) if self.decode else value
+
+    def __contains__(self, number) -> bool:
+        return isinstance(number, int) and 0 <= number < len(self.sequence)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self.sequence)))
+
+    def __len__(self) -> int:
+        return len(self.sequence)
+
+class _MappedCharacterIndex(TitleCharacterIndex):
+    """TitleCharacterIndex whose titles and postings are read from the index file"""
+
+    def __init__(self, titles: _StringTable, postings: _TermDictionary):
+        self.source = None
+        self.text_ids = range(len(titles))
+        self.titles = titles
+        self.postings = postings
+
+class BinarySearchIndex(Mapping):
+    """
+    Memory-mapped reader for files written by writeBinaryIndex
+
+    The reader stands in for both the JSON search index and the catalog in
+    GutenbergCatalogParser.searchByTitle: index sections are exposed under the
+    same keys, with document numbers in place of text IDs, plus a 'text_ids'
+    table mapping document numbers back to text IDs; `catalog` maps document
+    numbers to the stored entries (which carry their own text_id).
+    Pass the reader as the index and reader.catalog as the catalog.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.map[:len(MAGIC)] != MAGIC or self.map[-len(MAGIC):] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a Gutenberg index file: {path}")
+
+        footer_end = len(self.map) - len(MAGIC) - FOOTER_LENGTH.size
+        (footer_length,) = FOOTER_LENGTH.unpack_from(self.map, footer_end)
+        footer = json.loads(self.map[footer_end - footer_length:footer_end].decode('utf-8'))
+        if footer.get('version') != VERSION:
+            self.close()
+            raise ValueError(f"Gutenberg index file {path} has version {footer.get('version')}, "
+                             f"expected {VERSION}; rebuild it")
+
+        self.documents = footer['documents']
+        self.sources = footer.get('sources', {})
+        self.sections = footer['sections']
+
+        text_ids = self._strings('text_ids')
+        titles = self._strings('titles')
+        entries = self._strings('entries')
+        doc_lengths = self._section('doc_lengths')
+
+        def entry(number: int, raw: str) -> Dict:
+            data = json.loads(raw)
+            data.setdefault('text_id', text_ids[number])
+            return data
+
+        self.text_ids = text_ids
+        self.catalog = _NumberedMapping(entries, entry)
+        self.numbers = self._dictionary('catalog')
+
+        self.tables = {name: self._dictionary(name) for name in ID_DICTIONARIES}
+        self.tables['normalized_titles'] = _NumberedMapping(titles)
+        self.tables['text_ids'] = text_ids
+        self.tables['title_characters'] = _MappedCharacterIndex(titles, self._dictionary('characters'))
+
+        weights = self._section('bm25.weights')
+        bm25_numbers = self._section('bm25.postings')
+        self.tables['bm25'] = {
+            'postings': self._dictionary('bm25', lambda start, end: list(zip(bm25_numbers[start:end],
+                                                                             weights[start:end]))),
+            # Indexed directly by document number in the BM25 inner loop
+            'doc_lengths': doc_lengths,
+            'total_length': footer['bm25_total_length']
+        }
+
+    def _section(self, name: str):
+        """Typed view of a section (a little-endian copy on big-endian hosts)"""
+        offset, length, typecode = self.sections[name]
+        if sys.byteorder == 'big' and typecode != 'B':
+            values = array(typecode)
+            values.frombytes(self.map[offset:offset + length])
+            values.byteswap()
+            return values
+        return memoryview(self.map)[offset:offset + length].cast(typecode)
+
+    def _strings(self, name: str) -> _StringTable:
+        return _StringTable(self._section(f'{name}.offsets'), self._section(f'{name}.data'))
+
+    def _dictionary(self, name: str, decode_postings: Callable[[int, int], list] = None) -> _TermDictionary:
+        if decode_postings is None:
+            postings = self._section(f'{name}.postings')
+
+            def decode_postings(start: int, end: int) -> List[int]:
+                return postings[start:end].tolist()
+
+        return _TermDictionary(self._strings(f'{name}.terms'), self._section(f'{name}.offsets'), decode_postings)
+
+    def isBuiltFrom(self, paths: Dict[str, str]) -> bool:
+        """Whether the file was written from these (unchanged) files, by role; see writeBinaryIndex"""
+        return sourcesMatch(self.sources, paths)
+
+    def documentNumber(self, text_id: str) -> Optional[int]:
+        """Document number of a text ID, or None if it is not in the index"""
+        numbers = self.numbers.get(str(text_id))
+        return numbers[0] if numbers else None
+
+    def __getitem__(self, key: str):
+        return self.tables[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def close(self):
+        # Drop the section views first: the map cannot close while they exist
+        self.tables = {}
+        self.catalog = self.numbers = self.text_ids = None
+        if not self.map.closed:
+            try:
+                self.map.close()
+            except BufferError:
+                # Views handed out to callers are still alive; the map closes with them
+                pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -7,6 +7,7 @@ of Project Gutenberg texts with download URLs and metadata.
 """
 
 import csv
+import io
 import json
 import tarfile
 import bz2
@@ -14,24 +15,187 @@ import os
 import re
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urljoin
 import argparse
+import heapq
+import math
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
 import logging
+import time
+from gutenberg_index import TitleCharacterIndex, fileSource, writeBinaryIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# An RDF file path, or the raw bytes of an archive member
+RDFSource = Union[str, bytes]
+
+# ElementTree's namespace registry is process-wide, so it is filled only once
+_rdf_namespaces_registered = False
+
+def _register_rdf_namespaces(namespaces: Dict[str, str]):
+    """Register the RDF namespace prefixes for this process"""
+    global _rdf_namespaces_registered
+    if _rdf_namespaces_registered:
+        return
+
+    for prefix, uri in namespaces.items():
+        ET.register_namespace(prefix, uri)
+    _rdf_namespaces_registered = True
+
+class CatalogStatistics:
+    """
+    Catalog statistics maintained incrementally as entries are added
+
+    Counts, per-author totals, a download histogram and top-N lists are
+    updated per entry, so they can be written as a sidecar next to the
+    catalog and read back without touching the catalog itself. A saved
+    sidecar records which catalog file it describes.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.total_texts = 0
+        self.texts_with_urls = 0
+        self.texts_with_downloads = 0
+        self.total_downloads = 0
+        self.author_counts = Counter()
+        self.download_histogram = Counter()
+        # Min-heap of (downloads, -sequence, text_id, title) for the most
+        # downloaded texts; on ties the entry added first ranks higher
+        self._top_downloads = []
+        self._sequence = 0
+        # fileSource of the files the statistics describe, by role, as of the last save
+        self.sources = {}
+
+    @staticmethod
+    def downloadBucket(downloads: int) -> str:
+        """Histogram bucket of a download count: '0', '1-9', '10-99', ..."""
+        if downloads <= 0:
+            return '0'
+        digits = len(str(downloads))
+        return f"{10 ** (digits - 1)}-{10 ** digits - 1}"
+
+    def addEntry(self, entry: Dict):
+        """Count one catalog entry"""
+        self.total_texts += 1
+
+        if entry.get('text_url'):
+            self.texts_with_urls += 1
+
+        author = entry.get('primary_author', 'Unknown')
+        if author:
+            self.author_counts[author] += 1
+
+        downloads = entry.get('downloads') or 0
+        self.download_histogram[self.downloadBucket(downloads)] += 1
+        if downloads:
+            self.texts_with_downloads += 1
+            self.total_downloads += downloads
+
+            item = (downloads, -self._sequence, str(entry.get('text_id', '')), entry.get('title', ''))
+            self._sequence += 1
+            if len(self._top_downloads) < self.top_n:
+                heapq.heappush(self._top_downloads, item)
+            elif item > self._top_downloads[0]:
+                heapq.heapreplace(self._top_downloads, item)
+
+    def toDict(self) -> Dict:
+        """Serializable statistics, including the top-N lists"""
+        top_downloaded = [{'text_id': text_id, 'title': title, 'downloads': downloads}
+                          for downloads, _, text_id, title in sorted(self._top_downloads, reverse=True)]
+
+        return {
+            'total_texts': self.total_texts,
+            'texts_with_urls': self.texts_with_urls,
+            'texts_with_downloads': self.texts_with_downloads,
+            'total_downloads': self.total_downloads,
+            'average_downloads': (self.total_downloads / self.texts_with_downloads
+                                  if self.texts_with_downloads else 0),
+            'max_downloads': top_downloaded[0]['downloads'] if top_downloaded else 0,
+            'most_downloaded': top_downloaded[0] if top_downloaded else None,
+            'top_n': self.top_n,
+            'top_authors': [[author, count] for author, count in self.author_counts.most_common(self.top_n)],
+            'top_downloaded': top_downloaded,
+            'download_histogram': dict(self.download_histogram),
+            'author_counts': dict(self.author_counts),
+            'sources': self.sources
+        }
+
+    @classmethod
+    def fromDict(cls, data: Dict) -> 'CatalogStatistics':
+        """Resume incremental statistics from a saved sidecar"""
+        stats = cls(data.get('top_n', 10))
+        stats.total_texts = data['total_texts']
+        stats.texts_with_urls = data['texts_with_urls']
+        stats.texts_with_downloads = data['texts_with_downloads']
+        stats.total_downloads = data['total_downloads']
+        stats.author_counts = Counter(data['author_counts'])
+        stats.download_histogram = Counter(data['download_histogram'])
+        stats._top_downloads = [(item['downloads'], -sequence, item['text_id'], item['title'])
+                                for sequence, item in enumerate(data['top_downloaded'])]
+        stats._sequence = len(stats._top_downloads)
+        heapq.heapify(stats._top_downloads)
+        stats.sources = data.get('sources', {})
+        return stats
+
+    @classmethod
+    def fromCatalog(cls, catalog: Dict, top_n: int = 10) -> 'CatalogStatistics':
+        stats = cls(top_n)
+        for entry in catalog.values():
+            stats.addEntry(entry)
+        return stats
+
+    def save(self, path: str, sources: Optional[Dict[str, str]] = None):
+        """
+        Write the statistics as a JSON sidecar
+
+        Args:
+            path: Output file path
+            sources: Paths of the files the statistics describe, by role
+                ('catalog'), recorded with their size and modification time
+        """
+        self.sources = {role: fileSource(source) for role, source in (sources or {}).items()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.toDict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'CatalogStatistics':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.fromDict(json.load(f))
+
 class GutenbergCatalogParser:
     """Parser for Project Gutenberg catalog data"""
 
+    # Precompiled once, as they run for every CSV row
+    TITLE_SUFFIX_PATTERNS = [
+        re.compile(r'\s*\(.*?Project Gutenberg.*?\)', re.IGNORECASE),
+        re.compile(r'\s*\[.*?Project Gutenberg.*?\]', re.IGNORECASE),
+        re.compile(r'\s*—.*?Project Gutenberg.*', re.IGNORECASE),
+    ]
+    AUTHOR_DATES_PATTERN = re.compile(r'\s*\([^)]*\)')
+    WORD_PATTERN = re.compile(r'\b\w+\b')
+
+    # BM25 ranking: per-field term weights and the usual k1/b parameters
+    BM25_FIELD_WEIGHTS = {
+        'title': 3.0,
+        'authors': 2.0,
+        'subjects': 1.0,
+        'bookshelves': 1.0
+    }
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+
     def __init__(self, input_dir: str, output_dir: str = "."):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.catalog = {}
         self.search_index = {}
+        self._character_index = None
 
         # Ensure output directory exists
         self.output_dir.mkdir(exist_ok=True)
@@ -45,6 +209,20 @@ class GutenbergCatalogParser:
             'cc': 'http://web.resource.org/cc/'
         }
 
+        # Expanded tag names matched while iterparsing RDF files
+        pgterms = '{' + self.namespaces['pgterms'] + '}'
+        dcterms = '{' + self.namespaces['dcterms'] + '}'
+        rdf = '{' + self.namespaces['rdf'] + '}'
+        self.rdf_tags = {
+            'ebook': pgterms + 'ebook',
+            'file': pgterms + 'file',
+            'downloads': pgterms + 'downloads',
+            'format': dcterms + 'format',
+            'value': rdf + 'value',
+            'about': rdf + 'about'
+        }
+        _register_rdf_namespaces(self.namespaces)
+
     def parseCSVCatalog(self, csv_path: str) -> Dict:
         """
         Parse pg_catalog.csv to build initial index
@@ -55,67 +233,82 @@ class GutenbergCatalogParser:
         Returns:
             Dictionary with text_id as key and basic metadata as value
         """
-        logger.info(f"Parsing CSV catalog: {csv_path}")
         catalog = {}
+        for entry in self.iterCSVCatalog(csv_path):
+            catalog[str(entry['text_id'])] = entry
+
+        return catalog
+
+    def iterCSVCatalog(self, csv_path: str) -> Iterator[Dict]:
+        """
+        Stream normalized English catalog entries from pg_catalog.csv
+
+        Rows are yielded as soon as they are parsed, so memory stays flat no
+        matter how large the catalog is.
+
+        Args:
+            csv_path: Path to the CSV catalog file
+
+        Yields:
+            Catalog entry dictionaries in CSV order
+        """
+        logger.info(f"Parsing CSV catalog: {csv_path}")
+        found = 0
 
         try:
             with open(csv_path, 'r', encoding='utf-8', newline='') as csvfile:
                 reader = csv.DictReader(csvfile)
 
                 for row_num, row in enumerate(reader, 1):
-                    try:
-                        text_id = row.get('Text#', '').strip()
-                        if not text_id or not text_id.isdigit():
-                            continue
-
-                        text_id = int(text_id)
-                        language = row.get('Language', '').strip()
-
-                        # Filter for English texts only
-                        if language != 'en':
-                            continue
-
-                        title = row.get('Title', '').strip()
-                        authors = row.get('Authors', '').strip()
-                        subjects = row.get('Subjects', '').strip()
-                        locc = row.get('LoCC', '').strip()
-                        bookshelves = row.get('Bookshelves', '').strip()
-                        issued = row.get('Issued', '').strip()
-
-                        # Clean and normalize title
-                        title = self._clean_title(title)
-
-                        # Parse authors
-                        author_list = self._parse_authors(authors)
-
-                        catalog[str(text_id)] = {
-                            'text_id': text_id,
-                            'title': title,
-                            'authors': author_list,
-                            'primary_author': author_list[0] if author_list else '',
-                            'language': language,
-                            'subjects': subjects,
-                            'locc': locc,
-                            'bookshelves': bookshelves,
-                            'issued': issued,
-                            'text_url': None,  # Will be filled from RDF
-                            'local_path': None,
-                            'file_formats': {}
-                        }
-
-                        if row_num % 1000 == 0:
-                            logger.info(f"Processed {row_num} CSV rows, {len(catalog)} English texts")
+                    if row_num % 1000 == 0:
+                        logger.info(f"Processed {row_num} CSV rows, {found} English texts")
 
+                    try:
+                        entry = self._csv_row_to_entry(row)
                     except Exception as e:
                         logger.warning(f"Error processing CSV row {row_num}: {e}")
                         continue
 
+                    if entry is not None:
+                        found += 1
+                        yield entry
+
         except Exception as e:
             logger.error(f"Error reading CSV file: {e}")
             raise
 
-        logger.info(f"CSV parsing complete: {len(catalog)} English texts found")
-        return catalog
+        logger.info(f"CSV parsing complete: {found} English texts found")
+
+    def _csv_row_to_entry(self, row: Dict[str, str]) -> Optional[Dict]:
+        """Normalize one CSV row into a catalog entry (None for non-English or invalid rows)"""
+
+        text_id = row.get('Text#', '').strip()
+        if not text_id or not text_id.isdigit():
+            return None
+
+        language = row.get('Language', '').strip()
+
+        # Filter for English texts only
+        if language != 'en':
+            return None
+
+        # Parse authors
+        author_list = self._parse_authors(row.get('Authors', '').strip())
+
+        return {
+            'text_id': int(text_id),
+            'title': self._clean_title(row.get('Title', '').strip()),
+            'authors': author_list,
+            'primary_author': author_list[0] if author_list else '',
+            'language': language,
+            'subjects': row.get('Subjects', '').strip(),
+            'locc': row.get('LoCC', '').strip(),
+            'bookshelves': row.get('Bookshelves', '').strip(),
+            'issued': row.get('Issued', '').strip(),
+            'text_url': None,  # Will be filled from RDF
+            'local_path': None,
+            'file_formats': {}
+        }
 
     def extractRDFArchive(self, tar_path: str, output_dir: str) -> str:
         """
@@ -151,12 +344,19 @@ class GutenbergCatalogParser:
             logger.error(f"Error extracting RDF archive: {e}")
             raise
 
-    def parseRDFMetadata(self, rdf_dir: str) -> Dict:
+    def parseRDFMetadata(self, rdf_dir: str, workers: Optional[int] = None, limit: Optional[int] = None,
+                         chunk_size: int = 500) -> Dict:
         """
         Parse individual RDF files for detailed metadata
 
+        The RDF files are split into chunks that are parsed across a process
+        pool; per-worker results are merged in directory order.
+
         Args:
             rdf_dir: Directory containing RDF files
+            workers: Worker processes (defaults to the CPU count; 1 parses serially)
+            limit: Maximum number of RDF files to parse (None for the full corpus)
+            chunk_size: RDF files per unit of work sent to a worker
 
         Returns:
             Dictionary with enhanced metadata including download URLs
@@ -168,119 +368,273 @@ class GutenbergCatalogParser:
             logger.error(f"RDF directory not found: {rdf_dir}")
             return {}
 
-        # Find the actual RDF files directory (may be nested)
-        rdf_files_dir = None
-        for item in rdf_path.rglob("*"):
-            if item.is_dir() and "cache/epub" in str(item):
-                rdf_files_dir = item
-                break
-
-        if not rdf_files_dir:
-            # Look for any directory with numbered subdirectories
-            for item in rdf_path.iterdir():
-                if item.is_dir():
-                    subdirs = [d for d in item.iterdir() if d.is_dir() and d.name.isdigit()]
-                    if subdirs:
-                        rdf_files_dir = item
-                        break
-
+        rdf_files_dir = self._find_rdf_files_dir(rdf_path)
         if not rdf_files_dir:
             logger.error("Could not find RDF files directory structure")
             return {}
 
         logger.info(f"Found RDF files in: {rdf_files_dir}")
 
+        rdf_files = self._list_rdf_files(rdf_files_dir)
+        if limit is not None:
+            rdf_files = rdf_files[:limit]
+
+        chunks = [rdf_files[i:i + chunk_size] for i in range(0, len(rdf_files), chunk_size)]
+        return self._parse_rdf_chunks(chunks, workers, total=len(rdf_files))
+
+    def parseRDFArchive(self, tar_path: str, workers: Optional[int] = None, limit: Optional[int] = None,
+                        chunk_size: int = 500) -> Dict:
+        """
+        Parse RDF metadata straight from rdf-files.tar.bz2 without extracting it
+
+        The archive is decompressed as a stream, member by member; each RDF
+        payload is read into memory and handed to the parser pool, so nothing
+        is written to disk.
+
+        Args:
+            tar_path: Path to the tar.bz2 archive
+            workers: Worker processes (defaults to the CPU count; 1 parses serially)
+            limit: Maximum number of RDF files to parse (None for the full archive)
+            chunk_size: RDF files per unit of work sent to a worker
+
+        Returns:
+            Dictionary with enhanced metadata including download URLs
+        """
+        logger.info(f"Streaming RDF metadata from archive: {tar_path}")
+
+        def payload_chunks() -> Iterator[List[Tuple[str, bytes]]]:
+            chunk = []
+            seen = 0
+            for text_id, payload in self.iterRDFArchive(tar_path):
+                chunk.append((text_id, payload))
+                seen += 1
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+                if limit is not None and seen >= limit:
+                    break
+            if chunk:
+                yield chunk
+
+        return self._parse_rdf_chunks(payload_chunks(), workers)
+
+    def iterRDFArchive(self, tar_path: str) -> Iterator[Tuple[str, bytes]]:
+        """
+        Stream (text_id, rdf_bytes) pairs from an RDF tar.bz2 archive
+
+        Uses tarfile's sequential stream mode, so the archive is read once
+        front to back and never seeks or extracts.
+        """
+        try:
+            with tarfile.open(tar_path, 'r|bz2') as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+
+                    name = os.path.basename(member.name)
+                    text_id = name[2:-4]
+                    if not (name.startswith('pg') and name.endswith('.rdf') and text_id.isdigit()):
+                        continue
+
+                    rdf_file = tar.extractfile(member)
+                    if rdf_file is not None:
+                        yield text_id, rdf_file.read()
+
+        except Exception as e:
+            logger.error(f"Error reading RDF archive: {e}")
+            raise
+
+    def _parse_rdf_chunks(self, chunks: Iterable[List[Tuple[str, RDFSource]]], workers: Optional[int] = None,
+                          total: Optional[int] = None) -> Dict:
+        """
+        Parse chunks of RDF sources across a process pool, merging results in order
+
+        At most two chunks per worker are in flight, so a streamed archive is
+        never held in memory all at once.
+        """
+        workers = workers or os.cpu_count() or 1
+        logger.info(f"Parsing RDF files with {workers} workers")
+
+        start = time.perf_counter()
         rdf_metadata = {}
-        processed = 0
+        done = 0
+
+        def report(chunk_files: int):
+            nonlocal done
+            done += chunk_files
+            elapsed = time.perf_counter() - start
+            rate = done / elapsed if elapsed else 0.0
+            if total:
+                remaining = (total - done) / rate if rate else 0.0
+                logger.info(f"Processed {done}/{total} RDF files ({rate:,.0f} files/s, ~{remaining:.0f}s left)")
+            else:
+                logger.info(f"Processed {done} RDF files ({rate:,.0f} files/s)")
+
+        if workers == 1:
+            for chunk in chunks:
+                rdf_metadata.update(self._parse_rdf_chunk(chunk))
+                report(len(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_rdf_worker,
+                                     initargs=(str(self.input_dir), str(self.output_dir))) as executor:
+                pending = deque()
+                chunks = iter(chunks)
+
+                while True:
+                    while len(pending) < workers * 2:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        pending.append((len(chunk), executor.submit(_parse_rdf_chunk_in_worker, chunk)))
+
+                    if not pending:
+                        break
+
+                    # Merge in submission order so the result matches a serial run
+                    size, future = pending.popleft()
+                    rdf_metadata.update(future.result())
+                    report(size)
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"RDF parsing complete: {len(rdf_metadata)} files processed in {elapsed:.1f}s "
+                    f"({done / elapsed if elapsed else 0.0:,.0f} files/s)")
+        return rdf_metadata
+
+    def _find_rdf_files_dir(self, rdf_path: Path) -> Optional[Path]:
+        """Locate the directory holding the numbered RDF subdirectories (may be nested)"""
+
+        for item in rdf_path.rglob("*"):
+            if item.is_dir() and "cache/epub" in str(item):
+                return item
+
+        # Look for any directory with numbered subdirectories
+        for item in rdf_path.iterdir():
+            if item.is_dir():
+                subdirs = [d for d in item.iterdir() if d.is_dir() and d.name.isdigit()]
+                if subdirs:
+                    return item
 
-        # Process RDF files
+        return None
+
+    def _list_rdf_files(self, rdf_files_dir: Path) -> List[Tuple[str, str]]:
+        """List (text_id, rdf_file) pairs for every numbered subdirectory with an RDF file"""
+
+        rdf_files = []
         for text_dir in rdf_files_dir.iterdir():
             if not text_dir.is_dir() or not text_dir.name.isdigit():
                 continue
 
             text_id = text_dir.name
             rdf_file = text_dir / f"pg{text_id}.rdf"
+            if rdf_file.exists():
+                rdf_files.append((text_id, str(rdf_file)))
 
-            if not rdf_file.exists():
-                continue
+        return rdf_files
 
+    def _parse_rdf_chunk(self, rdf_files: List[Tuple[str, RDFSource]]) -> Dict:
+        """Parse a chunk of RDF files (paths or raw archive payloads) into a text_id -> metadata dict"""
+
+        rdf_metadata = {}
+        for text_id, rdf_file in rdf_files:
             try:
-                metadata = self._parse_single_rdf(str(rdf_file), text_id)
+                source = io.BytesIO(rdf_file) if isinstance(rdf_file, bytes) else rdf_file
+                metadata = self._parse_single_rdf(source, text_id)
                 if metadata:
                     rdf_metadata[text_id] = metadata
-                    processed += 1
-
-                    if processed % 100 == 0:
-                        logger.info(f"Processed {processed} RDF files")
-
-                    # Limit for testing
-                    if processed >= 1000:  # Process first 1000 for testing
-                        logger.info("Limiting to first 1000 RDF files for testing")
-                        break
-
             except Exception as e:
-                logger.warning(f"Error parsing RDF file {rdf_file}: {e}")
-                continue
+                name = f"pg{text_id}.rdf" if isinstance(rdf_file, bytes) else rdf_file
+                logger.warning(f"Error parsing RDF file {name}: {e}")
 
-        logger.info(f"RDF parsing complete: {len(rdf_metadata)} files processed")
         return rdf_metadata
 
-    def _parse_single_rdf(self, rdf_file: str, text_id: str) -> Optional[Dict]:
-        """Parse a single RDF file and extract metadata"""
-        try:
-            tree = ET.parse(rdf_file)
-            root = tree.getroot()
-
-            # Register namespaces
-            for prefix, uri in self.namespaces.items():
-                ET.register_namespace(prefix, uri)
-
-            metadata = {
-                'downloads': 0,
-                'file_formats': {},
-                'text_url': None
-            }
+    def _parse_single_rdf(self, rdf_file: Union[str, BinaryIO], text_id: str) -> Optional[Dict]:
+        """
+        Parse a single RDF file (path or binary file object) and extract metadata
 
-            # Find the main ebook element
-            ebook_elem = root.find('.//pgterms:ebook', self.namespaces)
-            if ebook_elem is None:
-                return None
-
-            # Extract download count
-            downloads_elem = ebook_elem.find('.//pgterms:downloads', self.namespaces)
-            if downloads_elem is not None:
-                try:
-                    metadata['downloads'] = int(downloads_elem.text)
-                except (ValueError, TypeError):
-                    pass
-
-            # Extract file formats and URLs
-            for file_elem in ebook_elem.findall('.//pgterms:file', self.namespaces):
-                about = file_elem.get('{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about', '')
-
-                # Get format information
-                format_elem = file_elem.find('.//dcterms:format//rdf:value', self.namespaces)
-                if format_elem is not None:
-                    format_type = format_elem.text
-
-                    # Look for plain text files
-                    if 'text/plain' in format_type:
-                        if 'charset=utf-8' in format_type or 'utf-8' in about:
-                            metadata['text_url'] = about
-                        metadata['file_formats']['text'] = about
-                    elif 'text/html' in format_type:
-                        metadata['file_formats']['html'] = about
-                    elif 'application/epub' in format_type:
-                        metadata['file_formats']['epub'] = about
-                    elif 'application/pdf' in format_type:
-                        metadata['file_formats']['pdf'] = about
-
-            return metadata
+        The document is read incrementally: elements are cleared as soon as
+        they close and parsing stops at the end of the first pgterms:ebook,
+        which holds the download count and every file format.
+        """
+        try:
+            if isinstance(rdf_file, str):
+                with open(rdf_file, 'rb') as f:
+                    return self._iterparse_rdf(f)
+            return self._iterparse_rdf(rdf_file)
 
         except Exception as e:
             logger.debug(f"Error parsing RDF {rdf_file}: {e}")
             return None
 
+    def _iterparse_rdf(self, source: BinaryIO) -> Optional[Dict]:
+        """Collect downloads and file formats from the first ebook element of an RDF stream"""
+
+        tags = self.rdf_tags
+        metadata = None
+        downloads_seen = False
+        file_about = None
+        format_depth = 0
+        format_found = False
+        format_type = None
+
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            tag = elem.tag
+
+            if event == 'start':
+                if metadata is None:
+                    if tag == tags['ebook']:
+                        metadata = {
+                            'downloads': 0,
+                            'file_formats': {},
+                            'text_url': None
+                        }
+                elif tag == tags['file'] and file_about is None:
+                    file_about = elem.get(tags['about'], '')
+                    format_found = False
+                elif tag == tags['format'] and file_about is not None:
+                    format_depth += 1
+                continue
+
+            if metadata is not None:
+                if tag == tags['ebook']:
+                    break
+
+                if tag == tags['value']:
+                    if format_depth and not format_found:
+                        format_found = True
+                        format_type = elem.text
+                elif tag == tags['format']:
+                    if file_about is not None:
+                        format_depth -= 1
+                elif tag == tags['file'] and file_about is not None:
+                    if format_found:
+                        self._add_rdf_file_format(metadata, file_about, format_type)
+                    file_about = None
+                elif tag == tags['downloads'] and not downloads_seen:
+                    downloads_seen = True
+                    try:
+                        metadata['downloads'] = int(elem.text)
+                    except (ValueError, TypeError):
+                        pass
+
+            elem.clear()
+
+        return metadata
+
+    def _add_rdf_file_format(self, metadata: Dict, about: str, format_type: str) -> None:
+        """Record a pgterms:file URL under its format"""
+
+        # Look for plain text files
+        if 'text/plain' in format_type:
+            if 'charset=utf-8' in format_type or 'utf-8' in about:
+                metadata['text_url'] = about
+            metadata['file_formats']['text'] = about
+        elif 'text/html' in format_type:
+            metadata['file_formats']['html'] = about
+        elif 'application/epub' in format_type:
+            metadata['file_formats']['epub'] = about
+        elif 'application/pdf' in format_type:
+            metadata['file_formats']['pdf'] = about
+
     def buildSearchIndex(self, catalog: Dict) -> Dict:
         """
         Build searchable title index with fuzzy matching capabilities
@@ -292,45 +646,145 @@ class GutenbergCatalogParser:
             Search index dictionary
         """
         logger.info("Building search index")
-        index = {
+        index = self._new_search_index()
+
+        for text_id, entry in catalog.items():
+            self._index_entry(index, text_id, entry)
+
+        logger.info(f"Search index built: {len(index['by_title'])} titles, {len(index['by_author'])} authors")
+        return index
+
+    def _new_search_index(self) -> Dict:
+        """Empty search index structure"""
+        return {
             'by_title': {},
             'by_author': {},
             'by_word': {},
-            'normalized_titles': {}
+            'normalized_titles': {},
+            'bm25': {
+                'postings': {},
+                'doc_lengths': {},
+                'total_length': 0.0
+            }
         }
 
-        for text_id, entry in catalog.items():
-            title = entry.get('title', '')
-            author = entry.get('primary_author', '')
+    def _index_entry(self, index: Dict, text_id: str, entry: Dict):
+        """Add one catalog entry to a search index"""
+        title = entry.get('title', '')
+        author = entry.get('primary_author', '')
+
+        # Normalize titles for better matching
+        normalized_title = self._normalize_for_search(title)
+        index['normalized_titles'][text_id] = normalized_title
+
+        # Index by title
+        if title:
+            title_key = title.lower()
+            if title_key not in index['by_title']:
+                index['by_title'][title_key] = []
+            index['by_title'][title_key].append(text_id)
+
+        # Index by author
+        if author:
+            author_key = author.lower()
+            if author_key not in index['by_author']:
+                index['by_author'][author_key] = []
+            index['by_author'][author_key].append(text_id)
+
+        # Index by words in title
+        words = self.WORD_PATTERN.findall(title.lower())
+        for word in words:
+            if len(word) > 2:  # Skip very short words
+                if word not in index['by_word']:
+                    index['by_word'][word] = []
+                index['by_word'][word].append(text_id)
+
+        self._index_bm25_entry(index['bm25'], text_id, entry)
+
+    def _index_bm25_entry(self, bm25: Dict, text_id: str, entry: Dict):
+        """
+        Add one entry's field-weighted term frequencies to the BM25 postings
 
-            # Normalize titles for better matching
-            normalized_title = self._normalize_for_search(title)
-            index['normalized_titles'][text_id] = normalized_title
+        Each posting is a [text_id, weighted_tf] pair; the weighted document
+        length is kept alongside for length normalization at query time.
+        """
+        term_frequencies = Counter()
+        for field, weight in self.BM25_FIELD_WEIGHTS.items():
+            value = entry.get(field) or ''
+            if isinstance(value, list):
+                value = ' '.join(value)
+            for term in self._search_terms(value):
+                term_frequencies[term] += weight
+
+        if not term_frequencies:
+            return
+
+        postings = bm25['postings']
+        for term, frequency in term_frequencies.items():
+            term_postings = postings.get(term)
+            if term_postings is None:
+                postings[term] = [[text_id, frequency]]
+            else:
+                term_postings.append([text_id, frequency])
+
+        doc_length = sum(term_frequencies.values())
+        bm25['doc_lengths'][text_id] = doc_length
+        bm25['total_length'] += doc_length
+
+    def _search_terms(self, text: str) -> List[str]:
+        """Lowercased words of a field or query, skipping very short words"""
+        return [word for word in self.WORD_PATTERN.findall(text.lower()) if len(word) > 2]
+
+    def rankFullText(self, query: str, index: Dict, catalog: Dict, limit: int = 20,
+                     exclude: Optional[set] = None) -> List[Tuple[float, str]]:
+        """
+        BM25-rank catalog entries against a query over title, authors, subjects and bookshelves
 
-            # Index by title
-            if title:
-                title_key = title.lower()
-                if title_key not in index['by_title']:
-                    index['by_title'][title_key] = []
-                index['by_title'][title_key].append(text_id)
+        Args:
+            query: Search query
+            index: Pre-built search index (must contain the 'bm25' section)
+            catalog: Main catalog; entries missing from it are skipped
+            limit: Maximum number of results
+            exclude: Text IDs to leave out of the ranking
 
-            # Index by author
-            if author:
-                author_key = author.lower()
-                if author_key not in index['by_author']:
-                    index['by_author'][author_key] = []
-                index['by_author'][author_key].append(text_id)
-
-            # Index by words in title
-            words = re.findall(r'\b\w+\b', title.lower())
-            for word in words:
-                if len(word) > 2:  # Skip very short words
-                    if word not in index['by_word']:
-                        index['by_word'][word] = []
-                    index['by_word'][word].append(text_id)
+        Returns:
+            Up to limit (score, text_id) pairs, best first (ties by text ID)
+        """
+        bm25 = index.get('bm25')
+        if not bm25 or not bm25['doc_lengths']:
+            return []
 
-        logger.info(f"Search index built: {len(index['by_title'])} titles, {len(index['by_author'])} authors")
-        return index
+        doc_lengths = bm25['doc_lengths']
+        doc_count = len(doc_lengths)
+        average_length = bm25['total_length'] / doc_count
+        k1 = self.BM25_K1
+        b = self.BM25_B
+
+        scores = {}
+        for term in set(self._search_terms(query)):
+            postings = bm25['postings'].get(term)
+            if not postings:
+                continue
+
+            doc_frequency = len(postings)
+            idf = math.log(1 + (doc_count - doc_frequency + 0.5) / (doc_frequency + 0.5))
+            for text_id, frequency in postings:
+                norm = k1 * (1 - b + b * doc_lengths[text_id] / average_length)
+                scores[text_id] = scores.get(text_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+
+        exclude = exclude or ()
+        candidates = ((score, text_id) for text_id, score in scores.items()
+                      if text_id in catalog and text_id not in exclude)
+
+        # Equal scores go to the lower text ID; a binary index keys documents
+        # by number, so their text IDs are looked up to order them the same way
+        text_ids = index.get('text_ids')
+
+        def rank(candidate: Tuple[float, str]) -> Tuple[float, int, str]:
+            text_id = text_ids[candidate[1]] if text_ids is not None else candidate[1]
+            return (-candidate[0], len(text_id), text_id)
+
+        return heapq.nsmallest(limit, candidates, key=rank)
 
     def searchByTitle(self, query: str, index: Dict, catalog: Dict, limit: int = 20) -> List[Dict]:
         """
@@ -347,11 +801,13 @@ class GutenbergCatalogParser:
         """
         query_normalized = self._normalize_for_search(query)
         results = []
+        seen = set()
 
         # Exact title matches first
         exact_matches = index['by_title'].get(query.lower(), [])
         for text_id in exact_matches:
             if text_id in catalog:
+                seen.add(text_id)
                 results.append({
                     'text_id': text_id,
                     'score': 1.0,
@@ -359,11 +815,14 @@ class GutenbergCatalogParser:
                     **catalog[text_id]
                 })
 
-        # Fuzzy title matches
-        for text_id, normalized_title in index['normalized_titles'].items():
-            if text_id in catalog and text_id not in [r['text_id'] for r in results]:
-                similarity = SequenceMatcher(None, query_normalized, normalized_title).ratio()
+        # Fuzzy title matches, scored only for titles with enough characters in common
+        character_index = self.titleCharacterIndex(index)
+        for number in character_index.candidates(query_normalized):
+            text_id = character_index.text_ids[number]
+            if text_id in catalog and text_id not in seen:
+                similarity = SequenceMatcher(None, query_normalized, character_index.titles[number]).ratio()
                 if similarity > 0.6:  # Similarity threshold
+                    seen.add(text_id)
                     results.append({
                         'text_id': text_id,
                         'score': similarity,
@@ -371,22 +830,44 @@ class GutenbergCatalogParser:
                         **catalog[text_id]
                     })
 
-        # Word-based matches
-        query_words = re.findall(r'\b\w+\b', query.lower())
-        for word in query_words:
-            if word in index['by_word']:
-                for text_id in index['by_word'][word]:
-                    if text_id in catalog and text_id not in [r['text_id'] for r in results]:
-                        results.append({
-                            'text_id': text_id,
-                            'score': 0.5,
-                            'match_type': 'word_match',
-                            **catalog[text_id]
-                        })
-
-        # Sort by score and limit results
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:limit]
+        # Word-based matches, BM25-ranked and scaled so the best one scores 0.5
+        if 'bm25' in index:
+            ranked = self.rankFullText(query, index, catalog, limit, exclude=seen)
+            best = ranked[0][0] if ranked else 0.0
+            for bm25_score, text_id in ranked:
+                seen.add(text_id)
+                results.append({
+                    'text_id': text_id,
+                    'score': 0.5 * bm25_score / best,
+                    'match_type': 'word_match',
+                    **catalog[text_id]
+                })
+        else:
+            # Indexes saved before BM25 ranking only have unranked title words
+            query_words = self.WORD_PATTERN.findall(query.lower())
+            for word in query_words:
+                if word in index['by_word']:
+                    for text_id in index['by_word'][word]:
+                        if text_id in catalog and text_id not in seen:
+                            seen.add(text_id)
+                            results.append({
+                                'text_id': text_id,
+                                'score': 0.5,
+                                'match_type': 'word_match',
+                                **catalog[text_id]
+                            })
+
+        # Keep the best-scoring results
+        return heapq.nlargest(limit, results, key=lambda x: x['score'])
+
+    def titleCharacterIndex(self, index: Dict) -> TitleCharacterIndex:
+        """Character index for a search index's normalized titles, built on first use"""
+        prebuilt = index.get('title_characters')
+        if prebuilt is not None:
+            return prebuilt
+        if self._character_index is None or not self._character_index.isCurrent(index['normalized_titles']):
+            self._character_index = TitleCharacterIndex(index['normalized_titles'])
+        return self._character_index
 
     def saveCatalogJSON(self, catalog: Dict, output_path: str):
         """
@@ -408,23 +889,81 @@ class GutenbergCatalogParser:
             logger.error(f"Error saving catalog: {e}")
             raise
 
+    def streamCatalogJSON(self, entries: Iterable[Dict], output_path: str) -> int:
+        """
+        Write catalog entries to JSON as they arrive
+
+        Produces the same file as saveCatalogJSON without holding the catalog
+        in memory.
+
+        Args:
+            entries: Catalog entries (e.g. from iterCSVCatalog)
+            output_path: Output file path
+
+        Returns:
+            Number of entries written
+        """
+        logger.info(f"Streaming catalog to: {output_path}")
+        count = 0
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('{')
+            for entry in entries:
+                body = json.dumps(entry, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+                f.write(f'{"," if count else ""}\n  {json.dumps(str(entry["text_id"]), ensure_ascii=False)}: {body}')
+                count += 1
+            f.write('\n}' if count else '}')
+
+        logger.info(f"Catalog streamed successfully: {count} entries")
+        return count
+
+    def processCSVStreaming(self) -> Dict:
+        """
+        Build the CSV-only catalog and search index in a single streaming pass
+
+        Each entry is indexed and written as soon as it is parsed; only the
+        search index is kept in memory.
+
+        Returns:
+            The search index
+        """
+        csv_path = self.input_dir / "pg_catalog.csv"
+        if not csv_path.exists():
+            raise FileNotFoundError(f"CSV catalog not found: {csv_path}")
+
+        index = self._new_search_index()
+        stats = CatalogStatistics()
+
+        def indexed_entries():
+            for entry in self.iterCSVCatalog(str(csv_path)):
+                self._index_entry(index, str(entry['text_id']), entry)
+                stats.addEntry(entry)
+                yield entry
+
+        output_path = self.output_dir / "gutenberg_catalog.json"
+        self.streamCatalogJSON(indexed_entries(), str(output_path))
+        stats.save(str(self.output_dir / "gutenberg_catalog_stats.json"), sources={'catalog': str(output_path)})
+
+        self.search_index = index
+        index_path = self.output_dir / "gutenberg_search_index.json"
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Streaming processing complete! Catalog saved to {output_path}")
+        return index
+
     def _clean_title(self, title: str) -> str:
         """Clean and normalize title text"""
         if not title:
             return ""
 
         # Remove excessive whitespace
-        title = re.sub(r'\s+', ' ', title.strip())
-
-        # Remove common Project Gutenberg suffixes
-        patterns = [
-            r'\s*\(.*?Project Gutenberg.*?\)',
-            r'\s*\[.*?Project Gutenberg.*?\]',
-            r'\s*—.*?Project Gutenberg.*',
-        ]
+        title = ' '.join(title.split())
 
-        for pattern in patterns:
-            title = re.sub(pattern, '', title, flags=re.IGNORECASE)
+        # Remove common Project Gutenberg suffixes (all of them name Project Gutenberg)
+        if 'project gutenberg' in title.lower():
+            for pattern in self.TITLE_SUFFIX_PATTERNS:
+                title = pattern.sub('', title)
 
         return title.strip()
 
@@ -440,8 +979,8 @@ class GutenbergCatalogParser:
         cleaned_authors = []
         for author in authors:
             # Remove birth/death dates in parentheses
-            author = re.sub(r'\s*\([^)]*\)', '', author)
-            author = author.strip()
+            if '(' in author:
+                author = self.AUTHOR_DATES_PATTERN.sub('', author).strip()
             if author:
                 cleaned_authors.append(author)
 
@@ -461,10 +1000,16 @@ class GutenbergCatalogParser:
 
         return text.strip()
 
-    def process_all(self) -> Dict:
+    def process_all(self, workers: Optional[int] = None, rdf_limit: Optional[int] = None,
+                    stream_rdf: bool = True) -> Dict:
         """
         Process all catalog data and create unified catalog
 
+        Args:
+            workers: Worker processes for RDF parsing (defaults to the CPU count)
+            rdf_limit: Maximum number of RDF files to parse (None for all)
+            stream_rdf: Read RDF files straight from the archive instead of extracting them
+
         Returns:
             Complete catalog dictionary
         """
@@ -480,8 +1025,11 @@ class GutenbergCatalogParser:
         # Step 2: Extract and parse RDF files
         tar_path = self.input_dir / "rdf-files.tar.bz2"
         if tar_path.exists():
-            rdf_dir = self.extractRDFArchive(str(tar_path), str(self.output_dir))
-            rdf_metadata = self.parseRDFMetadata(rdf_dir)
+            if stream_rdf:
+                rdf_metadata = self.parseRDFArchive(str(tar_path), workers=workers, limit=rdf_limit)
+            else:
+                rdf_dir = self.extractRDFArchive(str(tar_path), str(self.output_dir))
+                rdf_metadata = self.parseRDFMetadata(rdf_dir, workers=workers, limit=rdf_limit)
 
             # Step 3: Merge RDF metadata into catalog
             for text_id, rdf_data in rdf_metadata.items():
@@ -490,8 +1038,9 @@ class GutenbergCatalogParser:
         else:
             logger.warning(f"RDF archive not found: {tar_path}")
 
-        # Step 4: Build search index
+        # Step 4: Build search index and statistics
         self.search_index = self.buildSearchIndex(self.catalog)
+        stats = CatalogStatistics.fromCatalog(self.catalog)
 
         # Step 5: Save catalog
         output_path = self.output_dir / "gutenberg_catalog.json"
@@ -502,16 +1051,43 @@ class GutenbergCatalogParser:
         with open(index_path, 'w', encoding='utf-8') as f:
             json.dump(self.search_index, f, indent=2, ensure_ascii=False)
 
+        # Step 7: Save the memory-mapped index used by search_gutenberg.py
+        binary_path = self.output_dir / "gutenberg_search_index.bin"
+        writeBinaryIndex(self.search_index, self.catalog, str(binary_path),
+                         sources={'catalog': str(output_path), 'index': str(index_path)})
+
+        # Step 8: Save statistics for search_gutenberg.py --stats
+        stats.save(str(self.output_dir / "gutenberg_catalog_stats.json"), sources={'catalog': str(output_path)})
+
         logger.info(f"Processing complete! Catalog with {len(self.catalog)} entries saved to {output_path}")
         return self.catalog
 
 
+# Per-process parser used by the RDF worker pool
+_rdf_worker = None
+
+def _init_rdf_worker(input_dir: str, output_dir: str):
+    """Create the parser a worker process reuses for all of its RDF chunks"""
+    global _rdf_worker
+    _rdf_worker = GutenbergCatalogParser(input_dir, output_dir)
+
+def _parse_rdf_chunk_in_worker(rdf_files: List[Tuple[str, RDFSource]]) -> Dict:
+    """Pool entry point for GutenbergCatalogParser._parse_rdf_chunk"""
+    return _rdf_worker._parse_rdf_chunk(rdf_files)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Parse Project Gutenberg catalog data')
     parser.add_argument('input_dir', help='Directory containing pg_catalog.csv and rdf-files.tar.bz2')
     parser.add_argument('--output-dir', '-o', default='.', help='Output directory for generated files')
     parser.add_argument('--search', '-s', help='Test search functionality with a query')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--workers', '-w', type=int, help='Worker processes for RDF parsing (default: CPU count)')
+    parser.add_argument('--rdf-limit', type=int, help='Parse at most this many RDF files (for testing)')
+    parser.add_argument('--extract-rdf', action='store_true',
+                        help='Extract the RDF archive to disk instead of streaming it')
+    parser.add_argument('--csv-only', action='store_true',
+                        help='Stream the CSV catalog straight to JSON without RDF metadata')
 
     args = parser.parse_args()
 
@@ -522,7 +1098,12 @@ def main():
     parser_instance = GutenbergCatalogParser(args.input_dir, args.output_dir)
 
     # Process catalog
-    catalog = parser_instance.process_all()
+    if args.csv_only:
+        parser_instance.processCSVStreaming()
+        return
+
+    catalog = parser_instance.process_all(workers=args.workers, rdf_limit=args.rdf_limit,
+                                          stream_rdf=not args.extract_rdf)
 
     # Test search functionality if requested
     if args.search:
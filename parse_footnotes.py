@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Parallel citation parsing for large footnote files
+
+Reads newline-delimited footnotes or JSONL records, fans the work out over a
+process pool in chunks and writes one JSON result per footnote, in input order.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from citation_parser import CitationParser
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Times a chunk is resubmitted after crashing a worker on its own before it is parsed in-process
+MAX_CHUNK_RETRIES = 2
+
+# Per-process parser, created once by the pool initializer
+_worker_parser = None
+
+def _init_worker(cache_size: int):
+    """Create the parser a worker process reuses for all of its chunks"""
+    global _worker_parser
+    _worker_parser = CitationParser(cache_size=cache_size)
+
+def parse_chunk(footnotes: List[str]) -> List[str]:
+    """
+    Parse a chunk of footnotes into JSON lines
+
+    Serialisation happens in the worker so the parent only has to write strings.
+    """
+    parser = _worker_parser
+    lines = []
+
+    for footnote in parser.parseCitations(footnotes):
+        lines.append(json.dumps(footnote, ensure_ascii=False))
+
+    return lines
+
+def iter_footnotes(input_path: str, input_format: str = 'auto', field: str = 'sourceInfo') -> Iterator[str]:
+    """
+    Stream footnotes from a text or JSONL file
+
+    Args:
+        input_path: Path to the input file
+        input_format: 'text', 'jsonl' or 'auto' (JSONL for .jsonl/.ndjson files)
+        field: Field holding the footnote in JSONL objects (plain JSON strings are used as-is)
+
+    Yields:
+        Footnote strings, one per input line
+    """
+    if input_format == 'auto':
+        input_format = 'jsonl' if input_path.endswith(('.jsonl', '.ndjson')) else 'text'
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            if input_format == 'text':
+                yield line.rstrip('\n')
+                continue
+
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping invalid JSON on line {line_num}: {e}")
+                continue
+
+            if isinstance(record, dict):
+                record = record.get(field, '')
+            yield record if isinstance(record, str) else ''
+
+def iter_chunks(items: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Group a stream into lists of at most chunk_size items"""
+
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+def _submit(executor: ProcessPoolExecutor, chunk: List[str]) -> Future:
+    """Submit a chunk, turning a pool that is already broken into a failed future"""
+    try:
+        return executor.submit(parse_chunk, chunk)
+    except BrokenProcessPool as e:
+        future = Future()
+        future.set_exception(e)
+        return future
+
+def _succeeded(future: Future) -> bool:
+    """Whether a future finished with a result (completed chunks survive a pool restart)"""
+    return future.done() and not future.cancelled() and future.exception() is None
+
+def _rerun_isolated(suspects: List[list], cache_size: int):
+    """
+    Re-run chunks left unfinished by a worker crash, one at a time in a single-worker pool
+
+    Only a chunk that breaks the pool on its own is charged a retry, so a
+    chunk that merely shared the pool with the one that crashed is never
+    blamed for it. A chunk that breaks the pool more than MAX_CHUNK_RETRIES
+    times is parsed in this process instead.
+    """
+    executor = None
+    try:
+        for entry in suspects:
+            while True:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(cache_size,))
+                entry[1] = _submit(executor, entry[0])
+                # Parsed, or failed with an error of its own, raised when its turn comes
+                if not isinstance(entry[1].exception(), BrokenProcessPool):
+                    break
+
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = None
+                entry[2] += 1
+                if entry[2] <= MAX_CHUNK_RETRIES:
+                    logger.warning("Chunk broke a single-worker pool; retrying it")
+                    continue
+
+                logger.warning(f"Chunk broke the pool {entry[2]} times, parsing it in-process")
+                if _worker_parser is None:
+                    _init_worker(cache_size)
+                entry[1] = Future()
+                entry[1].set_result(parse_chunk(entry[0]))
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def parse_chunks_parallel(chunks: Iterable[List[str]], workers: int, cache_size: int = 0) -> Iterator[List[str]]:
+    """
+    Parse chunks over a process pool, yielding results in submission order
+
+    At most two chunks per worker are in flight, so memory stays bounded for
+    arbitrarily large inputs. If a worker dies, every unfinished chunk is
+    re-run on its own (see _rerun_isolated) to find the one that broke the
+    pool before the pool is rebuilt, so no input is ever dropped.
+    """
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_size,))
+
+    chunks = iter(chunks)
+    pending = deque()  # [chunk, future, retries]
+    executor = new_pool()
+
+    try:
+        while True:
+            while len(pending) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.append([chunk, _submit(executor, chunk), 0])
+
+            if not pending:
+                break
+
+            try:
+                lines = pending[0][1].result()
+            except BrokenProcessPool:
+                executor.shutdown(wait=False, cancel_futures=True)
+                logger.warning("Worker crashed; re-running unfinished chunks one at a time")
+                _rerun_isolated([entry for entry in pending if not _succeeded(entry[1])], cache_size)
+                executor = new_pool()
+                continue
+
+            pending.popleft()
+            yield lines
+
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def parse_file(input_path: str, output: TextIO, workers: Optional[int] = None, chunk_size: int = 10000,
+               input_format: str = 'auto', field: str = 'sourceInfo', cache_size: int = 0) -> Dict:
+    """
+    Parse every footnote in a file and write JSONL results in input order
+
+    Args:
+        input_path: Newline-delimited or JSONL footnote file
+        output: Text stream to write results to
+        workers: Number of worker processes (defaults to the CPU count; 1 parses in-process)
+        chunk_size: Footnotes per unit of work sent to a worker
+        input_format: 'text', 'jsonl' or 'auto'
+        field: Footnote field for JSONL objects
+        cache_size: Per-worker citation cache capacity (0 disables it)
+
+    Returns:
+        Processing statistics
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    chunks = iter_chunks(iter_footnotes(input_path, input_format, field), chunk_size)
+
+    if workers == 1:
+        _init_worker(cache_size)
+        results = map(parse_chunk, chunks)
+    else:
+        results = parse_chunks_parallel(chunks, workers, cache_size)
+
+    total = 0
+    for lines in results:
+        output.write('\n'.join(lines))
+        output.write('\n')
+        total += len(lines)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'footnotes': total,
+        'workers': workers,
+        'seconds': elapsed,
+        'footnotes_per_second': total / elapsed if elapsed else 0.0
+    }
+
+    logger.info(f"Parsed {total:,} footnotes with {workers} workers in {elapsed:.1f}s "
+                f"({stats['footnotes_per_second']:,.0f}/s)")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse citations from a large footnote file in parallel')
+    parser.add_argument('input', help='Newline-delimited or JSONL footnote file')
+    parser.add_argument('--output', '-o', help='Output JSONL file (defaults to stdout)')
+    parser.add_argument('--workers', '-w', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', '-c', type=int, default=10000, help='Footnotes per work chunk')
+    parser.add_argument('--format', '-f', choices=['auto', 'text', 'jsonl'], default='auto', help='Input format')
+    parser.add_argument('--field', default='sourceInfo', help='Footnote field in JSONL objects')
+    parser.add_argument('--cache-size', type=int, default=0, help='Per-worker citation cache capacity')
+
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            parse_file(args.input, f, args.workers, args.chunk_size, args.format, args.field, args.cache_size)
+    else:
+        parse_file(args.input, sys.stdout, args.workers, args.chunk_size, args.format, args.field, args.cache_size)
+
+if __name__ == "__main__":
+    main()
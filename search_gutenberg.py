@@ -4,32 +4,155 @@ Interactive search tool for Project Gutenberg catalog
 """
 
 import json
+import os
 import sys
 import argparse
-from gutenberg_parser import GutenbergCatalogParser
+import http.client
+from typing import Dict, List
+from urllib.parse import urlencode
+from gutenberg_parser import CatalogStatistics, GutenbergCatalogParser
+from gutenberg_index import BinarySearchIndex, sourcesMatch, writeBinaryIndex
+from search_server import DEFAULT_HOST, DEFAULT_PORT, SearchServer
+
+CATALOG_PATH = 'gutenberg_catalog_complete.json'
+INDEX_PATH = 'gutenberg_search_index.json'
+BINARY_INDEX_PATH = 'gutenberg_search_index.bin'
+STATS_PATH = 'gutenberg_catalog_stats.json'
+
+def load_search_data():
+    """
+    Load the search index and catalog, preferring the memory-mapped binary index
+
+    The binary index is used only if it records being built from
+    CATALOG_PATH (and INDEX_PATH, if from an index file) as they are now;
+    otherwise the JSON files are loaded.
+
+    Returns:
+        (search_index, catalog), or None if no catalog files exist
+    """
+    if os.path.exists(BINARY_INDEX_PATH):
+        search_index = BinarySearchIndex(BINARY_INDEX_PATH)
+        if 'catalog' in search_index.sources and search_index.isBuiltFrom({'catalog': CATALOG_PATH,
+                                                                           'index': INDEX_PATH}):
+            return search_index, search_index.catalog
+        search_index.close()
 
-def interactive_search():
-    """Interactive search interface"""
-
-    # Load catalog and search index
     try:
-        with open('gutenberg_catalog_complete.json', 'r', encoding='utf-8') as f:
+        with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
             catalog = json.load(f)
 
-        with open('gutenberg_search_index.json', 'r', encoding='utf-8') as f:
+        with open(INDEX_PATH, 'r', encoding='utf-8') as f:
             search_index = json.load(f)
 
-        print(f"✓ Loaded Project Gutenberg catalog with {len(catalog)} English texts")
+    except FileNotFoundError:
+        return None
+
+    return search_index, catalog
 
+def build_binary_index():
+    """Write the binary search index from the JSON catalog"""
+    try:
+        with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
     except FileNotFoundError:
-        print("✗ Catalog files not found. Please run gutenberg_parser.py first.")
+        print("✗ Catalog file not found. Please run gutenberg_parser.py first.")
         return
 
-    # Create parser instance for search
+    parser = GutenbergCatalogParser(".", ".")
+    search_index = parser.buildSearchIndex(catalog)
+    count = writeBinaryIndex(search_index, catalog, BINARY_INDEX_PATH, sources={'catalog': CATALOG_PATH})
+    print(f"✓ Wrote {BINARY_INDEX_PATH} with {count} texts")
+
+class SearchServerError(RuntimeError):
+    """A search server answered with an error status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Search server error {status}: {message}")
+        self.status = status
+        self.message = message
+
+class SearchClient:
+    """Thin client for a running search server, reusing one keep-alive connection"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connection = None
+
+    def _get(self, path: str) -> Dict:
+        # Retry once on a fresh connection if the server dropped the idle one
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request('GET', path)
+                response = self.connection.getresponse()
+                payload = json.loads(response.read().decode('utf-8'))
+            except (http.client.HTTPException, ConnectionError):
+                self.close()
+                if attempt:
+                    raise
+                continue
+
+            if response.status != 200:
+                raise SearchServerError(response.status, payload.get('error'))
+            return payload
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Results of searchByTitle on the server"""
+        return self._get('/search?' + urlencode({'q': query, 'limit': limit}))['results']
+
+    def metrics(self) -> Dict:
+        """Server throughput and latency metrics"""
+        return self._get('/metrics')
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+def print_no_server(client: SearchClient):
+    """Tell the user nothing is listening where the client connects"""
+    print(f"✗ No search server at {client.host}:{client.port}. Start one with --serve.")
+
+def local_search():
+    """
+    Search function over locally loaded catalog files
+
+    Returns:
+        (search(query, limit), number of texts), or None if no catalog files exist
+    """
+    loaded = load_search_data()
+    if loaded is None:
+        return None
+
+    search_index, catalog = loaded
     parser = GutenbergCatalogParser(".", ".")
     parser.catalog = catalog
     parser.search_index = search_index
 
+    def search(query: str, limit: int) -> List[Dict]:
+        return parser.searchByTitle(query, search_index, catalog, limit=limit)
+
+    return search, len(catalog)
+
+def interactive_search(client: SearchClient = None):
+    """Interactive search interface (against a search server when a client is given)"""
+
+    if client is not None:
+        search = client.search
+        print(f"✓ Connected to search server at {client.host}:{client.port}")
+    else:
+        # Load catalog and search index
+        loaded = local_search()
+        if loaded is None:
+            print("✗ Catalog files not found. Please run gutenberg_parser.py first.")
+            return
+
+        search, count = loaded
+        print(f"✓ Loaded Project Gutenberg catalog with {count} English texts")
+
     print("\n=== Project Gutenberg Search Tool ===")
     print("Enter book titles, author names, or keywords to search")
     print("Type 'quit' to exit\n")
@@ -45,7 +168,14 @@ def interactive_search():
                 continue
 
             # Perform search
-            results = parser.searchByTitle(query, search_index, catalog, limit=10)
+            try:
+                results = search(query, 10)
+            except ConnectionRefusedError:
+                print_no_server(client)
+                break
+            except SearchServerError as e:
+                print(f"✗ {e}\n")
+                continue
 
             if not results:
                 print("No results found. Try different keywords.\n")
@@ -73,25 +203,26 @@ def interactive_search():
         except EOFError:
             break
 
-def search_command(query: str, limit: int = 10):
-    """Command-line search"""
-
-    try:
-        with open('gutenberg_catalog_complete.json', 'r', encoding='utf-8') as f:
-            catalog = json.load(f)
-
-        with open('gutenberg_search_index.json', 'r', encoding='utf-8') as f:
-            search_index = json.load(f)
-
-    except FileNotFoundError:
-        print("✗ Catalog files not found. Please run gutenberg_parser.py first.")
-        return
+def search_command(query: str, limit: int = 10, client: SearchClient = None):
+    """Command-line search (against a search server when a client is given)"""
 
-    parser = GutenbergCatalogParser(".", ".")
-    parser.catalog = catalog
-    parser.search_index = search_index
+    if client is not None:
+        try:
+            results = client.search(query, limit)
+        except ConnectionRefusedError:
+            print_no_server(client)
+            return
+        except SearchServerError as e:
+            print(f"✗ {e}")
+            return
+    else:
+        loaded = local_search()
+        if loaded is None:
+            print("✗ Catalog files not found. Please run gutenberg_parser.py first.")
+            return
 
-    results = parser.searchByTitle(query, search_index, catalog, limit=limit)
+        search, _ = loaded
+        results = search(query, limit)
 
     if not results:
         print(f"No results found for '{query}'")
@@ -111,69 +242,136 @@ def search_command(query: str, limit: int = 10):
         if result.get('downloads'):
             print(f"   Downloads: {result['downloads']:,}")
 
-def show_stats():
-    """Show catalog statistics"""
+def load_stats() -> Dict:
+    """
+    Catalog statistics from the sidecar written at build time
+
+    The sidecar is rebuilt from the catalog (and saved) when it is missing
+    or does not record describing CATALOG_PATH as it is now.
+
+    Returns:
+        Statistics dictionary, or None if no catalog exists
+    """
+    if os.path.exists(STATS_PATH):
+        with open(STATS_PATH, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        if sourcesMatch(stats.get('sources'), {'catalog': CATALOG_PATH}):
+            return stats
 
     try:
-        with open('gutenberg_catalog_complete.json', 'r', encoding='utf-8') as f:
+        with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
             catalog = json.load(f)
     except FileNotFoundError:
-        print("✗ Catalog file not found.")
-        return
+        return None
 
-    # Calculate statistics
-    total_texts = len(catalog)
-    texts_with_urls = sum(1 for entry in catalog.values() if entry.get('text_url'))
-    texts_with_downloads = sum(1 for entry in catalog.values() if entry.get('downloads'))
+    stats = CatalogStatistics.fromCatalog(catalog)
+    stats.save(STATS_PATH, sources={'catalog': CATALOG_PATH})
+    return stats.toDict()
 
-    # Author statistics
-    authors = {}
-    for entry in catalog.values():
-        author = entry.get('primary_author', 'Unknown')
-        if author:
-            authors[author] = authors.get(author, 0) + 1
+def show_stats():
+    """Show catalog statistics"""
 
-    top_authors = sorted(authors.items(), key=lambda x: x[1], reverse=True)[:10]
+    stats = load_stats()
+    if stats is None:
+        print("✗ Catalog file not found.")
+        return
 
-    # Download statistics
-    download_counts = [entry.get('downloads', 0) for entry in catalog.values() if entry.get('downloads')]
-    if download_counts:
-        avg_downloads = sum(download_counts) / len(download_counts)
-        max_downloads = max(download_counts)
-        most_downloaded = max(catalog.values(), key=lambda x: x.get('downloads', 0))
+    total_texts = stats['total_texts']
+    texts_with_urls = stats['texts_with_urls']
+    texts_with_downloads = stats['texts_with_downloads']
 
     print("=== Project Gutenberg Catalog Statistics ===\n")
     print(f"Total English texts: {total_texts:,}")
-    print(f"Texts with download URLs: {texts_with_urls:,} ({texts_with_urls/total_texts*100:.1f}%)")
-    print(f"Texts with download stats: {texts_with_downloads:,} ({texts_with_downloads/total_texts*100:.1f}%)")
+    if total_texts:
+        print(f"Texts with download URLs: {texts_with_urls:,} ({texts_with_urls/total_texts*100:.1f}%)")
+        print(f"Texts with download stats: {texts_with_downloads:,} ({texts_with_downloads/total_texts*100:.1f}%)")
 
-    if download_counts:
+    if texts_with_downloads:
+        most_downloaded = stats['most_downloaded']
         print(f"\nDownload Statistics:")
-        print(f"Average downloads per text: {avg_downloads:,.0f}")
-        print(f"Maximum downloads: {max_downloads:,}")
-        print(f"Most downloaded: {most_downloaded['title']} ({most_downloaded.get('downloads', 0):,} downloads)")
+        print(f"Average downloads per text: {stats['average_downloads']:,.0f}")
+        print(f"Maximum downloads: {stats['max_downloads']:,}")
+        print(f"Most downloaded: {most_downloaded['title']} ({most_downloaded['downloads']:,} downloads)")
 
     print(f"\nTop 10 Authors by Number of Texts:")
-    for i, (author, count) in enumerate(top_authors, 1):
+    for i, (author, count) in enumerate(stats['top_authors'], 1):
         print(f"{i:2d}. {author}: {count} texts")
 
+def serve(host: str, port: int):
+    """Load the catalog once and answer searches over localhost HTTP until interrupted"""
+    loaded = load_search_data()
+    if loaded is None:
+        print("✗ Catalog files not found. Please run gutenberg_parser.py first.")
+        return
+
+    search_index, catalog = loaded
+    server = SearchServer(search_index, catalog, host, port)
+    print(f"✓ Serving {len(catalog)} texts on http://{host}:{server.server_address[1]} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+
+def show_metrics(client: SearchClient):
+    """Print a running search server's metrics"""
+    try:
+        metrics = client.metrics()
+    except ConnectionRefusedError:
+        print_no_server(client)
+        return
+    except SearchServerError as e:
+        print(f"✗ {e}")
+        return
+
+    def ms(value):
+        return f"{value:.2f} ms" if value is not None else "-"
+
+    print("=== Search Server Metrics ===\n")
+    print(f"Uptime: {metrics['uptime_seconds']:,.0f} s")
+    print(f"Queries: {metrics['queries']:,} ({metrics['errors']:,} errors)")
+    print(f"Throughput: {metrics['queries_per_second']:,.1f} queries/s")
+    print(f"Latency: mean {ms(metrics['mean_ms'])} | p50 {ms(metrics['p50_ms'])} | "
+          f"p95 {ms(metrics['p95_ms'])} | p99 {ms(metrics['p99_ms'])} | max {ms(metrics['max_ms'])}")
+
 def main():
     parser = argparse.ArgumentParser(description='Search Project Gutenberg catalog')
     parser.add_argument('--search', '-s', help='Search query')
     parser.add_argument('--limit', '-l', type=int, default=10, help='Number of results to show')
     parser.add_argument('--stats', action='store_true', help='Show catalog statistics')
     parser.add_argument('--interactive', '-i', action='store_true', help='Interactive search mode')
+    parser.add_argument('--build-index', action='store_true',
+                        help=f'Write {BINARY_INDEX_PATH} from the JSON catalog for fast startup')
+    parser.add_argument('--serve', action='store_true', help='Run a persistent search server')
+    parser.add_argument('--remote', action='store_true', help='Send searches to a running search server')
+    parser.add_argument('--metrics', action='store_true', help='Show a running search server\'s metrics')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Search server host')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Search server port')
 
     args = parser.parse_args()
 
-    if args.stats:
-        show_stats()
-    elif args.search:
-        search_command(args.search, args.limit)
-    elif args.interactive or len(sys.argv) == 1:
-        interactive_search()
-    else:
-        parser.print_help()
+    client = SearchClient(args.host, args.port) if args.remote or args.metrics else None
+
+    try:
+        if args.build_index:
+            build_binary_index()
+        elif args.serve:
+            serve(args.host, args.port)
+        elif args.metrics:
+            show_metrics(client)
+        elif args.stats:
+            show_stats()
+        elif args.search:
+            search_command(args.search, args.limit, client)
+        elif args.interactive or len(sys.argv) == 1 or args.remote:
+            interactive_search(client)
+        else:
+            parser.print_help()
+    finally:
+        if client is not None:
+            client.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Long-running search server for the Project Gutenberg catalog
+
+Loads the catalog and search index once and answers searchByTitle queries
+over localhost HTTP, one thread per connection, with keep-alive so clients
+can reuse a connection for many lookups.
+
+Endpoints:
+    GET /search?q=<query>&limit=<n>   {"query", "results", "elapsed_ms"}
+    GET /metrics                      request counts, throughput and latency percentiles
+    GET /health                       {"status": "ok", "texts": <count>}
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from gutenberg_parser import GutenbergCatalogParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_LIMIT = 1000
+
+class SearchMetrics:
+    """Thread-safe request counters and a sliding window of query latencies"""
+
+    def __init__(self, window: int = 10000):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.queries = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.queries += 1
+            self.total_seconds += seconds
+            self.latencies.append(seconds)
+
+    def recordError(self):
+        with self.lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict:
+        """Current metrics; latencies are in milliseconds over the recent window"""
+        with self.lock:
+            uptime = time.monotonic() - self.started
+            latencies = sorted(self.latencies)
+            queries = self.queries
+            errors = self.errors
+            total_seconds = self.total_seconds
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        return {
+            'uptime_seconds': uptime,
+            'queries': queries,
+            'errors': errors,
+            'queries_per_second': queries / uptime if uptime > 0 else 0.0,
+            'mean_ms': total_seconds / queries * 1000 if queries else None,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': latencies[-1] * 1000 if latencies else None
+        }
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler answering searches against the server's loaded parser"""
+
+    # Keep-alive, so one client connection can carry many queries
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == '/search':
+            self._search(params)
+        elif url.path == '/metrics':
+            self._send_json(200, self.server.metrics.snapshot())
+        elif url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'texts': len(self.server.catalog)})
+        else:
+            self._send_json(404, {'error': f"Unknown path: {url.path}"})
+
+    def _search(self, params: Dict[str, List[str]]):
+        query = params.get('q', [''])[0].strip()
+        try:
+            limit = min(int(params.get('limit', ['10'])[0]), MAX_LIMIT)
+        except ValueError:
+            self.server.metrics.recordError()
+            self._send_json(400, {'error': "limit must be an integer"})
+            return
+        if limit < 1:
+            self.server.metrics.recordError()
+            self._send_json(400, {'error': "limit must be at least 1"})
+            return
+
+        if not query:
+            self.server.metrics.recordError()
+            self._send_json(400, {'error': "Missing query parameter 'q'"})
+            return
+
+        start = time.perf_counter()
+        try:
+            results = self.server.search(query, limit)
+        except Exception as e:
+            logger.exception(f"Search failed for {query!r}")
+            self.server.metrics.recordError()
+            self._send_json(500, {'error': str(e)})
+            return
+        elapsed = time.perf_counter() - start
+
+        self.server.metrics.record(elapsed)
+        self._send_json(200, {'query': query, 'results': results, 'elapsed_ms': elapsed * 1000})
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+class SearchServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding one loaded catalog and search index"""
+
+    daemon_threads = True
+
+    def __init__(self, search_index: Dict, catalog: Dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Args:
+            search_index: Search index (JSON dict or gutenberg_index.BinarySearchIndex)
+            catalog: Catalog matching the index
+            host: Interface to bind; keep the default to stay local-only
+            port: TCP port (0 picks a free one)
+        """
+        super().__init__((host, port), SearchRequestHandler)
+        self.search_index = search_index
+        self.catalog = catalog
+        self.metrics = SearchMetrics()
+
+        self.parser = GutenbergCatalogParser(".", ".")
+        self.parser.catalog = catalog
+        self.parser.search_index = search_index
+        # Build any lazily created search structures before the first request
+        self.parser.titleCharacterIndex(search_index)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        return self.parser.searchByTitle(query, self.search_index, self.catalog, limit=limit)
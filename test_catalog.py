@@ -1,9 +1,335 @@
 #!/usr/bin/env python3
-"""Test script for the Gutenberg catalog"""
+"""
+Tests for the Gutenberg catalog parser, search indexes and search server
 
+Most tests build a synthetic pg_catalog.csv and RDF archive and check the
+streaming, parallel and indexed code paths against the original ones;
+test_catalog inspects a catalog generated from the real data, when present.
+"""
+
+import csv
+import http.client
+import io
 import json
+import math
+import os
+import random
+import re
+import socket
+import struct
 import sys
-from gutenberg_parser import GutenbergCatalogParser
+import tarfile
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from contextlib import redirect_stdout
+from pathlib import Path
+from urllib.parse import urlencode
+from difflib import SequenceMatcher
+import search_gutenberg
+from gutenberg_index import BinarySearchIndex, TitleCharacterIndex, writeBinaryIndex
+from gutenberg_parser import CatalogStatistics, GutenbergCatalogParser
+from search_server import MAX_LIMIT, SearchServer
+
+class BrokenStdout(io.StringIO):
+    """Stdout whose reader has gone away, like `search_gutenberg.py ... | head`"""
+
+    def __init__(self):
+        super().__init__()
+        self.attempted = []
+
+    def write(self, text):
+        self.attempted.append(text)
+        raise BrokenPipeError(32, "Broken pipe")
+
+def start_search_server(search_index, catalog):
+    server = SearchServer(search_index, catalog, '127.0.0.1', 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_search_cli(*args):
+    """Run search_gutenberg.main with the given arguments"""
+    argv = sys.argv
+    sys.argv = ['search_gutenberg.py', *args]
+    try:
+        search_gutenberg.main()
+    finally:
+        sys.argv = argv
+
+TITLE_WORDS = ("a an the of in on and to at king kings queen ring rings war peace love story "
+               "tale tales history island voyage journey letters poems life lives death night "
+               "generation rendering garden secret house city old new sea england america").split()
+
+CSV_FIELDS = ['Text#', 'Type', 'Issued', 'Title', 'Language', 'Authors', 'Subjects', 'LoCC', 'Bookshelves']
+
+def catalog_csv_rows():
+    """pg_catalog.csv rows covering the cases the parser normalizes or skips, then bulk rows"""
+    rows = [
+        ['1342', 'Text', '1998-06-01', "Pride and Prejudice", 'en', "Austen, Jane, 1775-1817",
+         "England -- Fiction; Courtship -- Fiction", 'PR', "Best Books Ever Listings; Harvard Classics"],
+        ['2701', 'Text', '2001-07-01', "Moby Dick; Or, The Whale", 'en', "Melville, Herman, 1819-1891 (Author)",
+         "Whaling -- Fiction; Sea stories", 'PS', "Best Books Ever Listings"],
+        ['84', 'Text', '1993-10-01', "Frankenstein (Project Gutenberg edition)", 'en',
+         "Shelley, Mary Wollstonecraft (1797-1851); Anonymous (Translator)", "Science fiction", 'PR', ""],
+        ['11', 'Text', '2008-06-27', "Alice's   Adventures\nin\tWonderland [Project Gutenberg]", 'en',
+         "Carroll, Lewis, 1832-1898; Tenniel, John, Sir (Illustrator)", "Fantasy fiction", 'PR', "Children's Literature"],
+        ['98', 'Text', '1994-01-01', "A Tale of Two Cities — Project Gutenberg's release", 'en',
+         "Dickens, Charles", "London (England) -- Fiction", 'PR', ""],
+        ['2000', 'Text', '1999-12-01', "Don Quijote", 'es', "Cervantes Saavedra, Miguel de", "", 'PQ', ""],
+        ['abc', 'Text', '', "Not a number", 'en', "", "", '', ""],
+        ['', 'Text', '', "No number", 'en', "", "", '', ""],
+        ['1661', 'Text', '1999-03-01', "The Adventures of Sherlock Holmes", 'en', "Doyle, Arthur Conan; ; ", "", 'PR', ""],
+        ['5', 'Text', '1975-12-01', "  The United States Constitution  ", 'en', "", "", 'KF', ""],
+        ['64317', 'Text', '2021-01-17', "The Great Gatsby: “Ünïcödé” edition", 'en', "Fitzgerald, F. Scott",
+         "Long Island (N.Y.) -- Fiction", 'PS', ""],
+        ['100', 'Text', '1994-01-01', "The Complete Works of William Shakespeare", ' en ', "Shakespeare, William", "", 'PR', ""],
+    ]
+
+    rng = random.Random(0)
+    for number in range(40):
+        words = [rng.choice(TITLE_WORDS) for _ in range(rng.randint(1, 6))]
+        authors = "; ".join(f"Author{rng.randint(0, 12)}, Some ({rng.randint(1700, 1900)}-)"
+                            for _ in range(rng.randint(0, 2)))
+        rows.append([str(10000 + number), 'Text', '2020-01-01', ' '.join(words).title(),
+                     rng.choice(['en', 'en', 'en', 'fr']), authors,
+                     rng.choice(["", "Sea stories", "History -- England"]), 'PR', rng.choice(["", "Classics"])])
+    return rows
+
+def write_catalog_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(rows)
+
+def reference_parse_csv(csv_path):
+    """The catalog the original, non-streaming parseCSVCatalog built"""
+
+    def clean_title(title):
+        if not title:
+            return ""
+        title = re.sub(r'\s+', ' ', title.strip())
+        for pattern in [r'\s*\(.*?Project Gutenberg.*?\)', r'\s*\[.*?Project Gutenberg.*?\]',
+                        r'\s*—.*?Project Gutenberg.*']:
+            title = re.sub(pattern, '', title, flags=re.IGNORECASE)
+        return title.strip()
+
+    def parse_authors(authors_str):
+        if not authors_str:
+            return []
+        cleaned_authors = []
+        for author in authors_str.split(';'):
+            author = re.sub(r'\s*\([^)]*\)', '', author.strip()).strip()
+            if author:
+                cleaned_authors.append(author)
+        return cleaned_authors
+
+    catalog = {}
+    with open(csv_path, 'r', encoding='utf-8', newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            text_id = row.get('Text#', '').strip()
+            if not text_id or not text_id.isdigit():
+                continue
+            language = row.get('Language', '').strip()
+            if language != 'en':
+                continue
+            author_list = parse_authors(row.get('Authors', '').strip())
+            catalog[str(int(text_id))] = {
+                'text_id': int(text_id),
+                'title': clean_title(row.get('Title', '').strip()),
+                'authors': author_list,
+                'primary_author': author_list[0] if author_list else '',
+                'language': language,
+                'subjects': row.get('Subjects', '').strip(),
+                'locc': row.get('LoCC', '').strip(),
+                'bookshelves': row.get('Bookshelves', '').strip(),
+                'issued': row.get('Issued', '').strip(),
+                'text_url': None,
+                'local_path': None,
+                'file_formats': {}
+            }
+    return catalog
+
+RDF_NAMESPACES = {
+    'dcterms': 'http://purl.org/dc/terms/',
+    'pgterms': 'http://www.gutenberg.org/2009/pgterms/',
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'dcam': 'http://purl.org/dc/dcam/',
+    'cc': 'http://web.resource.org/cc/'
+}
+
+def rdf_document(text_id, downloads=None, files=(), before='', after=''):
+    """
+    A pg<id>.rdf document laid out like the Project Gutenberg feed
+
+    files holds (about, [format values]) pairs; before and after are raw XML
+    placed around the pgterms:ebook element
+    """
+    file_elements = []
+    for about, values in files:
+        formats = ''.join(
+            '<dcterms:format><rdf:Description rdf:nodeID="N{0}">'
+            '<dcam:memberOf rdf:resource="http://purl.org/dc/terms/IMT"/>{1}'
+            '</rdf:Description></dcterms:format>'.format(
+                number, f'<rdf:value rdf:datatype="http://purl.org/dc/terms/IMT">{value}</rdf:value>'
+                if value is not None else '')
+            for number, value in enumerate(values))
+        file_elements.append(f'<dcterms:hasFormat><pgterms:file rdf:about="{about}">'
+                             f'<dcterms:extent>1024</dcterms:extent>{formats}'
+                             f'</pgterms:file></dcterms:hasFormat>')
+
+    downloads_element = ('' if downloads is None else
+                         f'<pgterms:downloads rdf:datatype="http://www.w3.org/2001/XMLSchema#integer">'
+                         f'{downloads}</pgterms:downloads>')
+    namespaces = ' '.join(f'xmlns:{prefix}="{uri}"' for prefix, uri in RDF_NAMESPACES.items())
+    return (f'<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<rdf:RDF {namespaces} xml:base="http://www.gutenberg.org/">{before}'
+            f'<pgterms:ebook rdf:about="ebooks/{text_id}"><dcterms:title>Title {text_id}</dcterms:title>'
+            f'<dcterms:creator><pgterms:agent rdf:about="2009/agents/{text_id}">'
+            f'<pgterms:name>Author {text_id}</pgterms:name></pgterms:agent></dcterms:creator>'
+            f'{"".join(file_elements)}{downloads_element}</pgterms:ebook>{after}</rdf:RDF>\n').encode('utf-8')
+
+def rdf_documents():
+    """text_id -> RDF bytes covering every format rule, bad values and broken files"""
+    base = "https://www.gutenberg.org/ebooks"
+    documents = {
+        '1342': rdf_document('1342', 51234, [
+            (f"{base}/1342.html.images", ["text/html"]),
+            (f"{base}/1342.epub3.images", ["application/epub+zip"]),
+            (f"{base}/1342.txt.utf-8", ["text/plain; charset=utf-8"]),
+            (f"{base}/1342.pdf", ["application/pdf"]),
+            (f"{base}/1342.cover.medium", ["image/jpeg"])]),
+        # Zipped text lists the archive type first; only the first value counts
+        '2701': rdf_document('2701', 'n/a', [
+            (f"{base}/2701.zip", ["application/zip", "text/plain; charset=us-ascii"]),
+            (f"{base}/2701-0.txt", ["text/plain"])]),
+        # A UTF-8 file name is enough without a charset
+        '84': rdf_document('84', 4000, [(f"{base}/84.utf-8", ["text/plain"])],
+                           before='<cc:Work rdf:about=""><cc:license rdf:resource="gpl"/></cc:Work>'),
+        # Formats without a value, and a file without any format
+        '11': rdf_document('11', None, [(f"{base}/11.noformat", []), (f"{base}/11.empty", [None]),
+                                        (f"{base}/11.txt", [None, "text/plain; charset=utf-8"])]),
+        '98': rdf_document('98', 7, after='<pgterms:ebook rdf:about="ebooks/99">'
+                                          '<pgterms:downloads>99999</pgterms:downloads></pgterms:ebook>'),
+        # No ebook element, and a file cut off inside one
+        '5': b'<?xml version="1.0"?>\n<rdf:RDF xmlns:rdf="' + RDF_NAMESPACES['rdf'].encode() + b'"></rdf:RDF>',
+        '64317': rdf_document('64317', 12, [(f"{base}/64317.txt", ["text/plain"])])[:300],
+    }
+
+    rng = random.Random(0)
+    formats = ["text/plain; charset=utf-8", "text/plain; charset=iso-8859-1", "text/html", "application/epub+zip",
+               "application/pdf", "application/rdf+xml", "text/plain"]
+    for number in range(10000, 10040):
+        files = [(f"{base}/{number}.{kind}", [rng.choice(formats)]) for kind in range(rng.randint(0, 5))]
+        documents[str(number)] = rdf_document(str(number), rng.choice([None, rng.randint(0, 10 ** 6)]), files)
+    return documents
+
+def write_rdf_tree(root, documents):
+    """Lay the documents out as an extracted archive: cache/epub/<id>/pg<id>.rdf"""
+    epub_dir = Path(root) / "cache" / "epub"
+    for text_id, document in documents.items():
+        (epub_dir / text_id).mkdir(parents=True)
+        (epub_dir / text_id / f"pg{text_id}.rdf").write_bytes(document)
+
+    # Not RDF directories: a non-numeric name and a numbered directory without its file
+    (epub_dir / "index").mkdir()
+    (epub_dir / "77").mkdir()
+    (epub_dir / "77" / "pg77.txt").write_text("text")
+    return epub_dir
+
+def write_rdf_archive(path, documents):
+    """Pack the documents as rdf-files.tar.bz2, with directory entries and members to skip"""
+    with tarfile.open(path, 'w:bz2') as tar:
+        def add(name, data=None):
+            member = tarfile.TarInfo(name)
+            if data is None:
+                member.type = tarfile.DIRTYPE
+                tar.addfile(member)
+            else:
+                member.size = len(data)
+                tar.addfile(member, io.BytesIO(data))
+
+        add("cache")
+        add("cache/epub")
+        for text_id, document in documents.items():
+            add(f"cache/epub/{text_id}")
+            add(f"cache/epub/{text_id}/pg{text_id}.rdf", document)
+        add("cache/epub/77/pg77.txt", b"text")
+        add("cache/epub/index/pgindex.rdf", rdf_document('1', 1))
+
+def reference_parse_rdf(rdf_file):
+    """The metadata the original ElementTree-based _parse_single_rdf returned"""
+    try:
+        root = ET.parse(rdf_file).getroot()
+        metadata = {
+            'downloads': 0,
+            'file_formats': {},
+            'text_url': None
+        }
+
+        ebook_elem = root.find('.//pgterms:ebook', RDF_NAMESPACES)
+        if ebook_elem is None:
+            return None
+
+        downloads_elem = ebook_elem.find('.//pgterms:downloads', RDF_NAMESPACES)
+        if downloads_elem is not None:
+            try:
+                metadata['downloads'] = int(downloads_elem.text)
+            except (ValueError, TypeError):
+                pass
+
+        for file_elem in ebook_elem.findall('.//pgterms:file', RDF_NAMESPACES):
+            about = file_elem.get('{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about', '')
+            format_elem = file_elem.find('.//dcterms:format//rdf:value', RDF_NAMESPACES)
+            if format_elem is not None:
+                format_type = format_elem.text
+                if 'text/plain' in format_type:
+                    if 'charset=utf-8' in format_type or 'utf-8' in about:
+                        metadata['text_url'] = about
+                    metadata['file_formats']['text'] = about
+                elif 'text/html' in format_type:
+                    metadata['file_formats']['html'] = about
+                elif 'application/epub' in format_type:
+                    metadata['file_formats']['epub'] = about
+                elif 'application/pdf' in format_type:
+                    metadata['file_formats']['pdf'] = about
+
+        return metadata
+
+    except Exception:
+        return None
+
+def reference_rdf_metadata(rdf_files):
+    """Reference metadata for (text_id, path or bytes) pairs, in order, skipping failures"""
+    metadata = {}
+    for text_id, rdf_file in rdf_files:
+        parsed = reference_parse_rdf(io.BytesIO(rdf_file) if isinstance(rdf_file, bytes) else rdf_file)
+        if parsed:
+            metadata[text_id] = parsed
+    return metadata
+
+def fixture_catalog():
+    """The CSV fixture catalog merged with the RDF fixture metadata, as process_all builds it"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "pg_catalog.csv")
+        write_catalog_csv(csv_path, catalog_csv_rows())
+        catalog = reference_parse_csv(csv_path)
+
+    for text_id, metadata in reference_rdf_metadata(rdf_documents().items()).items():
+        if text_id in catalog:
+            catalog[text_id].update(metadata)
+    return catalog
+
+def search_queries(catalog, rng):
+    """Exact titles, misspelled titles, authors and subject words for search comparisons"""
+    entries = list(catalog.values())
+    queries = [rng.choice(entries)['title'] for _ in range(10)]
+    for _ in range(15):
+        title = list(rng.choice(entries)['title'])
+        del title[rng.randrange(len(title))]
+        queries.append(''.join(title))
+    queries += [entry['primary_author'] for entry in entries[:5] if entry['primary_author']]
+    queries += ["sea stories", "History England", "fiction", "Frankenstein", "pride prejudice", "nothing here"]
+    return queries
 
 def test_catalog():
     """Test the generated catalog"""
@@ -60,6 +386,769 @@ def test_catalog():
 
     return True
 
+def test_csv_streaming():
+    """Streamed CSV entries and catalog JSON match the original in-memory parser byte for byte"""
+    print("\n=== CSV Streaming ===")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "pg_catalog.csv")
+        write_catalog_csv(csv_path, catalog_csv_rows())
+        expected = reference_parse_csv(csv_path)
+        assert '1342' in expected and '2000' not in expected and '100' in expected
+
+        parser = GutenbergCatalogParser(tmp_dir, os.path.join(tmp_dir, "out"))
+        entries = list(parser.iterCSVCatalog(csv_path))
+        assert [str(entry['text_id']) for entry in entries] == list(expected)
+        assert entries == list(expected.values())
+        assert parser.parseCSVCatalog(csv_path) == expected
+
+        saved_path = os.path.join(tmp_dir, "saved.json")
+        streamed_path = os.path.join(tmp_dir, "streamed.json")
+        parser.saveCatalogJSON(expected, saved_path)
+        assert parser.streamCatalogJSON(parser.iterCSVCatalog(csv_path), streamed_path) == len(expected)
+        with open(saved_path, 'rb') as f:
+            saved = f.read()
+        with open(streamed_path, 'rb') as f:
+            streamed = f.read()
+        assert streamed == saved == json.dumps(expected, indent=2, ensure_ascii=False).encode('utf-8')
+
+        # No entries at all still makes the same (empty) document
+        assert parser.streamCatalogJSON(iter(()), streamed_path) == 0
+        with open(streamed_path, encoding='utf-8') as f:
+            assert f.read() == json.dumps({}, indent=2)
+
+        # The single-pass build writes the catalog and index the two-pass build would
+        index = parser.processCSVStreaming()
+        assert index == parser.buildSearchIndex(expected)
+        with open(os.path.join(tmp_dir, "out", "gutenberg_catalog.json"), 'rb') as f:
+            assert f.read() == saved
+        with open(os.path.join(tmp_dir, "out", "gutenberg_search_index.json"), encoding='utf-8') as f:
+            assert json.load(f) == json.loads(json.dumps(index))
+
+    print(f"  ✓ {len(expected)} entries streamed identically")
+
+def test_parallel_rdf_parsing():
+    """The process pool parses an RDF directory exactly like the original serial parser"""
+    print("\n=== Parallel RDF Parsing ===")
+    documents = rdf_documents()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rdf_dir = os.path.join(tmp_dir, "rdf_files")
+        epub_dir = write_rdf_tree(rdf_dir, documents)
+        parser = GutenbergCatalogParser(tmp_dir, tmp_dir)
+
+        listed = [(text_dir.name, str(text_dir / f"pg{text_dir.name}.rdf")) for text_dir in epub_dir.iterdir()
+                  if text_dir.name.isdigit() and (text_dir / f"pg{text_dir.name}.rdf").exists()]
+        assert parser._list_rdf_files(epub_dir) == listed and len(listed) == len(documents)
+        expected = reference_rdf_metadata(listed)
+        assert expected['1342']['text_url'].endswith("1342.txt.utf-8") and expected['2701']['downloads'] == 0
+        assert '5' not in expected and '64317' not in expected
+
+        for workers, chunk_size in ((1, 500), (2, 3), (3, 1)):
+            parsed = parser.parseRDFMetadata(rdf_dir, workers=workers, chunk_size=chunk_size)
+            assert parsed == expected and list(parsed) == list(expected), (workers, chunk_size)
+
+        # A limit counts RDF files in directory order, parsed or not
+        limited = parser.parseRDFMetadata(rdf_dir, workers=2, limit=10, chunk_size=4)
+        assert limited == reference_rdf_metadata(listed[:10])
+
+        # A directory without the numbered layout yields nothing
+        assert parser.parseRDFMetadata(os.path.join(tmp_dir, "missing"), workers=2) == {}
+        os.mkdir(os.path.join(tmp_dir, "empty"))
+        assert parser.parseRDFMetadata(os.path.join(tmp_dir, "empty"), workers=2) == {}
+
+    print(f"  ✓ {len(expected)} of {len(documents)} RDF files parsed identically across workers")
+
+def test_rdf_archive_streaming():
+    """Streaming the tar.bz2 archive gives the same metadata as parsing it extracted"""
+    print("\n=== RDF Archive Streaming ===")
+    documents = rdf_documents()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tar_path = os.path.join(tmp_dir, "rdf-files.tar.bz2")
+        write_rdf_archive(tar_path, documents)
+        parser = GutenbergCatalogParser(tmp_dir, os.path.join(tmp_dir, "out"))
+
+        # Only pg<id>.rdf files come out, in archive order
+        members = list(parser.iterRDFArchive(tar_path))
+        assert members == list(documents.items())
+        expected = reference_rdf_metadata(members)
+
+        for workers, chunk_size in ((1, 500), (2, 4)):
+            parsed = parser.parseRDFArchive(tar_path, workers=workers, chunk_size=chunk_size)
+            assert parsed == expected and list(parsed) == list(expected), (workers, chunk_size)
+        assert parser.parseRDFArchive(tar_path, workers=2, limit=9, chunk_size=4) == reference_rdf_metadata(members[:9])
+
+        extract_dir = os.path.join(tmp_dir, "extracted")
+        with tarfile.open(tar_path, 'r:bz2') as tar:
+            tar.extractall(path=extract_dir)
+        assert parser.parseRDFMetadata(extract_dir, workers=2) == expected
+
+        # The full build merges the streamed RDF metadata into the CSV catalog as before
+        write_catalog_csv(os.path.join(tmp_dir, "pg_catalog.csv"), catalog_csv_rows())
+        catalog = reference_parse_csv(os.path.join(tmp_dir, "pg_catalog.csv"))
+        for text_id, metadata in expected.items():
+            if text_id in catalog:
+                catalog[text_id].update(metadata)
+        assert catalog['1342']['downloads'] == 51234 and 'downloads' not in catalog['5']
+
+        assert parser.process_all(workers=2) == catalog
+        with open(os.path.join(tmp_dir, "out", "gutenberg_catalog.json"), encoding='utf-8') as f:
+            assert f.read() == json.dumps(catalog, indent=2, ensure_ascii=False)
+
+    print(f"  ✓ {len(members)} archive members streamed, {len(expected)} parsed")
+
+FORMAT_VALUES = ["text/plain; charset=utf-8", "text/plain", "text/plain; charset=us-ascii", "text/html",
+                 "application/epub+zip", "application/pdf", "application/zip", "image/jpeg", None]
+
+def random_rdf_document(rng, text_id):
+    """RDF document with ebook parts in random order, nesting and values"""
+    def value(text):
+        return f'<rdf:value>{text}</rdf:value>' if text is not None else '<rdf:value/>'
+
+    def format_element():
+        inner = rng.choice([
+            lambda: f'<rdf:Description>{value(rng.choice(FORMAT_VALUES))}</rdf:Description>',
+            lambda: f'<rdf:Description><rdf:Description>{value(rng.choice(FORMAT_VALUES))}</rdf:Description></rdf:Description>',
+            lambda: f'<rdf:Description><dcam:memberOf rdf:resource="IMT"/></rdf:Description>',
+            lambda: f'<rdf:Description>{value(rng.choice(FORMAT_VALUES))}{value("text/html")}</rdf:Description>',
+        ])()
+        return f'<dcterms:format>{inner}</dcterms:format>'
+
+    def file_element():
+        about = f"https://www.gutenberg.org/ebooks/{text_id}.{rng.choice(['txt', 'utf-8', 'html', 'epub', 'pdf'])}"
+        parts = [format_element() for _ in range(rng.randint(0, 2))]
+        if rng.random() < 0.3:
+            parts.insert(0, value("text/plain; charset=utf-8"))  # Outside dcterms:format, so ignored
+        return f'<pgterms:file rdf:about="{about}">{"".join(parts)}</pgterms:file>'
+
+    def downloads_element():
+        text = rng.choice([str(rng.randint(0, 10 ** 6)), f" {rng.randint(0, 99)}\n", "", "many"])
+        return f'<pgterms:downloads>{text}</pgterms:downloads>' if text else '<pgterms:downloads/>'
+
+    parts = [f'<dcterms:hasFormat>{file_element()}</dcterms:hasFormat>' for _ in range(rng.randint(0, 4))]
+    parts += [downloads_element() for _ in range(rng.randint(0, 2))]
+    parts.append(f'<dcterms:title>Title {text_id}</dcterms:title>')
+    rng.shuffle(parts)
+
+    # Files and downloads outside the ebook belong to other records
+    outside = rng.choice(['', downloads_element(), file_element()])
+    ebook = f'<pgterms:ebook rdf:about="ebooks/{text_id}">{"".join(parts)}</pgterms:ebook>'
+    if rng.random() < 0.2:
+        ebook = f'<rdf:Description>{ebook}</rdf:Description>'
+    if rng.random() < 0.5:
+        body = outside + ebook
+    else:
+        body = ebook + outside
+
+    namespaces = ' '.join(f'xmlns:{prefix}="{uri}"' for prefix, uri in RDF_NAMESPACES.items())
+    return f'<?xml version="1.0" encoding="utf-8"?>\n<rdf:RDF {namespaces}>{body}</rdf:RDF>'.encode('utf-8')
+
+class CountingReader(io.BytesIO):
+    """BytesIO that remembers how many bytes were read"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+def test_iterparse_rdf():
+    """Incremental RDF parsing returns what the ElementTree parser did and stops after the ebook"""
+    print("\n=== Incremental RDF Parsing ===")
+    parser = GutenbergCatalogParser(".", ".")
+    rng = random.Random(0)
+
+    documents = list(rdf_documents().items())
+    documents += [(str(number), random_rdf_document(rng, number)) for number in range(400)]
+
+    parsed = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for text_id, document in documents:
+            expected = reference_parse_rdf(io.BytesIO(document))
+            assert parser._parse_single_rdf(io.BytesIO(document), text_id) == expected, document
+
+            path = os.path.join(tmp_dir, f"pg{text_id}.rdf")
+            with open(path, 'wb') as f:
+                f.write(document)
+            assert parser._parse_single_rdf(path, text_id) == expected
+            parsed += expected is not None
+
+    assert parsed > len(documents) // 2
+
+    # Records after the first ebook are never read
+    padding = ''.join(f'<rdf:Description rdf:about="agent/{number}"><pgterms:name>Name {number}</pgterms:name>'
+                      f'</rdf:Description>' for number in range(5000))
+    document = rdf_document('1342', 5, [("https://www.gutenberg.org/ebooks/1342.txt.utf-8", ["text/plain"])],
+                            after=padding)
+    source = CountingReader(document)
+    assert parser._iterparse_rdf(source) == reference_parse_rdf(io.BytesIO(document))
+    assert source.bytes_read < len(document) // 4
+
+    print(f"  ✓ {len(documents)} RDF documents ({parsed} with an ebook) parsed identically")
+
+def test_title_character_index():
+    """Fuzzy candidates keep every title a full SequenceMatcher scan matches"""
+    print("\n=== Title Character Index ===")
+    rng = random.Random(0)
+    parser = GutenbergCatalogParser(".", ".")
+
+    titles = {}
+    for number in range(600):
+        words = [rng.choice(TITLE_WORDS) for _ in range(rng.randint(1, 6))]
+        titles[str(number)] = parser._normalize_for_search(' '.join(words).title())
+    index = TitleCharacterIndex(titles)
+
+    def perturb(text):
+        chars = list(text)
+        for _ in range(rng.randint(0, 3)):
+            position = rng.randrange(len(chars) + 1)
+            if rng.random() < 0.5 or not chars[position:]:
+                chars.insert(position, rng.choice('abcdefghijklmnopqrstuvwxyz '))
+            else:
+                del chars[position]
+        return parser._normalize_for_search(''.join(chars)) or 'a'
+
+    # Short words matched only through runs of one or two characters
+    queries = ['king', 'in', 'rendering', 'generation']
+    queries += [perturb(rng.choice(index.titles)) for _ in range(150)]
+
+    matches = scored = 0
+    for query in queries:
+        brute_force = [number for number, title in enumerate(index.titles)
+                       if SequenceMatcher(None, query, title).ratio() > 0.6]
+        candidates = index.candidates(query)
+        filtered = [number for number in candidates
+                    if SequenceMatcher(None, query, index.titles[number]).ratio() > 0.6]
+        assert filtered == brute_force, query
+        assert len(candidates) < len(index.titles)
+        matches += len(brute_force)
+        scored += len(candidates)
+
+    assert matches > len(queries)
+    # The common subsequence bound leaves few titles to score that then miss
+    assert scored < 2 * matches, (scored, matches)
+    print(f"  ✓ {len(queries)} queries, {matches} matches from {scored} candidates, none lost")
+
+def reference_bm25(query, catalog, weights, k1, b):
+    """Textbook BM25 over field-weighted term counts, scored for every document"""
+    def terms(text):
+        return [word for word in re.findall(r'\b\w+\b', text.lower()) if len(word) > 2]
+
+    frequencies = {}
+    for text_id, entry in catalog.items():
+        counts = {}
+        for field, weight in weights.items():
+            value = entry.get(field) or ''
+            for term in terms(' '.join(value) if isinstance(value, list) else value):
+                counts[term] = counts.get(term, 0.0) + weight
+        if counts:
+            frequencies[text_id] = counts
+
+    average_length = sum(sum(counts.values()) for counts in frequencies.values()) / len(frequencies)
+    scores = {}
+    for term in set(terms(query)):
+        containing = [text_id for text_id, counts in frequencies.items() if term in counts]
+        idf = math.log(1 + (len(frequencies) - len(containing) + 0.5) / (len(containing) + 0.5))
+        for text_id in containing:
+            tf = frequencies[text_id][term]
+            length = sum(frequencies[text_id].values())
+            scores[text_id] = scores.get(text_id, 0.0) + idf * tf * (k1 + 1) / (
+                tf + k1 * (1 - b + b * length / average_length))
+    return scores
+
+def test_bm25_ranking():
+    """BM25 scores follow the textbook formula with the configured field weights and k1/b"""
+    print("\n=== BM25 Ranking ===")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "pg_catalog.csv")
+        write_catalog_csv(csv_path, catalog_csv_rows())
+        catalog = reference_parse_csv(csv_path)
+
+    class FlatParser(GutenbergCatalogParser):
+        BM25_K1 = 2.0
+        BM25_B = 0.0
+
+    queries = ["sea stories", "the history of england", "adventures", "Classics love", "garden garden", "zzz", "of"]
+    for parser_class in (GutenbergCatalogParser, FlatParser):
+        parser = parser_class(".", ".")
+        index = parser.buildSearchIndex(catalog)
+        for query in queries:
+            expected = reference_bm25(query, catalog, parser.BM25_FIELD_WEIGHTS, parser.BM25_K1, parser.BM25_B)
+            ranked = parser.rankFullText(query, index, catalog, limit=len(catalog))
+            assert sorted(text_id for _, text_id in ranked) == sorted(expected), query
+            assert all(math.isclose(score, expected[text_id]) for score, text_id in ranked), query
+            assert [score for score, _ in ranked] == sorted((score for score, _ in ranked), reverse=True)
+
+    parser = GutenbergCatalogParser(".", ".")
+    index = parser.buildSearchIndex(catalog)
+    ranked = parser.rankFullText("sea stories", index, catalog, limit=3)
+    assert len(ranked) == 3
+    assert parser.rankFullText("sea stories", index, catalog, exclude={ranked[0][1]})[:2] == ranked[1:]
+    partial = {text_id: entry for text_id, entry in catalog.items() if text_id != ranked[0][1]}
+    assert parser.rankFullText("sea stories", index, partial)[:2] == ranked[1:]
+    assert parser.rankFullText("sea stories", {}, catalog) == []
+
+    # A term in the title outweighs the same term in the subjects
+    weighted = {
+        '1': {'title': "Whaling", 'authors': [], 'subjects': "", 'bookshelves': ""},
+        '2': {'title': "Voyages", 'authors': [], 'subjects': "Whaling", 'bookshelves': ""},
+        '3': {'title': "Voyages", 'authors': ["Whaling Society"], 'subjects': "", 'bookshelves': ""},
+    }
+    ranked = parser.rankFullText("whaling", parser.buildSearchIndex(weighted), weighted)
+    assert [text_id for _, text_id in ranked] == ['1', '3', '2']
+
+    # Word matches are scaled so the best one scores 0.5
+    words = [result for result in parser.searchByTitle("sea stories", index, catalog, limit=50)
+             if result['match_type'] == 'word_match']
+    assert words and words[0]['score'] == 0.5 and all(0 < result['score'] <= 0.5 for result in words)
+
+    print(f"  ✓ {len(queries)} queries scored as textbook BM25 with two parameter sets")
+
+def test_rank_ties():
+    """Equal BM25 scores rank by text ID, the same way in JSON and binary indexes"""
+    print("\n=== BM25 Ties ===")
+    parser = GutenbergCatalogParser(".", ".")
+    catalog = {}
+    for text_id in ['100', '9', '2', '10', '21']:
+        catalog[text_id] = {'text_id': text_id, 'title': "Sea Stories", 'primary_author': "Anon",
+                            'authors': ["Anon"], 'subjects': [], 'bookshelves': []}
+    catalog['21']['subjects'] = ["Sea stories"]
+    index = parser.buildSearchIndex(catalog)
+
+    ranked = parser.rankFullText("sea stories", index, catalog)
+    assert [text_id for _, text_id in ranked] == ['21', '2', '9', '10', '100']
+    assert ranked[1][0] == ranked[4][0] < ranked[0][0]
+    assert [text_id for _, text_id in parser.rankFullText("sea", index, catalog, limit=2)] == ['21', '2']
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "index.bin")
+        writeBinaryIndex(index, catalog, path)
+        with BinarySearchIndex(path) as reader:
+            binary = [(score, reader.text_ids[number])
+                      for score, number in parser.rankFullText("sea stories", reader, reader.catalog)]
+            assert [text_id for _, text_id in binary] == [text_id for _, text_id in ranked]
+            assert [round(score, 5) for score, _ in binary] == [round(score, 5) for score, _ in ranked]
+
+    print("  ✓ 4 tied entries ordered by text ID in both indexes")
+
+def test_binary_index():
+    """Searches over the memory-mapped index return what the JSON index returns"""
+    print("\n=== Binary Search Index ===")
+    parser = GutenbergCatalogParser(".", ".")
+    catalog = fixture_catalog()
+    # The index is searched after a round trip through its JSON file
+    index = json.loads(json.dumps(parser.buildSearchIndex(catalog)))
+    queries = search_queries(catalog, random.Random(0))
+
+    def comparable(results):
+        return [{**result, 'score': round(result['score'], 5)} for result in results]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "index.bin")
+        assert writeBinaryIndex(index, catalog, path) == len(catalog)
+
+        with BinarySearchIndex(path) as reader:
+            assert reader.documents == len(catalog) == len(reader.catalog)
+            assert [reader.catalog[number] for number in range(len(catalog))] == list(catalog.values())
+            assert [reader.text_ids[number] for number in range(len(catalog))] == list(catalog)
+            assert reader.documentNumber('1342') == list(catalog).index('1342')
+            assert reader.documentNumber('2000') is None and -1 not in reader.catalog
+
+            for name in ('by_title', 'by_author', 'by_word'):
+                table = reader[name]
+                assert list(table) == sorted(index[name], key=lambda term: term.encode('utf-8'))
+                assert {term: [reader.text_ids[number] for number in table[term]] for term in table} == index[name]
+                assert "no such term" not in table and table.get(42) is None
+            assert list(reader['normalized_titles'].values()) == list(index['normalized_titles'].values())
+
+            for query in queries:
+                for limit in (3, 20):
+                    expected = parser.searchByTitle(query, index, catalog, limit=limit)
+                    results = parser.searchByTitle(query, reader, reader.catalog, limit=limit)
+                    assert comparable(results) == comparable(expected), query
+
+            titles = reader['normalized_titles']
+
+        # Views handed out keep the map alive through close()
+        assert titles[0] == index['normalized_titles']['1342']
+        del titles
+
+        # Index entries missing from the catalog are left out of the file
+        partial = {text_id: entry for text_id, entry in catalog.items() if text_id != '1342'}
+        assert writeBinaryIndex(index, partial, path) == len(partial)
+        with BinarySearchIndex(path) as reader:
+            assert reader.documentNumber('1342') is None
+            assert '1342' not in [entry['text_id'] for entry in
+                                  parser.searchByTitle("Pride and Prejudice", reader, reader.catalog)]
+
+        # Files from an older format version are refused rather than misread
+        with open(path, 'rb') as f:
+            data = f.read()
+        footer_end = len(data) - 16
+        (footer_length,) = struct.unpack('<Q', data[footer_end:footer_end + 8])
+        footer = json.loads(data[footer_end - footer_length:footer_end])
+        footer['version'] = 1
+        old_footer = json.dumps(footer).encode('utf-8')
+        old_path = os.path.join(tmp_dir, "old.bin")
+        with open(old_path, 'wb') as f:
+            f.write(data[:footer_end - footer_length] + old_footer + struct.pack('<Q', len(old_footer)) + data[-8:])
+
+        not_an_index = os.path.join(tmp_dir, "catalog.json")
+        with open(not_an_index, 'w', encoding='utf-8') as f:
+            json.dump(catalog, f)
+
+        for bad_path, message in ((old_path, "has version 1, expected 2"), (not_an_index, "Not a Gutenberg index file")):
+            try:
+                BinarySearchIndex(bad_path)
+            except ValueError as e:
+                assert message in str(e)
+            else:
+                raise AssertionError(f"{bad_path} was accepted as a binary index")
+
+    print(f"  ✓ {len(queries)} queries answered identically from {len(catalog)} mapped documents")
+
+def test_stale_binary_index():
+    """The binary index is only loaded while it records being built from the JSON files as they are"""
+    print("\n=== Binary Index Staleness ===")
+    parser = GutenbergCatalogParser(".", ".")
+    catalog = {'1': {'text_id': '1', 'title': "Moby Dick", 'primary_author': "Herman Melville"}}
+    index = parser.buildSearchIndex(catalog)
+    paths = (search_gutenberg.CATALOG_PATH, search_gutenberg.INDEX_PATH, search_gutenberg.BINARY_INDEX_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog_path, index_path, binary_path = (os.path.join(tmp_dir, os.path.basename(path)) for path in paths)
+        other_catalog_path = os.path.join(tmp_dir, "gutenberg_catalog.json")
+        for path in (catalog_path, other_catalog_path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+
+        def loads_binary():
+            search_index, loaded = search_gutenberg.load_search_data()
+            if isinstance(search_index, BinarySearchIndex):
+                search_index.close()
+                return True
+            assert search_index == index and loaded == catalog
+            return False
+
+        search_gutenberg.CATALOG_PATH, search_gutenberg.INDEX_PATH, search_gutenberg.BINARY_INDEX_PATH = (
+            catalog_path, index_path, binary_path)
+        try:
+            # Built from the JSON files the search reads
+            writeBinaryIndex(index, catalog, binary_path, sources={'catalog': catalog_path, 'index': index_path})
+            assert loads_binary()
+
+            # Rewriting either JSON file makes the binary index stale, even with an older modification time
+            for path in (catalog_path, index_path):
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+                assert not loads_binary()
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                assert loads_binary()
+            with open(index_path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+            assert not loads_binary()
+
+            # Built from the catalog alone, as by --build-index
+            writeBinaryIndex(index, catalog, binary_path, sources={'catalog': catalog_path})
+            assert loads_binary()
+
+            # Built from another catalog (process_all writes gutenberg_catalog.json), or with no sources recorded
+            writeBinaryIndex(index, catalog, binary_path, sources={'catalog': other_catalog_path, 'index': index_path})
+            assert not loads_binary()
+            writeBinaryIndex(index, catalog, binary_path)
+            assert not loads_binary()
+        finally:
+            search_gutenberg.CATALOG_PATH, search_gutenberg.INDEX_PATH, search_gutenberg.BINARY_INDEX_PATH = paths
+
+    print("  ✓ Binary index from other or changed JSON files falls back to the JSON files")
+
+def reference_show_stats(catalog):
+    """The statistics report the original show_stats printed, computed from the whole catalog"""
+    total_texts = len(catalog)
+    texts_with_urls = sum(1 for entry in catalog.values() if entry.get('text_url'))
+    texts_with_downloads = sum(1 for entry in catalog.values() if entry.get('downloads'))
+
+    authors = {}
+    for entry in catalog.values():
+        author = entry.get('primary_author', 'Unknown')
+        if author:
+            authors[author] = authors.get(author, 0) + 1
+    top_authors = sorted(authors.items(), key=lambda x: x[1], reverse=True)[:10]
+
+    download_counts = [entry.get('downloads', 0) for entry in catalog.values() if entry.get('downloads')]
+    if download_counts:
+        avg_downloads = sum(download_counts) / len(download_counts)
+        max_downloads = max(download_counts)
+        most_downloaded = max(catalog.values(), key=lambda x: x.get('downloads', 0))
+
+    print("=== Project Gutenberg Catalog Statistics ===\n")
+    print(f"Total English texts: {total_texts:,}")
+    print(f"Texts with download URLs: {texts_with_urls:,} ({texts_with_urls/total_texts*100:.1f}%)")
+    print(f"Texts with download stats: {texts_with_downloads:,} ({texts_with_downloads/total_texts*100:.1f}%)")
+
+    if download_counts:
+        print(f"\nDownload Statistics:")
+        print(f"Average downloads per text: {avg_downloads:,.0f}")
+        print(f"Maximum downloads: {max_downloads:,}")
+        print(f"Most downloaded: {most_downloaded['title']} ({most_downloaded.get('downloads', 0):,} downloads)")
+
+    print(f"\nTop 10 Authors by Number of Texts:")
+    for i, (author, count) in enumerate(top_authors, 1):
+        print(f"{i:2d}. {author}: {count} texts")
+
+def test_catalog_statistics():
+    """Incremental statistics match the original whole-catalog report and survive a save and resume"""
+    print("\n=== Catalog Statistics ===")
+    catalog = fixture_catalog()
+    # A tie for most downloaded goes to the entry seen first, as max() did
+    most = max(entry.get('downloads') or 0 for entry in catalog.values()) + 1
+    catalog['1342']['downloads'] = catalog['98']['downloads'] = most
+    entries = list(catalog.values())
+
+    stats = CatalogStatistics.fromCatalog(catalog)
+    data = stats.toDict()
+    with_downloads = [entry['downloads'] for entry in entries if entry.get('downloads')]
+    assert data['total_texts'] == len(catalog)
+    assert data['texts_with_urls'] == sum(1 for entry in entries if entry.get('text_url')) > 0
+    assert data['texts_with_downloads'] == len(with_downloads) > 2
+    assert data['average_downloads'] == sum(with_downloads) / len(with_downloads)
+    assert data['max_downloads'] == max(with_downloads)
+    assert data['most_downloaded']['text_id'] == '1342'
+    assert [item['downloads'] for item in data['top_downloaded']] == sorted(with_downloads, reverse=True)[:10]
+    assert sum(data['download_histogram'].values()) == len(catalog)
+    assert [CatalogStatistics.downloadBucket(n) for n in (0, 5, 10, 999, 51234)] == ['0', '1-9', '10-99', '100-999',
+                                                                                   '10000-99999']
+
+    # Resuming from a saved sidecar gives the same result as one pass
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sidecar = os.path.join(tmp_dir, "stats.json")
+        first = CatalogStatistics()
+        for entry in entries[:20]:
+            first.addEntry(entry)
+        first.save(sidecar)
+        resumed = CatalogStatistics.load(sidecar)
+        for entry in entries[20:]:
+            resumed.addEntry(entry)
+        assert resumed.toDict() == data
+
+        # search_gutenberg.py --stats prints the original report, from a sidecar it keeps current
+        paths = (search_gutenberg.CATALOG_PATH, search_gutenberg.STATS_PATH)
+        catalog_path = os.path.join(tmp_dir, "catalog.json")
+        stats_path = os.path.join(tmp_dir, "catalog_stats.json")
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(catalog, f)
+        search_gutenberg.CATALOG_PATH, search_gutenberg.STATS_PATH = catalog_path, stats_path
+        try:
+            for _ in range(2):
+                expected, printed = io.StringIO(), io.StringIO()
+                with redirect_stdout(expected):
+                    reference_show_stats(catalog)
+                with redirect_stdout(printed):
+                    search_gutenberg.show_stats()
+                assert printed.getvalue() == expected.getvalue()
+                assert os.path.exists(stats_path)
+
+            # A sidecar describing the catalog as it is is used as is
+            def tamper():
+                with open(stats_path, 'r+', encoding='utf-8') as f:
+                    saved = json.load(f)
+                    saved['total_texts'] = -1
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(saved, f)
+
+            def loads_sidecar():
+                loaded = search_gutenberg.load_stats()
+                if loaded['total_texts'] == -1:
+                    return True
+                assert {key: value for key, value in loaded.items() if key != 'sources'} == json.loads(
+                    json.dumps({key: value for key, value in data.items() if key != 'sources'}))
+                return False
+
+            tamper()
+            assert loads_sidecar()
+
+            # One for a rewritten catalog is rebuilt, even if the catalog's modification time went back
+            stat = os.stat(catalog_path)
+            os.utime(catalog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+            assert not loads_sidecar()
+            tamper()
+            assert loads_sidecar()
+
+            # As is one for another catalog (process_all describes gutenberg_catalog.json), or for none
+            other_catalog_path = os.path.join(tmp_dir, "gutenberg_catalog.json")
+            with open(other_catalog_path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f)
+            for sources in ({'catalog': other_catalog_path}, None):
+                stale = CatalogStatistics.load(stats_path)
+                stale.total_texts = -1
+                stale.save(stats_path, sources=sources)
+                assert not loads_sidecar()
+        finally:
+            search_gutenberg.CATALOG_PATH, search_gutenberg.STATS_PATH = paths
+
+    print(f"  ✓ Statistics for {len(catalog)} texts match the full-catalog report")
+
+def test_search_server():
+    """The server answers searches like the parser and counts them in its metrics"""
+    print("\n=== Search Server ===")
+    parser = GutenbergCatalogParser(".", ".")
+    catalog = fixture_catalog()
+    index = parser.buildSearchIndex(catalog)
+    queries = search_queries(catalog, random.Random(1))
+
+    def get(connection, path):
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    server = start_search_server(index, catalog)
+    try:
+        port = server.server_address[1]
+
+        # One keep-alive connection carries every request
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        assert get(connection, '/health') == (200, {'status': 'ok', 'texts': len(catalog)})
+
+        for query in queries:
+            status, payload = get(connection, '/search?' + urlencode({'q': query, 'limit': 5}))
+            expected = json.loads(json.dumps(parser.searchByTitle(query, index, catalog, limit=5)))
+            assert status == 200 and payload['query'] == query.strip() and payload['results'] == expected, query
+            assert payload['elapsed_ms'] >= 0
+
+        status, payload = get(connection, f'/search?q=the&limit={MAX_LIMIT * 10}')
+        assert status == 200 and len(payload['results']) == len(parser.searchByTitle("the", index, catalog, MAX_LIMIT))
+        assert get(connection, '/search?q=%20')[0] == 400
+        assert get(connection, '/search?q=sea&limit=ten') == (400, {'error': "limit must be an integer"})
+        for limit in (0, -3):
+            assert get(connection, f'/search?q=sea&limit={limit}') == (400, {'error': "limit must be at least 1"})
+        assert get(connection, '/nowhere')[0] == 404
+        connection.close()
+
+        # Concurrent clients, each reusing its own connection
+        failures = []
+
+        def client_searches(offset):
+            client = search_gutenberg.SearchClient('127.0.0.1', port)
+            try:
+                for query in queries[offset::4]:
+                    expected = json.loads(json.dumps(parser.searchByTitle(query, index, catalog, limit=10)))
+                    if client.search(query) != expected:
+                        failures.append(query)
+                first_connection = client.connection
+                client.search(queries[offset])
+                if client.connection is not first_connection:
+                    failures.append("reconnected")
+            finally:
+                client.close()
+
+        threads = [threading.Thread(target=client_searches, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not failures, failures
+
+        client = search_gutenberg.SearchClient('127.0.0.1', port)
+        try:
+            metrics = client.metrics()
+            try:
+                client._get('/nowhere')
+            except search_gutenberg.SearchServerError as e:
+                assert e.status == 404 and "404" in str(e)
+            else:
+                raise AssertionError("a 404 was returned as a result")
+        finally:
+            client.close()
+
+        searches = len(queries) + 1 + len(queries) + 4
+        assert metrics['queries'] == searches and metrics['errors'] == 4
+        assert metrics['queries_per_second'] > 0 and metrics['uptime_seconds'] > 0
+        assert 0 <= metrics['p50_ms'] <= metrics['p95_ms'] <= metrics['p99_ms'] <= metrics['max_ms']
+        assert metrics['mean_ms'] <= metrics['max_ms']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # The binary index serves the same results
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "index.bin")
+        writeBinaryIndex(index, catalog, path)
+        with BinarySearchIndex(path) as reader:
+            server = start_search_server(reader, reader.catalog)
+            client = search_gutenberg.SearchClient('127.0.0.1', server.server_address[1])
+            try:
+                for query in queries[:10]:
+                    expected = json.loads(json.dumps(parser.searchByTitle(query, index, catalog, limit=10)))
+                    results = client.search(query)
+                    assert [result['text_id'] for result in results] == [result['text_id'] for result in expected]
+            finally:
+                client.close()
+                server.shutdown()
+                server.server_close()
+
+    print(f"  ✓ {searches} searches served from one process, {metrics['errors']} rejected")
+
+def test_search_client_errors():
+    """Refused connections and server errors are reported, not raised; stdout pipe errors propagate"""
+    print("\n=== Search Client Errors ===")
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        closed_port = str(probe.getsockname()[1])
+
+    for args in (['--remote', '--search', "moby"], ['--metrics']):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_search_cli(*args, '--port', closed_port)
+        assert output.getvalue() == f"✗ No search server at 127.0.0.1:{closed_port}. Start one with --serve.\n"
+
+    parser = GutenbergCatalogParser(".", ".")
+    catalog = {'2701': {'text_id': '2701', 'title': "Moby Dick", 'primary_author': "Herman Melville"}}
+    server = start_search_server(parser.buildSearchIndex(catalog), catalog)
+    try:
+        port = str(server.server_address[1])
+        stdout = BrokenStdout()
+        try:
+            with redirect_stdout(stdout):
+                run_search_cli('--remote', '--search', "moby dick", '--port', port)
+        except BrokenPipeError:
+            pass
+        else:
+            raise AssertionError("BrokenPipeError was swallowed")
+        assert not [text for text in stdout.attempted if "No search server" in text]
+        assert server.metrics.snapshot()['queries'] == 1
+
+        # An error response prints the server's message
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_search_cli('--remote', '--search', "moby", '--limit', '0', '--port', port)
+        assert output.getvalue() == "✗ Search server error 400: limit must be at least 1\n"
+
+        # and the interactive session carries on after it
+        search = server.search
+        server.search = lambda query, limit: search(query, limit) if query != "boom" else 1 / 0
+        stdin = sys.stdin
+        sys.stdin = io.StringIO("boom\nmoby\n")
+        output = io.StringIO()
+        try:
+            with redirect_stdout(output):
+                run_search_cli('--remote', '--port', port)
+        finally:
+            sys.stdin = stdin
+            server.search = search
+        assert "✗ Search server error 500: division by zero\n" in output.getvalue()
+        assert "1. Moby Dick" in output.getvalue()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("  ✓ Refused connections and server errors reported, broken pipes left alone")
+
 def process_rdf_files():
     """Process RDF files to add download URLs"""
     parser = GutenbergCatalogParser(".", ".")
@@ -104,4 +1193,16 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--process-rdf":
         process_rdf_files()
     else:
-        test_catalog()
\ No newline at end of file
+        test_catalog()
+        test_csv_streaming()
+        test_parallel_rdf_parsing()
+        test_rdf_archive_streaming()
+        test_iterparse_rdf()
+        test_title_character_index()
+        test_bm25_ranking()
+        test_rank_ties()
+        test_binary_index()
+        test_stale_binary_index()
+        test_catalog_statistics()
+        test_search_server()
+        test_search_client_errors()
\ No newline at end of file
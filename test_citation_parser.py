@@ -4,7 +4,14 @@ Comprehensive test suite for the citation parser
 """
 
 from citation_parser import CitationParser
+from citation_columns import CitationColumnReader, writeCitationColumns
+from dataclasses import FrozenInstanceError
 import json
+import multiprocessing
+import os
+import tempfile
+import time
+import parse_footnotes
 
 def test_comprehensive_citations():
     """Test parser with comprehensive citation examples"""
@@ -141,8 +148,308 @@ def test_edge_cases():
         except Exception as e:
             print(f"  ✗ Error: {e}")
 
+def test_batch_parsing():
+    """Batch parsing must produce exactly what parseCitation produces"""
+
+    parser = CitationParser()
+
+    footnotes = [
+        "Genesis 1:1-3",
+        "  Matt 5:3-12  ",
+        "Romans 8:28; 1 Cor 13:4-7",
+        "Song of Solomon 2:1",
+        "see Genesis 1:1",
+        "Paradise Lost Book I, 1-26",
+        "Hamlet Act 3 Scene 1, 56-88",
+        "Absalom and Achitophel 1-10",
+        "cf. Genesis 3:15; Paradise Lost IX.1033-1045",
+        "Invalid 99:99-100",
+        "Not a citation at all",
+        ""
+    ]
+
+    print("\n=== Batch Parsing ===")
+
+    batch_results = list(parser.parseCitations(footnotes))
+    assert len(batch_results) == len(footnotes)
+
+    for footnote, batch_result in zip(footnotes, batch_results):
+        assert batch_result == parser.parseCitation(footnote), footnote
+
+    print(f"  ✓ {len(footnotes)} footnotes match single-citation parsing")
+
+def test_single_pass_engine():
+    """The combined engine must agree with the multi-pass classification path"""
+
+    parser = CitationParser()
+
+    footnotes = [
+        "Genesis 1:1-3",
+        "1 Chronicles 29:11",
+        "Song of Solomon 2:1",
+        "see Genesis 1:1",
+        "(Gen 1:1)",
+        "Invalid 99:99-100",
+        "Paradise Lost Book I, 1-26",
+        "Paradise Lost IX.1033-1045",
+        "Hamlet Act 3 Scene 1, 56-88",
+        "Hamlet Act 3 Scene 1, 56-88 (Gen 1:1)",
+        "Beowulf 1-50",
+        "Beowulf 1-50: Gen 1:1",
+        "Romans 8:28; 1 Cor 13:4-7",
+        "Beowulf 1-50; The Waste Land 430-433",
+        "cf. Genesis 3:15; Paradise Lost IX.1033-1045"
+    ]
+
+    print("\n=== Single-Pass Engine ===")
+
+    parsers = {
+        'bible': parser._parseBiblicalCitation,
+        'literature': parser._parseLiteraryCitation,
+        'mixed': parser._parseMixedCitation
+    }
+
+    for footnote in footnotes:
+        source_type = parser.identifySourceType(footnote)
+        citations = parsers[source_type](footnote)
+
+        assert parser._classifyAndParse(footnote) == (source_type, citations), footnote
+
+    print(f"  ✓ {len(footnotes)} footnotes match the multi-pass path")
+
+def test_book_name_lookup():
+    """Book names resolve through the trie in lookups and free-text scans"""
+
+    parser = CitationParser()
+
+    lookups = {
+        "Genesis": "Genesis",
+        "  MATT ": "Matthew",
+        "1 Cor": "1 Corinthians",
+        "1Cor": "1 Corinthians",
+        "1samuel": "1 Samuel",
+        "Song  of\tSolomon": "Song of Solomon",
+        "Song ofSolomon": None,
+        "see Genesis": None,
+        "": None
+    }
+
+    print("\n=== Book Name Lookup ===")
+
+    for name, expected in lookups.items():
+        assert parser.normalizeBookNames(name) == expected, name
+
+    found = parser.findBookNames("As in 1 Cor 13 and the Song of  Solomon, cf. Genesis.")
+    assert [canonical for _, _, canonical in found] == ['1 Corinthians', 'Song of Solomon', 'Genesis']
+
+    print(f"  ✓ {len(lookups)} lookups and a free-text scan resolved")
+
+def test_citation_cache():
+    """Cached parses match uncached ones and can't be corrupted by callers"""
+
+    parser = CitationParser()
+    cached_parser = CitationParser(cache_size=2)
+
+    print("\n=== Citation Cache ===")
+
+    footnotes = ["Genesis 1:1-3", " Genesis 1:1-3 ", "Paradise Lost Book I, 1-26", "Hamlet Act 3 Scene 1, 56-88", "Genesis 1:1-3"]
+    for footnote in footnotes:
+        assert cached_parser.parseCitation(footnote) == parser.parseCitation(footnote), footnote
+
+    stats = cached_parser.getCacheStats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 4, 2), stats
+    assert stats['size'] == 2
+
+    result = cached_parser.parseCitation("Hamlet Act 3 Scene 1, 56-88")
+    result['citations'][0]['work'] = 'Macbeth'
+    assert cached_parser.parseCitation("Hamlet Act 3 Scene 1, 56-88")['citations'][0]['work'] == 'Hamlet'
+
+    assert parser.getCacheStats() == {}
+
+    print(f"  ✓ Cache stats: {cached_parser.getCacheStats()}")
+
+def test_citation_results():
+    """Object results skip the dict conversion but convert to the same dicts"""
+
+    parser = CitationParser(cache_size=8)
+
+    print("\n=== Citation Result Objects ===")
+
+    footnotes = ["Romans 8:28; 1 Cor 13:4-7", "Paradise Lost Book I, 1-26", "Hamlet Act 3 Scene 1, 56-88"]
+    for footnote, (source_type, citations) in zip(footnotes, parser.iterCitationResults(footnotes)):
+        expected = parser.parseCitation(footnote)
+        assert source_type == expected['source_type']
+        assert [citation.toDict() for citation in citations] == expected['citations']
+
+    _, citations = parser.parseCitationResults("Genesis 1:1-3")
+    try:
+        citations[0].book = 'Exodus'
+        assert False, "CitationResult should be immutable"
+    except FrozenInstanceError:
+        pass
+
+    assert not hasattr(citations[0], '__dict__')
+    assert parser.parseCitationResults("Genesis 1:1-3")[1][0] is citations[0]
+
+    print("  ✓ Immutable, slotted results shared through the cache")
+
+def test_columnar_export():
+    """Citations survive a round trip through the columnar format"""
+
+    parser = CitationParser()
+
+    footnotes = [
+        "Romans 8:28; 1 Cor 13:4-7",
+        "Not a citation at all",
+        "Paradise Lost Book I, 1-26",
+        "Hamlet Act 3 Scene 1, 56-88",
+        "cf. Genesis 3:15; Paradise Lost IX.1033-1045",
+        "Beowulf 1-99999999999"
+    ] * 3
+
+    print("\n=== Columnar Export ===")
+
+    expected = []
+    for footnote_id, footnote in enumerate(footnotes):
+        for citation in parser.parseCitation(footnote)['citations']:
+            expected.append({'footnote_id': footnote_id, **citation})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'citations.citcol')
+        rows = writeCitationColumns(parser, footnotes, path, batch_size=4)
+        assert rows == len(expected)
+
+        with CitationColumnReader(path) as reader:
+            assert len(reader) == rows
+            assert len(reader.row_groups) == (rows + 3) // 4
+            assert list(reader.iterDicts()) == expected
+            assert sum(len(chunk) for chunk in reader.columnChunks('start_line')) == rows
+
+        # Values beyond int64 are rejected, and the partial file is not finalized
+        path = os.path.join(tmp_dir, 'overflow.citcol')
+        try:
+            writeCitationColumns(parser, ["Genesis 1:1", "Beowulf 1-99999999999999999999"], path)
+        except ValueError as e:
+            assert "end_line" in str(e)
+        else:
+            assert False, "expected ValueError"
+        assert not os.path.exists(path)
+
+    print(f"  ✓ {rows} citation rows written and read back")
+
+# Real chunk parser, for the crashing stand-ins below to delegate to
+_parse_chunk = parse_footnotes.parse_chunk
+# Chunks containing "CRASH" that the parent process parsed itself
+_parsed_in_process = []
+
+def crash_on_marker(footnotes):
+    """parse_chunk that kills any worker process given a chunk containing "CRASH" """
+    if "CRASH" in footnotes:
+        if multiprocessing.parent_process() is not None:
+            os._exit(1)
+        _parsed_in_process.append(footnotes)
+    return _parse_chunk(footnotes)
+
+def crash_once(footnotes):
+    """parse_chunk that kills the first worker process to see "CRASH", as flagged by a marker file"""
+    flag = os.environ['CRASH_ONCE_FLAG']
+    if "CRASH" in footnotes and multiprocessing.parent_process() is not None and not os.path.exists(flag):
+        open(flag, 'w').close()
+        os._exit(1)
+    return _parse_chunk(footnotes)
+
+def crash_behind_slow_chunk(footnotes):
+    """parse_chunk that is slow for "SLOW" and kills any worker given "CRASH", recording in-process parses"""
+    if "SLOW" in footnotes:
+        time.sleep(0.5)
+    if multiprocessing.parent_process() is None:
+        _parsed_in_process.append(footnotes)
+    elif "CRASH" in footnotes:
+        os._exit(1)
+    return _parse_chunk(footnotes)
+
+def test_parse_footnotes():
+    """parse_footnotes reads JSONL, keeps input order and survives worker crashes"""
+
+    print("\n=== Parallel Footnote Parsing ===")
+
+    parser = CitationParser()
+    footnotes = [f"Genesis {i % 50 + 1}:{i % 20 + 1}" if i % 3 else f"Paradise Lost Book I, {i}-{i + 5}"
+                 for i in range(200)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "footnotes.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'sourceInfo': "Matt 5:3-12", 'page': 1}) + "\n")
+            f.write("\n")
+            f.write(json.dumps("Rev 21:4") + "\n")
+            f.write("{not json\n")
+            f.write(json.dumps({'note': "Beowulf 1-50"}) + "\n")
+            f.write(json.dumps({'sourceInfo': 42}) + "\n")
+
+        # JSONL: the field of objects, plain strings as-is, '' for anything else; blank and invalid lines skipped
+        assert list(parse_footnotes.iter_footnotes(path)) == ["Matt 5:3-12", "Rev 21:4", "", ""]
+        assert list(parse_footnotes.iter_footnotes(path, field='note')) == ["", "Rev 21:4", "Beowulf 1-50", ""]
+        assert len(list(parse_footnotes.iter_footnotes(path, input_format='text'))) == 6
+
+        # Results come back in input order, with at most two chunks per worker in flight
+        expected = [json.dumps(footnote, ensure_ascii=False) for footnote in parser.parseCitations(footnotes)]
+        pulled = 0
+
+        def chunks():
+            nonlocal pulled
+            for chunk in parse_footnotes.iter_chunks(footnotes, 7):
+                pulled += 1
+                yield chunk
+
+        lines = []
+        for done, chunk_lines in enumerate(parse_footnotes.parse_chunks_parallel(chunks(), workers=2), 1):
+            assert pulled - done <= 2 * 2, (pulled, done)
+            lines.extend(chunk_lines)
+        assert lines == expected
+
+        # A chunk that crashes every worker is retried, then parsed in-process; nothing is lost or reordered
+        crashing = footnotes[:30] + ["CRASH"] + footnotes[30:]
+        expected = [json.dumps(footnote, ensure_ascii=False) for footnote in parser.parseCitations(crashing)]
+        for stand_in in (crash_on_marker, crash_once):
+            os.environ['CRASH_ONCE_FLAG'] = os.path.join(tmp_dir, f"{stand_in.__name__}.flag")
+            parse_footnotes.parse_chunk = stand_in
+            try:
+                chunks = parse_footnotes.iter_chunks(crashing, 7)
+                lines = [line for chunk_lines in parse_footnotes.parse_chunks_parallel(chunks, workers=2)
+                         for line in chunk_lines]
+            finally:
+                parse_footnotes.parse_chunk = _parse_chunk
+                del os.environ['CRASH_ONCE_FLAG']
+            assert lines == expected, stand_in.__name__
+        assert len(_parsed_in_process) == 1
+        assert os.path.exists(os.path.join(tmp_dir, "crash_once.flag"))
+
+        # The crash is charged to the chunk that caused it, not to a slow one ahead of it in the queue
+        del _parsed_in_process[:]
+        crashing = ["SLOW"] + footnotes[:10] + ["CRASH"] + footnotes[10:]
+        expected = [json.dumps(footnote, ensure_ascii=False) for footnote in parser.parseCitations(crashing)]
+        parse_footnotes.parse_chunk = crash_behind_slow_chunk
+        try:
+            chunks = parse_footnotes.iter_chunks(crashing, 7)
+            lines = [line for chunk_lines in parse_footnotes.parse_chunks_parallel(chunks, workers=2)
+                     for line in chunk_lines]
+        finally:
+            parse_footnotes.parse_chunk = _parse_chunk
+        assert lines == expected
+        assert [("SLOW" in chunk, "CRASH" in chunk) for chunk in _parsed_in_process] == [(False, True)]
+
+    print("  ✓ JSONL footnotes parsed in order, through worker crashes")
+
 if __name__ == "__main__":
     successful, total = test_comprehensive_citations()
     test_edge_cases()
+    test_batch_parsing()
+    test_single_pass_engine()
+    test_book_name_lookup()
+    test_citation_cache()
+    test_citation_results()
+    test_columnar_export()
+    test_parse_footnotes()
 
     print(f"\n🎯 Final Result: {successful}/{total} tests passed")
\ No newline at end of file
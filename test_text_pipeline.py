@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+"""
+Tests for the text pipeline's downloader against a local stand-in HTTP server
+"""
+
+from async_downloader import AsyncDownloader
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from text_pipeline import TextPipeline
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from email.utils import parsedate_to_datetime
+
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves /texts/<id>.txt (with Range support), redirects /ebooks/<id> there,
+    and 404s everything else; paths in server.cut_once drop the connection
+    halfway through their first transfer. Every text has an ETag from
+    server.etags (default "v1") and a fixed Last-Modified date, and
+    conditional requests get 304s
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.ranges.append(self.headers.get('Range'))
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        try:
+            time.sleep(server.delay)
+
+            if self.path.startswith('/ebooks/'):
+                self.send_response(302)
+                self.send_header('Location', '/texts/' + self.path.rsplit('/', 1)[1] + '.txt')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = server.texts.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            etag = server.etags.get(self.path, '"v1"')
+            if_none_match = self.headers.get('If-None-Match')
+            if_modified_since = self.headers.get('If-Modified-Since')
+            if (if_none_match == etag or
+                    (if_none_match is None and if_modified_since and
+                     parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(LAST_MODIFIED))):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            charset = 'latin-1' if self.path.endswith('latin.txt') else 'utf-8'
+            data = body.encode(charset)
+            total = len(data)
+            start = 0
+
+            requested = self.headers.get('Range')
+            if requested and requested.startswith('bytes=') and self.headers.get('If-Range') in (None, etag):
+                start = int(requested[len('bytes='):].rstrip('-'))
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{total - 1}/{total}')
+            else:
+                self.send_response(200)
+            self.send_header('Content-Type', f'text/plain; charset={charset}')
+            self.send_header('Content-Length', str(total - start))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', LAST_MODIFIED)
+            self.end_headers()
+
+            if self.path in server.cut_once:
+                server.cut_once.discard(self.path)
+                self.wfile.write(data[start:start + (total - start) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+
+            self.wfile.write(data[start:])
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stand_in(texts, delay=0.0, cut_once=()):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.texts = texts
+    server.delay = delay
+    server.cut_once = set(cut_once)
+    server.etags = {}
+    server.lock = threading.Lock()
+    server.requests = []
+    server.ranges = []
+    server.connections = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_concurrent_downloads():
+    """Downloads overlap up to the concurrency bound, follow redirects and reuse connections"""
+
+    texts = {f'/texts/{i}.txt': f"Text number {i}\n" * 1000 for i in range(12)}
+    texts['/texts/latin.txt'] = "Café au lait\n"
+    server, base = start_stand_in(texts, delay=0.05)
+
+    print("\n=== Concurrent Downloads ===")
+
+    try:
+        downloader = AsyncDownloader(max_concurrency=4, requests_per_second=None)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jobs = [(f"{base}/ebooks/{i}", os.path.join(tmp_dir, f"{i}.txt")) for i in range(12)]
+            jobs.append((f"{base}/texts/latin.txt", os.path.join(tmp_dir, "latin.txt")))
+            jobs.append((f"{base}/texts/missing.txt", os.path.join(tmp_dir, "missing.txt")))
+
+            results = downloader.downloadMany(jobs)
+            downloader.close()
+
+            for i in range(12):
+                assert results[i]['url'] == f"{base}/texts/{i}.txt", results[i]
+                with open(jobs[i][1], encoding='utf-8') as f:
+                    assert f.read() == texts[f'/texts/{i}.txt']
+
+            with open(jobs[12][1], encoding='utf-8') as f:
+                assert f.read() == "Café au lait\n"
+
+            assert '404' in results[13]['error']
+            assert not os.path.exists(jobs[13][1])
+
+        assert 1 < server.max_in_flight <= 4, server.max_in_flight
+        assert len(server.connections) <= 4, server.connections
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"  ✓ {len(jobs)} jobs, {server.max_in_flight} in flight, {len(server.connections)} connections")
+
+def test_rate_limit():
+    """The per-host token bucket spaces out request starts"""
+
+    texts = {f'/texts/{i}.txt': "text\n" for i in range(5)}
+    server, base = start_stand_in(texts)
+
+    print("\n=== Per-Host Rate Limit ===")
+
+    try:
+        downloader = AsyncDownloader(max_concurrency=5, requests_per_second=20)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            start = time.monotonic()
+            results = downloader.downloadMany([(f"{base}/texts/{i}.txt", os.path.join(tmp_dir, f"{i}.txt"))
+                                               for i in range(5)])
+            elapsed = time.monotonic() - start
+            downloader.close()
+
+        assert not any(result.get('error') for result in results), results
+        # One token up front, then one every 50 ms
+        assert elapsed >= 0.19, elapsed
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"  ✓ 5 requests at 20/s took {elapsed:.2f}s")
+
+def test_resumed_download():
+    """An interrupted transfer resumes from its .part file and is verified before publishing"""
+
+    body = "".join(f"Line {i} of a long book\n" for i in range(20000))
+    server, base = start_stand_in({'/texts/long.txt': body, '/texts/short.txt': "short\n"},
+                                  cut_once={'/texts/long.txt'})
+    expected_sha256 = hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+    print("\n=== Resumed Downloads ===")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "long.txt")
+
+            # Without retries the cut transfer fails but keeps its partial bytes
+            downloader = AsyncDownloader(requests_per_second=None, retries=0)
+            [result] = downloader.downloadMany([(f"{base}/texts/long.txt", path, expected_sha256)])
+            assert 'error' in result
+            assert not os.path.exists(path)
+            partial_size = os.path.getsize(path + '.part')
+            assert 0 < partial_size < len(body)
+
+            [result] = downloader.downloadMany([(f"{base}/texts/long.txt", path, expected_sha256)])
+            downloader.close()
+
+            assert result['resumed'] == partial_size, result
+            assert result['sha256'] == expected_sha256
+            assert server.ranges[-1] == f"bytes={partial_size}-"
+            assert not os.path.exists(path + '.part') and not os.path.exists(path + '.part.json')
+            with open(path, encoding='utf-8') as f:
+                assert f.read() == body
+
+            # A checksum mismatch never publishes the file
+            bad_path = os.path.join(tmp_dir, "short.txt")
+            downloader = AsyncDownloader(requests_per_second=None, retries=1, retry_delay=0.01)
+            [result] = downloader.downloadMany([(f"{base}/texts/short.txt", bad_path, "0" * 64)])
+            downloader.close()
+            assert 'Checksum mismatch' in result['error']
+            assert not os.path.exists(bad_path) and not os.path.exists(bad_path + '.part')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"  ✓ Resumed after {partial_size} of {len(body)} bytes, checksum verified")
+
+def test_pipeline_download_texts():
+    """TextPipeline.downloadTexts records downloads and only re-fetches texts that changed upstream"""
+
+    texts = {'/texts/1.txt': "One\n", '/texts/2.txt': "Two\n"}
+    server, base = start_stand_in(texts)
+
+    print("\n=== Pipeline Downloads ===")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pipeline = TextPipeline(tmp_dir, requests_per_second=None)
+            raw_dir = os.path.join(tmp_dir, "raw")
+
+            # A run where every download fails leaves no manifest behind
+            assert pipeline.downloadTexts([{'id': '3', 'url': f"{base}/texts/3.txt"}], raw_dir) == {'3': None}
+            assert not os.path.exists(os.path.join(raw_dir, "download_manifest.json"))
+
+            # Downloaded before the manifest existed, and newer than the upstream copy
+            with open(os.path.join(raw_dir, "pg2_raw.txt"), 'w', encoding='utf-8') as f:
+                f.write("Already here\n")
+
+            works = [{'id': '1', 'url': f"{base}/texts/1.txt"},
+                     {'id': '2', 'url': f"{base}/texts/2.txt"},
+                     {'id': '3', 'url': f"{base}/texts/3.txt"}]
+            paths = pipeline.downloadTexts(works, raw_dir)
+
+            assert paths['1'] == os.path.join(raw_dir, "pg1_raw.txt")
+            assert paths['2'] == os.path.join(raw_dir, "pg2_raw.txt")
+            assert paths['3'] is None
+            with open(paths['2'], encoding='utf-8') as f:
+                assert f.read() == "Already here\n"
+
+            with open(os.path.join(raw_dir, "download_manifest.json"), encoding='utf-8') as f:
+                manifest = json.load(f)
+            assert manifest['1']['etag'] == '"v1"' and manifest['1']['size'] == 4
+            assert manifest['1']['sha256'] == hashlib.sha256(b"One\n").hexdigest()
+            assert '3' not in manifest
+
+            # Same run: nothing is revalidated twice
+            requests_before = len(server.requests)
+            pipeline.downloadTexts(works[:2], raw_dir)
+            assert len(server.requests) == requests_before
+
+            # A later run revalidates by ETag and only moves bytes for the changed text
+            texts['/texts/1.txt'] = "One, revised\n"
+            server.etags['/texts/1.txt'] = '"v2"'
+            refresh = TextPipeline(tmp_dir, requests_per_second=None)
+            paths = refresh.downloadTexts(works[:2], raw_dir)
+
+            with open(paths['1'], encoding='utf-8') as f:
+                assert f.read() == "One, revised\n"
+            with open(paths['2'], encoding='utf-8') as f:
+                assert f.read() == "Already here\n"
+            with open(os.path.join(raw_dir, "download_manifest.json"), encoding='utf-8') as f:
+                manifest = json.load(f)
+            assert manifest['1']['etag'] == '"v2"'
+            assert manifest['2']['etag'] == '"v1"'
+
+            pipeline.downloader.close()
+            refresh.downloader.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("  ✓ Unchanged texts revalidated with 304s, changed text re-downloaded")
+
+def test_parallel_cleaning():
+    """processWorks cleans across a process pool with the same output as a serial run"""
+
+    header = "The Project Gutenberg EBook of Book {i}\n\n*** START OF THIS PROJECT GUTENBERG EBOOK BOOK {i} ***\n"
+    footer = "\n*** END OF THIS PROJECT GUTENBERG EBOOK BOOK {i} ***\nLicense text\n"
+    body = "CHAPTER I.\n\n12   It was a dark night .\n\n\n\n\n7\nThe end  \n" * 200
+    texts = {f'/texts/{i}.txt': header.format(i=i) + body + footer.format(i=i) for i in range(6)}
+    server, base = start_stand_in(texts)
+
+    print("\n=== Parallel Cleaning ===")
+
+    try:
+        works = [{'id': str(i), 'title': f"Book {i}", 'author': "Anon", 'url': f"{base}/texts/{i}.txt"}
+                 for i in range(6)]
+        works.append({'id': '99', 'title': "Missing", 'author': "Anon", 'url': f"{base}/texts/99.txt"})
+
+        outputs = {}
+        for workers in (1, 3):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                pipeline = TextPipeline(tmp_dir, requests_per_second=None, load_catalog=False)
+                results = pipeline.processWorks(works, workers=workers)
+                pipeline.downloader.close()
+
+                assert [result['work']['id'] for result in results] == [work['id'] for work in works]
+                assert results[-1]['errors'] == ["Download failed"] and not results[-1]['cleaned']
+
+                cleaned = []
+                for result in results[:-1]:
+                    assert result['validated'], result
+                    with open(result['files']['cleaned'], encoding='utf-8') as f:
+                        cleaned.append(f.read())
+                outputs[workers] = (cleaned, [result['validation'] for result in results[:-1]])
+
+        assert outputs[1] == outputs[3]
+        assert "START OF" not in outputs[3][0][0] and "License" not in outputs[3][0][0]
+        assert "It was a dark night." in outputs[3][0][0]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("  ✓ 6 texts cleaned in 3 processes, identical to a serial run")
+
+def regex_normalize_line_format(text):
+    """normalizeLineFormat as a sequence of whole-text regex passes, the reference for the fused version"""
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = re.sub(r'^\s*\d+\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\s+$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^CHAPTER\s+([IVX\d]+)\.?\s*$', r'CHAPTER \1', text, flags=re.MULTILINE)
+    text = re.sub(r'^BOOK\s+([IVX\d]+)\.?\s*$', r'BOOK \1', text, flags=re.MULTILINE)
+    text = re.sub(r'\s+([.!?;:,])', r'\1', text)
+    lines = [line.rstrip() for line in text.split('\n')]
+    text = '\n'.join(lines)
+    return text.strip()
+
+def test_fused_normalizer():
+    """The single-pass normalizer matches the regex passes on books and on random fragments"""
+
+    print("\n=== Fused Normalizer ===")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = TextPipeline(tmp_dir, requests_per_second=None, load_catalog=False)
+        pipeline.downloader.close()
+
+    book = ("\n\n\nCHAPTER I.\n\n\n12   It was a dark night , and\n  the rain fell ;\n\n\n\n7\n"
+            "  BOOK\n   IV.\nCHAPTER\n\nXII\n  \"Quite so .\"\n\n. said he\n  204  \n\n") * 50
+    assert pipeline.normalizeLineFormat(book) == regex_normalize_line_format(book)
+
+    pieces = ["foo", "bar", "12", "3", "CHAPTER", "BOOK", "IV", "X.", ".", ",", "?", ";", " ", "  ", "\t",
+              "\n", "\n", "\n\n", "\r", "\xa0", "\u2028", "\x0c", "\u0663", '"', "'"]
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+        lines = list(pipeline.normalizeLines(text.split('\n'), block_lines=rng.randint(1, 3)))
+        assert '\n'.join(lines) == regex_normalize_line_format(text), repr(text)
+
+    print("  ✓ Fused normalizer matches the regex passes on 20000 random texts")
+
+def regex_remove_gutenberg_headers(pipeline, text):
+    """removeGutenbergHeaders as lowercase-and-find detection plus regex passes, the reference for MarkerMatcher"""
+    text_lower = text.lower()
+    start_pos, end_pos = 0, len(text)
+    for marker in pipeline.start_markers:
+        pos = text_lower.find(marker.lower())
+        if pos != -1 and text.find('\n', pos) != -1:
+            start_pos = text.find('\n', pos) + 1
+            break
+    for marker in pipeline.end_markers:
+        pos = text_lower.find(marker.lower())
+        if pos != -1:
+            end_pos = pos
+            break
+    if start_pos >= end_pos:
+        return text
+
+    main_content = text[start_pos:end_pos]
+    for pattern in [r'Project Gutenberg.*?eBook.*?\n', r'This eBook is for the use of anyone.*?\n',
+                    r'\*\*\*.*?\*\*\*\n', r'Produced by.*?\n', r'Updated editions will replace.*?\n',
+                    r'Creating the works from.*?\n']:
+        main_content = re.sub(pattern, '', main_content, flags=re.IGNORECASE | re.DOTALL)
+    return main_content.strip()
+
+def test_marker_matcher():
+    """Header detection and boilerplate removal match the lowercase-and-regex version on random fragments"""
+
+    print("\n=== Marker Matcher ===")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = TextPipeline(tmp_dir, requests_per_second=None, load_catalog=False)
+        pipeline.downloader.close()
+
+    pieces = pipeline.start_markers + pipeline.end_markers + [
+        "Project Gutenberg", "eBook", "This eBook is for the use of anyone", "Produced by",
+        "Updated editions will replace", "Creating the works from", "***", "*", "*** ", "foo", "bar j x",
+        "\n", "\n", " ", "\u00e9"]
+    rng = random.Random(0)
+    for _ in range(5000):
+        parts = []
+        for _ in range(rng.randint(0, 20)):
+            piece = rng.choice(pieces)
+            case = rng.random()
+            if case < 0.2:
+                piece = piece.upper()
+            elif case < 0.4:
+                piece = piece.lower()
+            elif case < 0.5:
+                piece = "".join(c.upper() if rng.random() < 0.5 else c for c in piece)
+            elif case < 0.6 and len(piece) > 2:
+                cut = rng.randrange(len(piece))
+                piece = piece[:cut] + piece[cut + 1:]
+            parts.append(piece)
+        text = "".join(parts)
+        assert pipeline.removeGutenbergHeaders(text) == regex_remove_gutenberg_headers(pipeline, text), repr(text)
+
+    print("  ✓ Marker matcher matches the regex version on 5000 random texts")
+
+def test_streaming_cleaner():
+    """cleanFile matches cleaning in memory whatever the chunk size, holding only a small buffer"""
+
+    print("\n=== Streaming Cleaner ===")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = TextPipeline(tmp_dir, requests_per_second=None, load_catalog=False)
+        pipeline.downloader.close()
+        raw_file = os.path.join(tmp_dir, "raw.txt")
+        cleaned_file = os.path.join(tmp_dir, "cleaned.txt")
+
+        def clean(text, chunk_size=1 << 16):
+            with open(raw_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            pipeline.cleanFile(raw_file, cleaned_file, chunk_size)
+            with open(cleaned_file, 'r', encoding='utf-8') as f:
+                return f.read()
+
+        pieces = pipeline.start_markers + pipeline.end_markers + [
+            "Project Gutenberg", "eBook", "Produced by", "***", "*", "foo", "bar", "12", "CHAPTER", "IV.", ",",
+            "\n", "\n", "\n\n", " ", "\u00e9"]
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+            expected = pipeline.normalizeLineFormat(pipeline.removeGutenbergHeaders(text))
+            assert clean(text, chunk_size=rng.randint(1, 40)) == expected, repr(text)
+
+        # Removing a span that starts mid-line joins up a marker, however the text is chunked
+        text = "intro\nx **Project Gutenberg\neBook\n*y***\nbody\n"
+        expected = pipeline.normalizeLineFormat(pipeline.removeGutenbergHeaders(text))
+        assert expected == "intro\nx body", repr(expected)
+        for chunk_size in range(1, len(text) + 1):
+            assert clean(text, chunk_size) == expected, chunk_size
+
+        book = ("The Project Gutenberg EBook of Test\n\n*** START OF THIS PROJECT GUTENBERG EBOOK TEST ***\n" +
+                "It was a dark night , and\n  the rain fell ;\n\n12\nCHAPTER IV.\n" * 50000 +
+                "*** END OF THIS PROJECT GUTENBERG EBOOK TEST ***\nProject Gutenberg-tm eBook license\n")
+        with open(raw_file, 'w', encoding='utf-8') as f:
+            f.write(book)
+        tracemalloc.start()
+        try:
+            pipeline.cleanFile(raw_file, cleaned_file)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        with open(cleaned_file, 'r', encoding='utf-8') as f:
+            assert f.read() == pipeline.normalizeLineFormat(pipeline.removeGutenbergHeaders(book))
+        assert peak < len(book) / 2, peak
+
+    print(f"  ✓ Streaming cleaner matches in-memory cleaning; {len(book):,} characters in {peak:,} bytes peak")
+
+def test_incremental_build():
+    """Reruns reuse outputs built from the same raw contents and rules, rebuilding only stale works"""
+
+    header = "The Project Gutenberg EBook of Book {i}\n\n*** START OF THIS PROJECT GUTENBERG EBOOK BOOK {i} ***\n"
+    footer = "\n*** END OF THIS PROJECT GUTENBERG EBOOK BOOK {i} ***\nLicense text\n"
+    body = "CHAPTER I.\n\nIt was a dark night .\n" * 100
+    texts = {f'/texts/{i}.txt': header.format(i=i) + body + footer.format(i=i) for i in range(4)}
+    server, base = start_stand_in(texts)
+
+    print("\n=== Incremental Build ===")
+
+    try:
+        works = [{'id': str(i), 'title': f"Book {i}", 'author': "Anon", 'url': f"{base}/texts/{i}.txt"}
+                 for i in range(4)]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            def run(requests_per_second=None, revalidate=True):
+                # A fresh pipeline per run, counting the works it actually cleans
+                pipeline = TextPipeline(tmp_dir, requests_per_second=requests_per_second, load_catalog=False)
+                cleaned = []
+                clean_work = pipeline._clean_work
+                pipeline._clean_work = lambda result: cleaned.append(result['work']['id']) or clean_work(result)
+                results = pipeline.processWorks(works, workers=1, revalidate=revalidate)
+                pipeline.downloader.close()
+                assert all(result['validated'] for result in results), results
+                return cleaned, results
+
+            cleaned, first = run()
+            assert cleaned == ['0', '1', '2', '3']
+
+            cleaned, results = run()
+            assert cleaned == []
+            assert [result['validation'] for result in results] == [result['validation'] for result in first]
+
+            # Without revalidation a rerun makes no requests, so the per-host rate limit costs nothing
+            requests = len(server.requests)
+            start = time.perf_counter()
+            cleaned, results = run(requests_per_second=1.0, revalidate=False)
+            rerun_time = time.perf_counter() - start
+            assert cleaned == [] and len(server.requests) == requests
+            assert [result['validation'] for result in results] == [result['validation'] for result in first]
+            assert rerun_time < 1.0, rerun_time
+
+            # An upstream change rebuilds that work; touching a raw file without changing it does not
+            texts['/texts/1.txt'] = texts['/texts/1.txt'].replace("dark", "stormy")
+            server.etags['/texts/1.txt'] = '"v2"'
+            os.utime(first[2]['files']['raw'], ns=(0, 0))
+            cleaned, results = run()
+            assert cleaned == ['1']
+            with open(results[1]['files']['cleaned'], encoding='utf-8') as f:
+                assert "It was a stormy night." in f.read()
+
+            # So does a missing output
+            os.remove(first[3]['files']['validation'])
+            cleaned, _ = run()
+            assert cleaned == ['3']
+
+            with open(os.path.join(tmp_dir, "build_manifest.json"), encoding='utf-8') as f:
+                manifest = json.load(f)
+            assert sorted(manifest) == ['0', '1', '2', '3']
+            raw_file = first[1]['files']['raw']
+            with open(raw_file, 'rb') as f:
+                assert manifest['1']['raw_sha256'] == hashlib.sha256(f.read()).hexdigest()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"  ✓ Reruns rebuild only changed works; {len(works)} works rerun without revalidation in {rerun_time:.3f}s")
+
+def split_validate_cleaned_text(text, title):
+    """validateCleanedText as str splits, lowercasing and regex scans, the reference for the byte counts"""
+    validation = {
+        'title': title,
+        'char_count': len(text),
+        'word_count': len(text.split()),
+        'line_count': text.count('\n') + 1,
+        'paragraph_count': len([p for p in text.split('\n\n') if p.strip()]),
+        'has_gutenberg_markers': False,
+        'has_line_numbers': False,
+        'excessive_whitespace': False,
+        'issues': []
+    }
+    text_lower = text.lower()
+    if any(marker in text_lower for marker in ['project gutenberg', 'gutenberg.org', 'ebook', 'this etext']):
+        validation['has_gutenberg_markers'] = True
+        validation['issues'].append("Contains Project Gutenberg markers")
+    if re.search(r'^\s*\d+\s+', text, re.MULTILINE):
+        validation['has_line_numbers'] = True
+        validation['issues'].append("Contains line numbers")
+    if re.search(r'\n\s*\n\s*\n\s*\n', text):
+        validation['excessive_whitespace'] = True
+        validation['issues'].append("Excessive blank lines")
+    return validation
+
+def test_byte_validator():
+    """Validating UTF-8 bytes gives the same results as splitting and lowercasing the str"""
+
+    print("\n=== Byte Validator ===")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = TextPipeline(tmp_dir, requests_per_second=None, load_catalog=False)
+        pipeline.downloader.close()
+
+    pieces = ["foo", "bar", "12", "\u0663", "\uff11", "Project", " ", "Gutenberg", "gutenberg.org", "EBOO", "K",
+              "\u212a", "th", "\u0130", "is etext", "\n", "\n", "\n\n", "\t", "\r", "\x0b", "\x0c", "\x1c",
+              "\x1f", "\x85", "\xa0", "\u1680", "\u2003", "\u2028", "\u202f", "\u205f", "\u3000", "\u2019",
+              "\xe9", "\U0001f600"]
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+        expected = split_validate_cleaned_text(text, "Title")
+        for argument in (text, text.encode('utf-8'), memoryview(text.encode('utf-8'))):
+            validation = pipeline.validateCleanedText(argument, "Title")
+            del validation['quality_score']
+            assert validation == expected, repr(text)
+
+    print("  ✓ Byte validator matches the str version on 5000 random texts")
+
+def test_validate_corpus():
+    """validateCorpus writes one table with a row per cleaned text"""
+
+    print("\n=== Corpus Validation ===")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = TextPipeline(tmp_dir, requests_per_second=None, load_catalog=False)
+        pipeline.downloader.close()
+
+        works = [{'id': str(i), 'title': f"Book {i}"} for i in range(3)]
+        texts = ["It was a dark night.\nThe end", "12 Project Gutenberg\n\n\n\nfoo", "caf\xe9 \u2019quoted\u2019"]
+        for work, text in zip(works, texts):
+            with open(os.path.join(tmp_dir, "cleaned", f"pg{work['id']}_cleaned.txt"), 'w', encoding='utf-8') as f:
+                f.write(text)
+        works.append({'id': '99', 'title': "Missing"})
+
+        validations = pipeline.validateCorpus(works)
+        assert validations[:3] == [pipeline.validateCleanedText(text, work['title']) for work, text in zip(works, texts)]
+        assert validations[3] is None
+
+        with open(os.path.join(tmp_dir, "validation", "corpus_validation.csv"), encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['id'] for row in rows] == ['0', '1', '2']
+        assert rows[1]['issues'] == "Contains Project Gutenberg markers; Contains line numbers; Excessive blank lines"
+        assert rows[2]['char_count'] == str(len(texts[2]))
+        assert not [name for name in os.listdir(os.path.join(tmp_dir, "validation")) if name.endswith('.json')]
+
+    print("  ✓ 3 texts validated into one table")
+
+if __name__ == "__main__":
+    test_concurrent_downloads()
+    test_rate_limit()
+    test_resumed_download()
+    test_pipeline_download_texts()
+    test_parallel_cleaning()
+    test_incremental_build()
+    test_fused_normalizer()
+    test_marker_matcher()
+    test_streaming_cleaner()
+    test_byte_validator()
+    test_validate_corpus()
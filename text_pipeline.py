@@ -5,26 +5,200 @@ Project Gutenberg Text Download and Cleaning Pipeline
 Downloads and cleans texts for testing with a small subset of well-known works.
 """
 
+import argparse
+import csv
+import hashlib
 import json
 import os
 import re
-import requests
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
+from email.utils import formatdate
 from urllib.parse import urlparse
 
+from async_downloader import AsyncDownloader, DownloadManifest
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Line rules applied by normalizeLineFormat
+LEADING_NUMBER_PATTERN = re.compile(r'\d+(?:\s+|$)')
+NUMBER_PATTERN = re.compile(r'\d+')
+HEADER_PATTERN = re.compile(r'(CHAPTER|BOOK)\s+([IVX\d]+)\.?')
+HEADER_WORDS = ('CHAPTER', 'BOOK')
+NUMERAL_LINE_PATTERN = re.compile(r'\s*([IVX\d]+)\.?')
+SPACE_BEFORE_PUNCTUATION_PATTERN = re.compile(r'\s+(?=[.!?;:,])')
+PUNCTUATION = '.!?;:,'
+
+# Boilerplate removed from the main content: each match runs from the start marker,
+# through the first middle marker after it (if any), to the end of the first stop marker after that
+BOILERPLATE = [
+    ('Project Gutenberg', 'eBook', '\n'),
+    ('This eBook is for the use of anyone', None, '\n'),
+    ('***', None, '***\n'),
+    ('Produced by', None, '\n'),
+    ('Updated editions will replace', None, '\n'),
+    ('Creating the works from', None, '\n')
+]
+
+# Validation checks, made on UTF-8 bytes
+GUTENBERG_MARKERS = [b'project gutenberg', b'gutenberg.org', b'ebook', b'this etext']
+ASCII_LINE_NUMBER_PATTERN = re.compile(rb'^[\s\x1c-\x1f]*[0-9]+[\s\x1c-\x1f]+', re.MULTILINE)
+LINE_NUMBER_PATTERN = re.compile(r'^\s*\d+\s+', re.MULTILINE)
+EXCESSIVE_WHITESPACE_PATTERN = re.compile(rb'\n[\s\x1c-\x1f]*\n[\s\x1c-\x1f]*\n[\s\x1c-\x1f]*\n')
+# What str.split() and str.strip() count as whitespace: these bytes, and the UTF-8 characters below
+ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+NON_ASCII_WHITESPACE_PATTERNS = [re.compile(pattern) for pattern in (
+    rb'\xc2[\x85\xa0]', rb'\xe1\x9a\x80', rb'\xe2(?:\x80[\x80-\x8a\xa8\xa9\xaf]|\x81\x9f)', rb'\xe3\x80\x80'
+)]
+# The only non-ASCII characters str.lower() maps to ASCII letters
+NON_ASCII_LOWERCASE = {char.encode('utf-8'): char.lower().encode('utf-8') for char in '\u0130\u212a'}
+# Whitespace to ' ' and everything else to 'x', so words start at each ' x'
+WORD_CLASSES = bytes(32 if byte in ASCII_WHITESPACE else ord('x') for byte in range(256))
+# Everything to 'x' but the 0xFF (never valid UTF-8) marking paragraph breaks
+PARAGRAPH_CLASSES = bytes(byte if byte == 0xFF else ord('x') for byte in range(256))
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+VALIDATION_FIELDS = ['id', 'title', 'char_count', 'word_count', 'line_count', 'paragraph_count',
+                     'has_gutenberg_markers', 'has_line_numbers', 'excessive_whitespace', 'quality_score', 'issues']
+
+# Version of the cleaning and validation rules, recorded with every build output:
+# bump it whenever a change to them would change what cleaning or validation writes
+CLEANING_RULES_VERSION = 1
+
+# Letters from most to least common in English text, for choosing where to anchor a marker search
+# (i, k and s are left out: case-insensitive regexes also match them to ı/İ, the Kelvin sign and ſ)
+ANCHOR_LETTERS = 'etaonhrdlcumwfgypbvjxqz'
+
+class MarkerMatcher:
+    """
+    Case-insensitive search for a fixed set of literal markers without lowercasing the text
+
+    Every marker is anchored on its rarest character. Each case of that
+    character leads a regex that checks the rest of the marker
+    case-insensitively around it, so the regex engine can skip through the
+    text at literal-search speed and only stop at anchor characters.
+    """
+
+    def __init__(self, markers: Iterable[str]):
+        # marker -> [(pattern, offset of its match into the marker)] for each case of the anchor
+        self.scanners = {}
+
+        for marker in markers:
+            lowered = marker.lower()
+            if lowered == marker.upper():
+                # Nothing to fold, so str.find is exact
+                self.scanners[marker] = []
+                continue
+
+            offset = max(range(len(lowered)), key=lambda i: _anchor_rarity(lowered[i]))
+            anchor = lowered[offset]
+            if _anchor_rarity(anchor) < -1:
+                self.scanners[marker] = [(re.compile(re.escape(lowered), re.IGNORECASE), 0)]
+                continue
+
+            behind = f"(?<={re.escape(lowered[:offset + 1])})" if offset else ""
+            around = f"(?i:{behind}{re.escape(lowered[offset + 1:])})"
+            self.scanners[marker] = [(re.compile(re.escape(case) + around), offset)
+                                     for case in sorted({anchor, anchor.upper()})]
+
+    def find(self, text: str, marker: str, start: int = 0) -> int:
+        """
+        Position of the first occurrence of marker in text at or after start, or -1
+        """
+        return self.cursor(text, marker).seek(start)
+
+    def cursor(self, text: str, marker: str) -> '_MarkerCursor':
+        """
+        Cursor over the occurrences of marker in text, for searching at ever later positions
+        """
+        return _MarkerCursor(text, marker, self.scanners[marker])
+
+class BuildManifest:
+    """
+    JSON record of what each work's cleaned text and validation report were
+    built from: the raw file's SHA-256 (with its size and mtime, to skip
+    rehashing unchanged files) and the cleaning rules version
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        # Raw file hashes computed by this run
+        self._digests = {}
+
+    def isFresh(self, key: str, raw_file: str, rules_version: str) -> bool:
+        """Whether key's outputs were built by rules_version from the current contents of raw_file"""
+        entry = self.entries.get(key)
+        if not entry or entry['rules_version'] != rules_version:
+            return False
+        for path, size in entry['outputs'].items():
+            if not os.path.exists(path) or os.path.getsize(path) != size:
+                return False
+
+        stat = os.stat(raw_file)
+        if entry['raw_size'] == stat.st_size and entry['raw_mtime_ns'] == stat.st_mtime_ns:
+            return True
+        # Touched or rewritten: only the contents matter
+        if self._digest(key, raw_file) != entry['raw_sha256']:
+            return False
+        entry['raw_size'], entry['raw_mtime_ns'] = stat.st_size, stat.st_mtime_ns
+        return True
+
+    def record(self, key: str, raw_file: str, rules_version: str, outputs: List[str]):
+        """Store the raw file and rules a work's outputs were just built from"""
+        stat = os.stat(raw_file)
+        self.entries[key] = {
+            'raw_sha256': self._digest(key, raw_file),
+            'raw_size': stat.st_size,
+            'raw_mtime_ns': stat.st_mtime_ns,
+            'rules_version': rules_version,
+            'outputs': {path: os.path.getsize(path) for path in outputs},
+            'built': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _digest(self, key: str, raw_file: str) -> str:
+        if key not in self._digests:
+            digest = hashlib.sha256()
+            with open(raw_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            self._digests[key] = digest.hexdigest()
+        return self._digests[key]
+
 class TextPipeline:
     """Pipeline for downloading and cleaning Project Gutenberg texts"""
 
-    def __init__(self, output_dir: str = "test_corpus"):
+    def __init__(self, output_dir: str = "test_corpus", max_concurrency: int = 4,
+                 requests_per_second: Optional[float] = 1.0, load_catalog: bool = True):
+        """
+        Args:
+            output_dir: Corpus directory (raw, cleaned and validation subdirectories)
+            max_concurrency: Downloads in flight at once
+            requests_per_second: Download requests started per host per second (None for no limit)
+            load_catalog: Load the Gutenberg catalog (cleaning workers don't need it)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.downloader = AsyncDownloader(max_concurrency=max_concurrency,
+                                          requests_per_second=requests_per_second)
+        # Texts already revalidated by this pipeline run
+        self._revalidated = set()
 
         # Create subdirectories
         (self.output_dir / "raw").mkdir(exist_ok=True)
@@ -32,7 +206,7 @@ class TextPipeline:
         (self.output_dir / "validation").mkdir(exist_ok=True)
 
         # Load catalog if available
-        self.catalog = self._load_catalog()
+        self.catalog = self._load_catalog() if load_catalog else {}
 
         # Common Project Gutenberg markers
         self.start_markers = [
@@ -51,6 +225,13 @@ class TextPipeline:
             "End of Project Gutenberg"
         ]
 
+        self.marker_matcher = MarkerMatcher(self.start_markers + self.end_markers)
+        self.boilerplate_matcher = MarkerMatcher({marker for markers in BOILERPLATE for marker in markers if marker})
+
+        # Outputs are rebuilt when the rules version or the configured markers change
+        rules = json.dumps([self.start_markers, self.end_markers, BOILERPLATE]).encode('utf-8')
+        self.rules_version = f"{CLEANING_RULES_VERSION}-{hashlib.sha256(rules).hexdigest()[:12]}"
+
     def _load_catalog(self) -> Dict:
         """Load the Project Gutenberg catalog"""
         try:
@@ -134,40 +315,91 @@ class TextPipeline:
         Returns:
             Path to downloaded file or None if failed
         """
-        output_path = Path(output_dir) / f"pg{text_id}_raw.txt"
+        return self.downloadTexts([{'id': text_id, 'url': url}], output_dir)[text_id]
 
-        if output_path.exists():
-            logger.info(f"Text {text_id} already downloaded: {output_path}")
-            return str(output_path)
-
-        try:
-            logger.info(f"Downloading text {text_id} from {url}")
-
-            headers = {
-                'User-Agent': 'Project Gutenberg Text Pipeline (Educational Use)'
-            }
-
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            # Detect encoding
-            encoding = response.encoding or 'utf-8'
-            text_content = response.content.decode(encoding, errors='replace')
-
-            # Save raw text
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text_content)
+    def downloadTexts(self, works: List[Dict], output_dir: str, revalidate: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Download many texts concurrently, rate limited per host
 
-            logger.info(f"Downloaded {len(text_content)} characters to {output_path}")
+        Completed downloads are recorded in download_manifest.json (URL,
+        ETag, Last-Modified, size, SHA-256). Texts already on disk are
+        revalidated with a conditional GET, so only texts that changed
+        upstream are transferred again. Interrupted transfers leave a .part
+        file that the next attempt (or the next run) resumes.
 
-            # Be respectful to server
-            time.sleep(1)
+        Args:
+            works: Dictionaries with id, url and optionally the expected sha256 of the raw bytes
+            output_dir: Directory to save raw texts
+            revalidate: Check texts already on disk for upstream changes
 
-            return str(output_path)
+        Returns:
+            Mapping of text ID to downloaded file path (None if failed)
+        """
+        manifest = DownloadManifest(str(Path(output_dir) / "download_manifest.json"))
+        paths = {}
+        jobs = []
+        job_ids = []
+        cached = {}
+
+        for work in works:
+            text_id = work['id']
+            output_path = Path(output_dir) / f"pg{text_id}_raw.txt"
+            validators = None
+
+            if output_path.exists():
+                if not revalidate or text_id in self._revalidated:
+                    logger.info(f"Text {text_id} already downloaded: {output_path}")
+                    paths[text_id] = str(output_path)
+                    continue
+
+                validators = manifest.validators(text_id, work['url'])
+                if validators is None:
+                    # Downloaded before the manifest existed: changed since the file was written?
+                    validators = {'last_modified': formatdate(output_path.stat().st_mtime, usegmt=True)}
+                cached[text_id] = str(output_path)
+                logger.info(f"Revalidating text {text_id} at {work['url']}")
+            else:
+                logger.info(f"Downloading text {text_id} from {work['url']}")
+
+            jobs.append((work['url'], str(output_path), work.get('sha256'), validators))
+            job_ids.append((text_id, work['url']))
+
+        if not jobs:
+            return paths
+
+        results = self.downloader.downloadMany(jobs)
+        transferred = 0
+        unchanged = 0
+        recorded = 0
+
+        for (text_id, url), result in zip(job_ids, results):
+            if result.get('error'):
+                if text_id in cached:
+                    logger.warning(f"Could not revalidate text {text_id}, using cached copy: {result['error']}")
+                    paths[text_id] = cached[text_id]
+                else:
+                    logger.error(f"Failed to download text {text_id}: {result['error']}")
+                    paths[text_id] = None
+                continue
+
+            manifest.record(text_id, url, result)
+            recorded += 1
+            self._revalidated.add(text_id)
+            paths[text_id] = result['path']
+
+            if result['status'] == 304:
+                unchanged += 1
+                logger.info(f"Text {text_id} unchanged upstream: {result['path']}")
+            else:
+                transferred += result['bytes'] - result['resumed']
+                resumed = f" (resumed after {result['resumed']} bytes)" if result['resumed'] else ""
+                logger.info(f"Downloaded {result['bytes']} bytes to {result['path']}{resumed}")
 
-        except Exception as e:
-            logger.error(f"Failed to download text {text_id}: {e}")
-            return None
+        # Nothing to remember if every job failed (e.g. no network)
+        if recorded:
+            manifest.save()
+        logger.info(f"Downloads: {len(jobs) - unchanged} fetched ({transferred} bytes), {unchanged} unchanged")
+        return paths
 
     def detectTextBoundaries(self, raw_text: str) -> Tuple[int, int]:
         """
@@ -179,13 +411,12 @@ class TextPipeline:
         Returns:
             Tuple of (start_index, end_index)
         """
-        text_lower = raw_text.lower()
         start_pos = 0
         end_pos = len(raw_text)
 
         # Find start boundary
         for marker in self.start_markers:
-            pos = text_lower.find(marker.lower())
+            pos = self.marker_matcher.find(raw_text, marker)
             if pos != -1:
                 # Look for end of line after marker
                 line_end = raw_text.find('\n', pos)
@@ -196,7 +427,7 @@ class TextPipeline:
 
         # Find end boundary
         for marker in self.end_markers:
-            pos = text_lower.find(marker.lower())
+            pos = self.marker_matcher.find(raw_text, marker)
             if pos != -1:
                 end_pos = pos
                 logger.debug(f"Found end marker: {marker} at position {pos}")
@@ -204,6 +435,49 @@ class TextPipeline:
 
         return start_pos, end_pos
 
+    def detectFileBoundaries(self, raw_file: str, chunk_size: int = 1 << 16) -> Tuple[int, int]:
+        """
+        detectTextBoundaries for a text file, reading it a chunk at a time
+
+        Args:
+            raw_file: Path to the raw text
+            chunk_size: Characters read at a time
+
+        Returns:
+            Tuple of (start_index, end_index), in characters read from the file
+        """
+        # A marker may be split between chunks, so each search window repeats the end of the last one
+        overlap = max(len(marker) for marker in self.start_markers + self.end_markers) - 1
+        first = {}
+        line_ends = {}
+        window = ''
+        length = 0
+
+        with open(raw_file, 'r', encoding='utf-8') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                window = window[max(len(window) - overlap, 0):] + chunk
+                base = length + len(chunk) - len(window)
+                length += len(chunk)
+
+                for marker in self.start_markers + self.end_markers:
+                    if marker not in first:
+                        pos = self.marker_matcher.find(window, marker)
+                        if pos != -1:
+                            first[marker] = base + pos
+                for marker in self.start_markers:
+                    if marker in first and marker not in line_ends:
+                        line_end = window.find('\n', max(first[marker] - base, 0))
+                        if line_end != -1:
+                            line_ends[marker] = base + line_end
+
+                # Nothing later in the file can change the outcome
+                if self.start_markers[0] in line_ends and self.end_markers[0] in first:
+                    break
+
+        start_pos = next((line_ends[marker] + 1 for marker in self.start_markers if marker in line_ends), 0)
+        end_pos = next((first[marker] for marker in self.end_markers if marker in first), length)
+        return start_pos, end_pos
+
     def removeGutenbergHeaders(self, text: str) -> str:
         """
         Remove Project Gutenberg boilerplate text
@@ -220,23 +494,67 @@ class TextPipeline:
             logger.warning("Could not detect text boundaries, returning original text")
             return text
 
-        # Extract main content
-        main_content = text[start_pos:end_pos]
-
-        # Remove additional common boilerplate patterns
-        patterns_to_remove = [
-            r'Project Gutenberg.*?eBook.*?\n',
-            r'This eBook is for the use of anyone.*?\n',
-            r'\*\*\*.*?\*\*\*\n',
-            r'Produced by.*?\n',
-            r'Updated editions will replace.*?\n',
-            r'Creating the works from.*?\n'
-        ]
+        # Extract main content and remove additional common boilerplate
+        return ''.join(self._remove_boilerplate([text[start_pos:end_pos]])).strip()
+
+    def _remove_boilerplate(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Remove each kind of BOILERPLATE in turn from text arriving in chunks"""
+        for start_marker, middle_marker, stop_marker in BOILERPLATE:
+            chunks = self._remove_boilerplate_spans(chunks, start_marker, middle_marker, stop_marker)
+        return chunks
 
-        for pattern in patterns_to_remove:
-            main_content = re.sub(pattern, '', main_content, flags=re.IGNORECASE | re.DOTALL)
+    def _remove_boilerplate_spans(self, chunks: Iterable[str], start_marker: str, middle_marker: Optional[str],
+                                  stop_marker: str) -> Iterator[str]:
+        """
+        Remove every span from start_marker, through middle_marker, to the end of stop_marker
+
+        Every chunk but the last must end with a newline, so no marker is
+        split between chunks, and every chunk yielded but the last ends with
+        one too: text after the last newline is carried into the next chunk,
+        so a marker joined up by removing a span is seen by the next stage.
+        Text from the start of a span is held back until the span ends, so
+        memory is bounded by the longest span rather than by the text.
+        """
+        markers = [start_marker, middle_marker, stop_marker] if middle_marker else [start_marker, stop_marker]
+        # Index into markers of the next one wanted, the held text of an unfinished span,
+        # and the text kept since the last newline
+        wanted = 0
+        held = []
+        carry = ''
+
+        for chunk in chunks:
+            # Each marker is searched for at ever later positions, so walk its occurrences instead of rescanning
+            cursors = [self.boilerplate_matcher.cursor(chunk, marker) for marker in markers]
+            pieces = []
+            pos = at = 0
+
+            while True:
+                found = cursors[wanted].seek(at)
+                if found == -1:
+                    break
+                if wanted == 0:
+                    pieces.append(chunk[pos:found])
+                    pos = found
+                at = found + len(markers[wanted])
+                wanted += 1
+                if wanted == len(markers):
+                    # The span is complete: drop it
+                    held = []
+                    pos = at
+                    wanted = 0
+
+            if wanted == 0:
+                pieces.append(chunk[pos:])
+            else:
+                held.append(chunk[pos:])
+            text = carry + ''.join(pieces)
+            newline = text.rfind('\n') + 1
+            if newline:
+                yield text[:newline]
+            carry = text[newline:]
 
-        return main_content.strip()
+        # An unfinished span is left in place
+        yield carry + ''.join(held)
 
     def normalizeLineFormat(self, text: str) -> str:
         """
@@ -248,52 +566,155 @@ class TextPipeline:
         Returns:
             Normalized text
         """
-        # Remove excessive blank lines (more than 2 consecutive)
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        return '\n'.join(self.normalizeLines(_iter_lines(text)))
 
-        # Remove line numbers at start of lines
-        text = re.sub(r'^\s*\d+\s+', '', text, flags=re.MULTILINE)
+    def normalizeLines(self, lines: Iterable[str], block_lines: int = 4096) -> Iterator[str]:
+        """
+        Normalize text line by line in a single streaming pass
 
-        # Remove page numbers (isolated numbers on their own lines)
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
+        Blank lines and trailing whitespace are dropped, line and page
+        numbers removed, CHAPTER/BOOK headers normalized (joining a numeral
+        on the following line) and whitespace before punctuation removed,
+        joining a line that starts with punctuation onto the one before.
+        Only one line is held back for the cross-line rules.
 
-        # Remove excessive whitespace at line ends
-        text = re.sub(r'\s+$', '', text, flags=re.MULTILINE)
+        Args:
+            lines: Lines of text without their newlines
+            block_lines: Lines per yielded block
 
-        # Normalize chapter/section headers (common patterns)
-        text = re.sub(r'^CHAPTER\s+([IVX\d]+)\.?\s*$', r'CHAPTER \1', text, flags=re.MULTILINE)
-        text = re.sub(r'^BOOK\s+([IVX\d]+)\.?\s*$', r'BOOK \1', text, flags=re.MULTILINE)
+        Returns:
+            Iterator over blocks of normalized lines, to be joined with newlines
+        """
+        block = []
+        first = True
+        held = None
+        # The previous line was a removed line number, which also takes this line's indent
+        consumed = False
+
+        for line in lines:
+            line = line.rstrip()
+            if not line:
+                continue
+
+            body = line.lstrip()
+            at_line_start = not consumed or len(body) == len(line)
+            if consumed:
+                line = body
+            consumed = False
+
+            # Remove line numbers and page numbers
+            if body[0].isdecimal():
+                number = LEADING_NUMBER_PATTERN.match(body)
+                if number:
+                    if number.end() == len(body):
+                        consumed = at_line_start
+                        continue
+                    if at_line_start:
+                        line = body = body[number.end():]
+                        if NUMBER_PATTERN.fullmatch(line):
+                            continue
+
+            # Normalize chapter/section headers, which may have their numeral on the next line
+            if held in HEADER_WORDS:
+                numeral = NUMERAL_LINE_PATTERN.fullmatch(line)
+                if numeral:
+                    held = f"{held} {numeral.group(1)}"
+                    continue
+            header = line.startswith(HEADER_WORDS) and HEADER_PATTERN.fullmatch(line)
+            if header:
+                line = body = f"{header.group(1)} {header.group(2)}"
+
+            # A line starting with punctuation loses the line break and indent before it
+            if held is not None:
+                if body[0] in PUNCTUATION:
+                    held += body
+                    continue
+                block.append(held)
+                if len(block) == block_lines:
+                    yield self._finish_block(block, first)
+                    block = []
+                    first = False
+            held = line
+
+        if held is not None:
+            block.append(held)
+        if block:
+            yield self._finish_block(block, first)
+
+    def _finish_block(self, block: List[str], first: bool) -> str:
+        """Join normalized lines, removing spacing before punctuation (now only ever within a line)"""
+        text = SPACE_BEFORE_PUNCTUATION_PATTERN.sub('', '\n'.join(block))
+        # The text as a whole starts without indentation
+        return text.lstrip() if first else text
+
+    def cleanFile(self, raw_file: str, cleaned_file: str, chunk_size: int = 1 << 16):
+        """
+        removeGutenbergHeaders and normalizeLineFormat from one file to another, a chunk at a time
 
-        # Remove excessive spacing around punctuation
-        text = re.sub(r'\s+([.!?;:,])', r'\1', text)
+        The boundaries are found in a first pass over the raw file; the
+        second pass skips the header and footer by offset and writes the
+        normalized text as it goes, so memory is bounded by the chunk size
+        (and the longest line or boilerplate span), not the size of the book.
 
-        # Normalize quotation marks
-        text = re.sub(r'["""]', '"', text)
-        text = re.sub(r"['']", "'", text)
+        Args:
+            raw_file: Path to the raw text
+            cleaned_file: Path to write the cleaned text to
+            chunk_size: Characters read at a time
+        """
+        start_pos, end_pos = self.detectFileBoundaries(raw_file, chunk_size)
 
-        # Remove trailing whitespace and normalize line endings
-        lines = [line.rstrip() for line in text.split('\n')]
-        text = '\n'.join(lines)
+        with open(raw_file, 'r', encoding='utf-8') as f, open(cleaned_file, 'w', encoding='utf-8') as out:
+            if start_pos >= end_pos:
+                logger.warning("Could not detect text boundaries, returning original text")
+                chunks = _read_line_chunks(f, 0, None, chunk_size)
+            else:
+                chunks = self._remove_boilerplate(_read_line_chunks(f, start_pos, end_pos, chunk_size))
+                chunks = _lstrip_chunks(chunks)
 
-        return text.strip()
+            for i, block in enumerate(self.normalizeLines(_chunk_lines(chunks))):
+                if i:
+                    out.write('\n')
+                out.write(block)
 
-    def validateCleanedText(self, text: str, title: str) -> Dict:
+    def validateCleanedText(self, text: Union[str, bytes, memoryview], title: str) -> Dict:
         """
         Check if cleaning worked correctly
 
+        Everything is counted in a few C-level passes over the UTF-8
+        bytes, without building lists of words or paragraphs or a
+        lowercased copy of a str.
+
         Args:
-            text: Cleaned text
+            text: Cleaned text, or its UTF-8 encoding
             title: Title of the work
 
         Returns:
             Dictionary with validation results
         """
+        raw = data = text.encode('utf-8') if isinstance(text, str) else bytes(text)
+        is_ascii = data.isascii()
+        if not is_ascii:
+            for pattern in NON_ASCII_WHITESPACE_PATTERNS:
+                data = pattern.sub(b' ', data)
+
+        # Words start wherever non-whitespace follows whitespace (or the start of the text)
+        classes = data.translate(WORD_CLASSES)
+        word_count = classes.count(b' x') + classes.startswith(b'x')
+
+        # Paragraphs are the pieces between non-overlapping blank lines that aren't all whitespace
+        if b'\n\n' in data:
+            pieces = data.replace(b'\n\n', b'\xff').translate(PARAGRAPH_CLASSES, ASCII_WHITESPACE)
+            paragraph_count = pieces.count(b'x\xff') + pieces.endswith(b'x')
+        else:
+            paragraph_count = int(b'x' in classes)
+        del classes
+
         validation = {
             'title': title,
-            'char_count': len(text),
-            'word_count': len(text.split()),
-            'line_count': text.count('\n') + 1,
-            'paragraph_count': len([p for p in text.split('\n\n') if p.strip()]),
+            'char_count': len(raw) if is_ascii else len(raw.translate(None, UTF8_CONTINUATION_BYTES)),
+            'word_count': word_count,
+            'line_count': data.count(b'\n') + 1,
+            'paragraph_count': paragraph_count,
             'has_gutenberg_markers': False,
             'has_line_numbers': False,
             'excessive_whitespace': False,
@@ -301,22 +722,28 @@ class TextPipeline:
             'issues': []
         }
 
-        text_lower = text.lower()
-
         # Check for remaining Project Gutenberg markers
-        gutenberg_markers = ['project gutenberg', 'gutenberg.org', 'ebook', 'this etext']
-        if any(marker in text_lower for marker in gutenberg_markers):
+        lowered = raw
+        if not is_ascii:
+            for char, lower in NON_ASCII_LOWERCASE.items():
+                if char in lowered:
+                    lowered = lowered.replace(char, lower)
+        lowered = lowered.lower()
+        if any(marker in lowered for marker in GUTENBERG_MARKERS):
             validation['has_gutenberg_markers'] = True
             validation['issues'].append("Contains Project Gutenberg markers")
+        del lowered
 
-        # Check for line numbers
-        line_number_pattern = r'^\s*\d+\s+'
-        if re.search(line_number_pattern, text, re.MULTILINE):
+        # Check for line numbers (in any script's digits)
+        has_line_numbers = ASCII_LINE_NUMBER_PATTERN.search(data)
+        if not has_line_numbers and not is_ascii:
+            has_line_numbers = LINE_NUMBER_PATTERN.search(raw.decode('utf-8'))
+        if has_line_numbers:
             validation['has_line_numbers'] = True
             validation['issues'].append("Contains line numbers")
 
         # Check for excessive whitespace
-        if re.search(r'\n\s*\n\s*\n\s*\n', text):
+        if EXCESSIVE_WHITESPACE_PATTERN.search(data):
             validation['excessive_whitespace'] = True
             validation['issues'].append("Excessive blank lines")
 
@@ -335,6 +762,42 @@ class TextPipeline:
 
         return validation
 
+    def validateCorpus(self, works: List[Dict], table_file: Optional[str] = None) -> List[Optional[Dict]]:
+        """
+        Validate the cleaned texts of many works at once, writing one table rather than a report per work
+
+        Args:
+            works: Dictionaries with id and title, whose cleaned texts are in the cleaned directory
+            table_file: CSV file to write (defaults to validation/corpus_validation.csv)
+
+        Returns:
+            Validation results in the order of works (None for works with no cleaned text)
+        """
+        table_file = str(table_file or self.output_dir / "validation" / "corpus_validation.csv")
+        validations = []
+
+        tmp_path = table_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=VALIDATION_FIELDS)
+            writer.writeheader()
+
+            for work in works:
+                cleaned_file = self.output_dir / "cleaned" / f"pg{work['id']}_cleaned.txt"
+                try:
+                    with open(cleaned_file, 'rb') as cleaned:
+                        validation = self.validateCleanedText(cleaned.read(), work['title'])
+                except FileNotFoundError:
+                    logger.warning(f"No cleaned text for {work['title']} (ID: {work['id']})")
+                    validations.append(None)
+                    continue
+
+                validations.append(validation)
+                writer.writerow(dict(validation, id=work['id'], issues='; '.join(validation['issues'])))
+
+        os.replace(tmp_path, table_file)
+        logger.info(f"Validated {sum(v is not None for v in validations)} texts into {table_file}")
+        return validations
+
     def processTestWork(self, work: Dict) -> Dict:
         """
         Process a single test work through the complete pipeline
@@ -347,15 +810,7 @@ class TextPipeline:
         """
         logger.info(f"Processing: {work['title']} by {work['author']} (ID: {work['id']})")
 
-        result = {
-            'work': work,
-            'downloaded': False,
-            'cleaned': False,
-            'validated': False,
-            'files': {},
-            'validation': None,
-            'errors': []
-        }
+        result = self._new_result(work)
 
         try:
             # Step 1: Download text
@@ -364,32 +819,158 @@ class TextPipeline:
                 work['url'],
                 str(self.output_dir / "raw")
             )
+        except Exception as e:
+            logger.error(f"Error processing {work['title']}: {e}")
+            result['errors'].append(str(e))
+            return result
+
+        if not raw_file:
+            result['errors'].append("Download failed")
+            return result
+
+        result['downloaded'] = True
+        result['files']['raw'] = raw_file
+
+        # Steps 2 and 3: Clean and validate
+        return self._clean_work(result)
+
+    def processWorks(self, works: List[Dict], workers: Optional[int] = None, revalidate: bool = True) -> List[Dict]:
+        """
+        Process many works, downloading concurrently and cleaning across a process pool
+
+        The I/O-bound download stage runs first for every work; the
+        CPU-bound clean and validate stages then run in parallel, one work
+        per task, so throughput scales with cores.
 
-            if not raw_file:
+        Args:
+            works: Dictionaries with id, title, author, url
+            workers: Cleaning processes (defaults to the CPU count; 1 cleans serially)
+            revalidate: Check raw texts already on disk for upstream changes (one
+                rate-limited conditional GET each); without it a rerun over an
+                unchanged corpus makes no requests at all
+
+        Returns:
+            Processing results, in the order of works
+        """
+        raw_files = self.downloadTexts(works, str(self.output_dir / "raw"), revalidate)
+
+        results = []
+        for work in works:
+            result = self._new_result(work)
+            raw_file = raw_files.get(work['id'])
+            if raw_file:
+                result['downloaded'] = True
+                result['files']['raw'] = raw_file
+            else:
                 result['errors'].append("Download failed")
-                return result
+            results.append(result)
 
-            result['downloaded'] = True
-            result['files']['raw'] = raw_file
+        return self._clean_results(results, workers)
 
-            # Step 2: Clean text
-            with open(raw_file, 'r', encoding='utf-8') as f:
-                raw_text = f.read()
+    def _new_result(self, work: Dict) -> Dict:
+        """Empty processing result for a work"""
+        return {
+            'work': work,
+            'downloaded': False,
+            'cleaned': False,
+            'validated': False,
+            'files': {},
+            'validation': None,
+            'errors': []
+        }
+
+    def _clean_results(self, results: List[Dict], workers: Optional[int] = None) -> List[Dict]:
+        """
+        Clean and validate every downloaded result across a process pool, keeping order
+
+        Works whose outputs build_manifest.json shows were built from the
+        same raw contents under the same rules are skipped, reusing their
+        saved validation report. At most two works per worker are in
+        flight, and workers write the cleaned text and validation report
+        themselves, so only the small result dictionaries cross process
+        boundaries.
+        """
+        manifest = BuildManifest(str(self.output_dir / "build_manifest.json"))
+        downloaded = [i for i, result in enumerate(results) if result['downloaded']]
+        stale = [i for i in downloaded if not self._reuse_outputs(results[i], manifest)]
+        workers = min(workers or os.cpu_count() or 1, max(len(stale), 1))
+        logger.info(f"Cleaning {len(stale)} texts with {workers} workers ({len(downloaded) - len(stale)} unchanged)")
+
+        start = time.perf_counter()
+
+        if workers == 1:
+            for i in stale:
+                results[i] = self._clean_work(results[i])
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_clean_worker,
+                                     initargs=(str(self.output_dir),)) as executor:
+                pending = deque()
+                indices = iter(stale)
+
+                while True:
+                    while len(pending) < workers * 2:
+                        i = next(indices, None)
+                        if i is None:
+                            break
+                        pending.append((i, executor.submit(_clean_work_in_worker, results[i])))
+
+                    if not pending:
+                        break
+
+                    i, future = pending.popleft()
+                    results[i] = future.result()
+
+        for i in stale:
+            result = results[i]
+            if result['validated']:
+                manifest.record(result['work']['id'], result['files']['raw'], self.rules_version,
+                                [result['files']['cleaned'], result['files']['validation']])
+        if manifest.entries:
+            manifest.save()
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Cleaning complete: {len(stale)} texts in {elapsed:.1f}s "
+                    f"({len(stale) / elapsed if elapsed else 0.0:,.1f} texts/s)")
+        return results
+
+    def _reuse_outputs(self, result: Dict, manifest: BuildManifest) -> bool:
+        """Fill in result from its saved outputs if they are up to date, returning whether they were"""
+        work = result['work']
+        if not manifest.isFresh(work['id'], result['files']['raw'], self.rules_version):
+            return False
+
+        validation_file = self.output_dir / "validation" / f"pg{work['id']}_validation.json"
+        with open(validation_file, 'r', encoding='utf-8') as f:
+            result['validation'] = json.load(f)
+
+        result['cleaned'] = result['validated'] = True
+        result['files']['cleaned'] = str(self.output_dir / "cleaned" / f"pg{work['id']}_cleaned.txt")
+        result['files']['validation'] = str(validation_file)
+        return True
+
+    def _clean_work(self, result: Dict) -> Dict:
+        """
+        Clean and validate a downloaded work, saving both outputs
+
+        Args:
+            result: Processing result with the raw file recorded
 
-            # Remove headers and normalize
-            cleaned_text = self.removeGutenbergHeaders(raw_text)
-            cleaned_text = self.normalizeLineFormat(cleaned_text)
+        Returns:
+            The result, updated with the cleaned and validation files
+        """
+        work = result['work']
 
-            # Save cleaned text
+        try:
+            # Step 2: Clean text, removing headers and normalizing straight from the raw file to the cleaned one
             cleaned_file = self.output_dir / "cleaned" / f"pg{work['id']}_cleaned.txt"
-            with open(cleaned_file, 'w', encoding='utf-8') as f:
-                f.write(cleaned_text)
+            self.cleanFile(result['files']['raw'], str(cleaned_file))
 
             result['cleaned'] = True
             result['files']['cleaned'] = str(cleaned_file)
 
             # Step 3: Validate
-            validation = self.validateCleanedText(cleaned_text, work['title'])
+            with open(cleaned_file, 'rb') as f:
+                validation = self.validateCleanedText(f.read(), work['title'])
 
             # Save validation report
             validation_file = self.output_dir / "validation" / f"pg{work['id']}_validation.json"
@@ -408,10 +989,13 @@ class TextPipeline:
 
         return result
 
-    def run_pipeline(self) -> Dict:
+    def run_pipeline(self, revalidate: bool = True) -> Dict:
         """
         Run the complete pipeline on test works
 
+        Args:
+            revalidate: Check raw texts already on disk for upstream changes
+
         Returns:
             Summary of processing results
         """
@@ -426,14 +1010,8 @@ class TextPipeline:
 
         logger.info(f"Found {len(test_works)} test works to process")
 
-        # Process each work
-        results = []
-        for work in test_works:
-            result = self.processTestWork(work)
-            results.append(result)
-
-            # Small delay between downloads
-            time.sleep(2)
+        # Download everything, then clean across a process pool
+        results = self.processWorks(test_works, revalidate=revalidate)
 
         # Create summary
         summary = {
@@ -461,10 +1039,126 @@ class TextPipeline:
         return summary
 
 
+def _iter_lines(text: str, chunk_size: int = 1 << 16) -> Iterator[str]:
+    """Lines of text split on newlines only, a chunk at a time rather than all at once"""
+
+    def chunks() -> Iterator[List[str]]:
+        start = 0
+        while True:
+            end = text.find('\n', start + chunk_size)
+            if end == -1:
+                yield text[start:].split('\n')
+                return
+            yield text[start:end].split('\n')
+            start = end + 1
+
+    return chain.from_iterable(chunks())
+
+def _read_line_chunks(f, start: int, end: Optional[int], chunk_size: int) -> Iterator[str]:
+    """Characters start to end of a text file, in chunks that each end with a newline (bar the last)"""
+    remaining = end - start if end is not None else None
+
+    # Skip to the start by reading, since text files can't seek to a character offset
+    while start:
+        skipped = len(f.read(min(start, chunk_size)))
+        if not skipped:
+            return
+        start -= skipped
+
+    partial = ''
+    while remaining is None or remaining > 0:
+        chunk = f.read(chunk_size if remaining is None else min(remaining, chunk_size))
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+
+        newline = chunk.rfind('\n')
+        if newline == -1:
+            partial += chunk
+            continue
+        yield partial + chunk[:newline + 1]
+        partial = chunk[newline + 1:]
+
+    if partial:
+        yield partial
+
+def _lstrip_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Chunks of text without the whitespace at the start of the text"""
+    chunks = iter(chunks)
+    for chunk in chunks:
+        chunk = chunk.lstrip()
+        if chunk:
+            yield chunk
+            break
+    yield from chunks
+
+def _chunk_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Lines of text arriving in chunks, split on newlines only"""
+    partial = ''
+    for chunk in chunks:
+        lines = (partial + chunk).split('\n')
+        partial = lines.pop()
+        yield from lines
+    yield partial
+
+def _anchor_rarity(char: str) -> int:
+    """How rare a marker character is in English text (higher is rarer, below -1 if it can't anchor a search)"""
+    if char in ANCHOR_LETTERS:
+        return ANCHOR_LETTERS.index(char)
+    if char.isspace():
+        return -1
+    if char.lower() == char.upper():
+        # Digits and punctuation are rarer than any letter
+        return len(ANCHOR_LETTERS)
+    return -2
+
+class _MarkerCursor:
+    """First occurrence of one marker at or after a position, for positions that only move forward"""
+
+    def __init__(self, text: str, marker: str, patterns: List[Tuple[re.Pattern, int]]):
+        self.text = text
+        self.marker = marker
+        # (pattern, offset of its match into the marker) for each case of the anchor; none means str.find
+        self.patterns = patterns
+        # Next match of each pattern (-2 before the first search, -1 once there are none left)
+        self.found = [-2] * len(patterns)
+
+    def seek(self, pos: int) -> int:
+        if not self.patterns:
+            return self.text.find(self.marker, pos)
+
+        first = -1
+        for i, (pattern, offset) in enumerate(self.patterns):
+            if self.found[i] != -1 and self.found[i] < pos:
+                match = pattern.search(self.text, pos + offset)
+                self.found[i] = match.start() - offset if match else -1
+            if self.found[i] != -1 and (first == -1 or self.found[i] < first):
+                first = self.found[i]
+        return first
+
+# Per-process pipeline used by the cleaning worker pool
+_clean_worker = None
+
+def _init_clean_worker(output_dir: str):
+    """Create the pipeline a worker process reuses for all of its texts"""
+    global _clean_worker
+    _clean_worker = TextPipeline(output_dir, load_catalog=False)
+
+def _clean_work_in_worker(result: Dict) -> Dict:
+    """Pool entry point for TextPipeline._clean_work"""
+    return _clean_worker._clean_work(result)
+
+
 def main():
     """Main function to run the pipeline"""
+    parser = argparse.ArgumentParser(description='Download, clean and validate Project Gutenberg texts')
+    parser.add_argument('--no-revalidate', action='store_true',
+                        help='Reuse raw texts already downloaded without checking them for upstream changes')
+    args = parser.parse_args()
+
     pipeline = TextPipeline()
-    summary = pipeline.run_pipeline()
+    summary = pipeline.run_pipeline(revalidate=not args.no_revalidate)
 
     if 'error' in summary:
         print(f"Error: {summary['error']}")